@@ -0,0 +1,256 @@
+import polars as pl
+from typing import Dict, List, Union
+
+import schemas
+import tool_specs
+
+# Time alignment of tool samples with the perf stat windows of frequency runs
+# Each perf window is [window_start_ns, window_stop_ns] as recorded around perf stat
+# by the benchmark, or for older runs the ctime header of perf plus its
+# "seconds time elapsed", see perf_stat.py. Samples of every tool are matched to the
+# window of their (tool, node, target_frequency) that started last before them
+# with one sorted as-of join, whatever their iteration label.
+#
+# A sample of a domain at t_i covers ]t_i-1, t_i] where t_i-1 is the previous sample
+# of the same run that carries this domain, tools writing their domains at
+# different timestamps leave the other domains of a row null. Samples are first
+# turned into the energy in joules of their interval after the spec of their tool,
+# see tool_specs.py : running totals of cumulative tools are differenced within the
+# run and domain, power values are held over the interval and HWPC fixed point
+# values are decoded.
+# Integrating a window weights every sample with the part of its interval inside
+# the window, samples straddling the start or the stop of perf only count for their
+# overlap, which takes the running total of cumulative tools as of the start of the
+# window. Samples outside count for nothing. The first sample of a run and domain
+# has no interval : it counts fully if it falls inside the window for HWPC, and is
+# the reference reading of cumulative tools and power values, counting for nothing,
+# so the energy spent before perf started is never counted.
+
+WINDOW_KEYS = ["tool", "node", "target_frequency"]
+RUN_KEYS = ["node", "target_frequency", "iteration"]
+
+
+def perf_windows(
+    perf_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Windows of perf frequency runs with their start and stop, typed after
+    schemas.perf_window_columns. `perf_df` holds one row per run with
+    window_start_ns, time_elapsed (seconds) and optionally window_stop_ns.
+    """
+    elapsed_stop_ns = pl.col("window_start_ns") + (
+        pl.col("time_elapsed") * 1e9
+    ).round().cast(pl.Int64)
+    if "window_stop_ns" in perf_df.collect_schema().names():
+        elapsed_stop_ns = pl.coalesce("window_stop_ns", elapsed_stop_ns)
+    return perf_df.select(
+        "tool",
+        "g5k_cluster",
+        "node",
+        "target_frequency",
+        "iteration",
+        "window_start_ns",
+        elapsed_stop_ns.alias("window_stop_ns"),
+    ).cast(schemas.perf_window_columns)
+
+
+def previous_ns(column: str) -> str:
+    return f"{column}_previous_ns"
+
+
+def sample_energy(spec: tool_specs.ToolSpec, column: str) -> pl.Expr:
+    """
+    Energy in joules over the interval of each sample of `column`, as written by the
+    tool of `spec`, in a frame sorted by run and timestamp with the row of the
+    previous sample of the column, see tool_samples
+    """
+    value = pl.col(column).cast(pl.Float64)
+    previous_row = pl.col(f"{column}_previous_row")
+    unit = spec["energy_unit"]
+    if unit in tool_specs.WATTS_PER_UNIT:
+        interval_s = (pl.col("timestamp_ns") - pl.col(previous_ns(column))) / 1e9
+        return value * tool_specs.WATTS_PER_UNIT[unit] * interval_s
+    if spec["cumulative"]:
+        value = (
+            pl.when(previous_row.is_null())
+            .then(pl.lit(0.0))
+            .otherwise(value - value.gather(previous_row))
+        )
+    return value * tool_specs.JOULES_PER_UNIT[unit]
+
+
+def tool_samples(
+    frequency_dfs: Dict[str, Union[pl.DataFrame, pl.LazyFrame]],
+    columns: List[str],
+) -> pl.LazyFrame:
+    """
+    Samples of every tool of `frequency_dfs` ({tool: frequency frame}) with, for
+    each of `columns`, the start of the interval it covers (<column>_previous_ns)
+    and its energy over that interval, see sample_energy
+    """
+    row = pl.int_range(pl.len())
+    # Rows are sorted by run, the previous row belongs to the same run unless
+    # one of the keys changes
+    same_run = pl.all_horizontal(
+        [pl.col(key) == pl.col(key).shift(1) for key in RUN_KEYS]
+    ).fill_null(False)
+    run_start = pl.when(same_run).then(None).otherwise(row).forward_fill()
+    return pl.concat(
+        [
+            frequency_df.lazy()
+            .select(
+                pl.lit(tool).alias("tool"),
+                "node",
+                pl.col("frequency").cast(pl.Int64).alias("target_frequency"),
+                pl.col("iteration").cast(pl.Int64),
+                pl.col("timestamp_ns").cast(pl.Int64),
+                *columns,
+            )
+            .sort(RUN_KEYS + ["timestamp_ns"])
+            .with_columns(run_start.alias("run_start"))
+            .with_columns(
+                # Last earlier row of the run where the column is not null
+                pl.when(pl.col(column).is_not_null())
+                .then(row)
+                .forward_fill()
+                .shift(1)
+                .alias(f"{column}_previous_row")
+                for column in columns
+            )
+            .with_columns(
+                pl.when(pl.col(f"{column}_previous_row") >= pl.col("run_start"))
+                .then(pl.col(f"{column}_previous_row"))
+                .alias(f"{column}_previous_row")
+                for column in columns
+            )
+            .with_columns(
+                pl.col("timestamp_ns")
+                .gather(pl.col(f"{column}_previous_row"))
+                .alias(previous_ns(column))
+                for column in columns
+            )
+            .with_columns(
+                sample_energy(tool_specs.TOOL_SPECS[tool], column).alias(column)
+                for column in columns
+            )
+            .drop(["run_start"] + [f"{column}_previous_row" for column in columns])
+            for tool, frequency_df in frequency_dfs.items()
+        ],
+        how="vertical_relaxed",
+    )
+
+
+def match_windows(
+    samples_lf: pl.LazyFrame, windows_df: Union[pl.DataFrame, pl.LazyFrame]
+) -> pl.LazyFrame:
+    """
+    Window of every sample, the last one of its (tool, node, target_frequency)
+    started at or before the sample, as-of joined on timestamp_ns
+    """
+    return samples_lf.sort("timestamp_ns").join_asof(
+        windows_df.lazy()
+        .select(
+            WINDOW_KEYS
+            + [
+                pl.col("iteration").alias("window_iteration"),
+                "window_start_ns",
+                "window_stop_ns",
+            ]
+        )
+        .sort("window_start_ns"),
+        left_on="timestamp_ns",
+        right_on="window_start_ns",
+        by=WINDOW_KEYS,
+        strategy="backward",
+        # Both sides are sorted on their timestamps just above
+        check_sortedness=False,
+    )
+
+
+def select_window_samples(
+    frequency_dfs: Dict[str, Union[pl.DataFrame, pl.LazyFrame]],
+    windows_df: Union[pl.DataFrame, pl.LazyFrame],
+    columns: List[str] = ["pkg", "cores", "ram"],
+) -> pl.DataFrame:
+    """
+    Samples of `frequency_dfs` taken inside a perf window, with the iteration
+    of that window and the energy of their interval in joules
+    """
+    return (
+        match_windows(tool_samples(frequency_dfs, columns), windows_df)
+        .filter(pl.col("timestamp_ns") <= pl.col("window_stop_ns"))
+        .drop([previous_ns(column) for column in columns])
+        .collect()
+    )
+
+
+def window_weight(previous: pl.Expr) -> pl.Expr:
+    """
+    Share of the interval ]previous, timestamp_ns] inside the window of each sample,
+    1 if a sample without interval falls inside the window and 0 otherwise
+    """
+    start = pl.max_horizontal(
+        previous.fill_null(pl.col("timestamp_ns")), pl.col("window_start_ns")
+    )
+    stop = pl.min_horizontal(pl.col("timestamp_ns"), pl.col("window_stop_ns"))
+    interval = pl.col("timestamp_ns") - previous
+    inside = (pl.col("timestamp_ns") >= pl.col("window_start_ns")) & (
+        pl.col("timestamp_ns") <= pl.col("window_stop_ns")
+    )
+    return (
+        pl.when(previous.is_null() | (interval == 0))
+        .then(inside.cast(pl.Float64))
+        .otherwise(((stop - start).clip(lower_bound=0) / interval).clip(0, 1))
+    )
+
+
+def integrate_windows(
+    frequency_dfs: Dict[str, Union[pl.DataFrame, pl.LazyFrame]],
+    windows_df: Union[pl.DataFrame, pl.LazyFrame],
+    columns: List[str] = ["pkg", "cores", "ram"],
+) -> pl.DataFrame:
+    """
+    Energy of every tool over each perf window in joules, one row per window with
+    the overlap weighted sum of each of `columns` and the number of samples used
+    """
+    # Share of the interval of each sample of a column inside the window,
+    # null where the sample does not carry the column
+    weights = [
+        pl.when(pl.col(column).is_not_null())
+        .then(window_weight(pl.col(previous_ns(column))))
+        .alias(f"{column}_weight")
+        for column in columns
+    ]
+    # Samples past the stop of a window can still cover its end
+    return (
+        match_windows(tool_samples(frequency_dfs, columns), windows_df)
+        .drop_nulls("window_start_ns")
+        .with_columns(weights)
+        .filter(
+            pl.any_horizontal(pl.col(f"{column}_weight") > 0 for column in columns)
+        )
+        .group_by(WINDOW_KEYS + ["window_iteration"])
+        .agg(
+            pl.len().alias("samples"),
+            *[
+                (pl.col(column) * pl.col(f"{column}_weight")).sum()
+                for column in columns
+            ],
+        )
+        .rename({"window_iteration": "iteration"})
+        .join(
+            windows_df.lazy().select(
+                WINDOW_KEYS + ["iteration", "window_start_ns", "window_stop_ns"]
+            ),
+            on=WINDOW_KEYS + ["iteration"],
+            how="right",
+        )
+        .with_columns(pl.col("samples").fill_null(0))
+        .select(
+            WINDOW_KEYS
+            + ["iteration", "window_start_ns", "window_stop_ns", "samples"]
+            + columns
+        )
+        .sort(WINDOW_KEYS + ["iteration"])
+        .collect()
+    )
@@ -0,0 +1,297 @@
+import os
+import hashlib
+import polars as pl
+from typing import Callable, Dict, List, Optional
+
+import schemas
+
+# Caches of derived frames, stored as ../data/<BATCH>.d/<NAME>.arrow
+# Uncompressed Arrow IPC keeps the dtypes of schemas.py and is memory-mapped on load
+# instead of being parsed again. Legacy <NAME>.csv caches are converted on first access.
+#
+# Partitioned caches are stored as ../data/<BATCH>.d/<NAME>.d/, one Arrow file per
+# partition and a manifest.parquet fingerprinting the input files of each partition
+# (path, size, mtime, optional content hash) and the version of the loader that built it.
+# Only the partitions whose fingerprint changed are built again.
+# Legacy single file caches of a partitioned cache carry no fingerprint, they can
+# not be checked against the input files and are only served when no input is left.
+
+MANIFEST_FILE_NAME = "manifest.parquet"
+
+
+def cache_file(batch_identifier: str, name: str, extension: str = "arrow") -> str:
+    return f"../data/{batch_identifier}.d/{name}.{extension}"
+
+
+def apply_schema(df: pl.DataFrame, schema: Dict[str, type]) -> pl.DataFrame:
+    """
+    Cast the columns of `df` that are described in `schema`
+    """
+    return df.cast(
+        {column: dtype for column, dtype in schema.items() if column in df.columns}
+    )
+
+
+def write_cache(
+    batch_identifier: str, name: str, df: pl.DataFrame, schema: Dict[str, type]
+) -> pl.DataFrame:
+    df = apply_schema(df, schema)
+    # Written aside then renamed, the previous file may still be memory-mapped
+    arrow_file = cache_file(batch_identifier, name)
+    df.write_ipc(f"{arrow_file}.tmp", compression="uncompressed")
+    os.replace(f"{arrow_file}.tmp", arrow_file)
+    return df
+
+
+def read_cache(
+    batch_identifier: str, name: str, schema: Dict[str, type]
+) -> Optional[pl.DataFrame]:
+    """
+    Memory-map the `name` cache of the batch, None if it was never written
+    """
+    arrow_file = cache_file(batch_identifier, name)
+    if os.path.exists(arrow_file):
+        print("Returning content from :", arrow_file)
+        # Uncompressed IPC files are memory-mapped by read_ipc
+        return pl.read_ipc(arrow_file)
+
+    csv_file = cache_file(batch_identifier, name, extension="csv")
+    if os.path.exists(csv_file):
+        print("Converting CSV cache :", csv_file, "to", arrow_file)
+        return write_cache(
+            batch_identifier,
+            name,
+            pl.read_csv(csv_file, schema_overrides=schema),
+            schema,
+        )
+    return None
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(path: str, hash_content: bool = False) -> tuple:
+    """
+    (path, size, mtime, hash) of an input file, size and mtime are None if it does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (path, None, None, None)
+    return (
+        path,
+        stat.st_size,
+        stat.st_mtime_ns,
+        file_hash(path) if hash_content else None,
+    )
+
+
+def partition_file_name(partition: str) -> str:
+    return hashlib.sha1(partition.encode()).hexdigest() + ".arrow"
+
+
+def read_manifest(cache_directory: str) -> pl.DataFrame:
+    manifest_file = os.path.join(cache_directory, MANIFEST_FILE_NAME)
+    if os.path.exists(manifest_file):
+        return pl.read_parquet(manifest_file)
+    return pl.DataFrame(schema=schemas.cache_manifest_columns)
+
+
+def read_partitions(
+    cache_directory: str, files: List[str], schema: Dict[str, type]
+) -> pl.DataFrame:
+    frames = [
+        pl.read_ipc(os.path.join(cache_directory, file))
+        for file in files
+        if file is not None
+    ]
+    if not frames:
+        return pl.DataFrame(schema=schema)
+    # Kept as one chunk per partition, rechunking would copy the memory-mapped buffers
+    return pl.concat(frames, how="vertical", rechunk=False)
+
+
+def fingerprint_partitions(
+    partitions: Dict[str, List[str]], hash_content: bool = False
+) -> Dict[str, List[tuple]]:
+    """
+    Sorted input fingerprints of every partition of `partitions` ({partition: input files})
+    """
+    return {
+        partition: sorted(fingerprint(file, hash_content) for file in files)
+        for partition, files in partitions.items()
+    }
+
+
+def stored_partitions(cache_directory: str) -> Dict[str, tuple]:
+    """
+    {partition: (file, version, fingerprints)} of the manifest of a partitioned cache
+    """
+    stored = {}
+    for (partition,), rows in (
+        read_manifest(cache_directory)
+        .sort("path")
+        .group_by("partition", maintain_order=True)
+    ):
+        stored[partition] = (
+            rows.item(0, "file"),
+            rows.item(0, "version"),
+            list(rows.select("path", "size", "mtime", "hash").iter_rows()),
+        )
+    return stored
+
+
+def stale_partitions(
+    batch_identifier: str,
+    name: str,
+    fingerprints: Dict[str, List[tuple]],
+    version: int,
+) -> List[str]:
+    """
+    Partitions of `fingerprints` that are new, or whose inputs or loader version changed
+    """
+    stored = stored_partitions(cache_file(batch_identifier, name, extension="d"))
+    return [
+        partition
+        for partition, partition_fingerprints in fingerprints.items()
+        if partition not in stored
+        or stored[partition][1:] != (version, partition_fingerprints)
+    ]
+
+
+def store_partitions(
+    batch_identifier: str,
+    name: str,
+    fingerprints: Dict[str, List[tuple]],
+    built: Dict[str, Optional[pl.DataFrame]],
+    schema: Dict[str, type],
+    version: int,
+) -> pl.DataFrame:
+    """
+    Write the `built` partitions (None when a partition has no rows), update the
+    manifest and return the combined frame of all partitions.
+    Stale partitions missing from `built` could not be built, they are left out
+    of the manifest so the next load builds them again.
+    """
+    cache_directory = cache_file(batch_identifier, name, extension="d")
+    stored = stored_partitions(cache_directory)
+    os.makedirs(cache_directory, exist_ok=True)
+
+    manifest = []
+    failed = 0
+    for partition, partition_fingerprints in fingerprints.items():
+        if partition in built:
+            file = partition_file_name(partition)
+            if built[partition] is None:
+                file = None
+            else:
+                apply_schema(built[partition], schema).write_ipc(
+                    os.path.join(cache_directory, file), compression="uncompressed"
+                )
+        elif partition in stored and stored[partition][1:] == (
+            version,
+            partition_fingerprints,
+        ):
+            file = stored[partition][0]
+        else:
+            failed += 1
+            continue
+        manifest += [
+            (partition, file, *file_fingerprint, version)
+            for file_fingerprint in partition_fingerprints
+        ]
+
+    manifest_df = pl.from_records(
+        manifest, schema=schemas.cache_manifest_columns, orient="row"
+    )
+    # Files of partitions that disappeared or could not be built again
+    kept_files = set(manifest_df.get_column("file").drop_nulls().to_list())
+    for file, _version, _fingerprints in stored.values():
+        if file is not None and file not in kept_files:
+            os.remove(os.path.join(cache_directory, file))
+
+    manifest_df.write_parquet(os.path.join(cache_directory, MANIFEST_FILE_NAME))
+    print(
+        f"Cache {cache_directory} : {len(fingerprints)} partitions,",
+        f"{len(built)} built, {failed} failed",
+    )
+    return read_partitions(
+        cache_directory,
+        manifest_df.get_column("file").unique(maintain_order=True).to_list(),
+        schema,
+    )
+
+
+def load_partitioned(
+    batch_identifier: str,
+    name: str,
+    partitions: Dict[str, List[str]],
+    build_partition: Callable[[List[str]], Optional[pl.DataFrame]],
+    schema: Dict[str, type],
+    version: int,
+    hash_content: bool = False,
+) -> pl.DataFrame:
+    """
+    Return the `name` cache of the batch, made of one frame per entry of `partitions`
+    ({partition: input files}). A partition is built again with `build_partition(files)`
+    when its input fingerprints or `version` differ from the manifest, partitions that
+    no longer have inputs are dropped.
+    When no input is given the stored partitions, or a legacy single file cache, are returned.
+    """
+    cache_directory = cache_file(batch_identifier, name, extension="d")
+    if not partitions:
+        manifest_df = read_manifest(cache_directory)
+        if manifest_df.height > 0:
+            print("No input found, returning content from :", cache_directory)
+            return read_partitions(
+                cache_directory,
+                manifest_df.get_column("file").unique(maintain_order=True).to_list(),
+                schema,
+            )
+        legacy_df = read_cache(batch_identifier, name, schema)
+        return legacy_df if legacy_df is not None else pl.DataFrame(schema=schema)
+
+    fingerprints = fingerprint_partitions(partitions, hash_content)
+    built = {}
+    for partition in stale_partitions(batch_identifier, name, fingerprints, version):
+        try:
+            built[partition] = build_partition(partitions[partition])
+        except Exception as error:
+            print(
+                f"Partition {partition} could not be built :",
+                f"{type(error).__name__}: {error}",
+            )
+    return store_partitions(
+        batch_identifier, name, fingerprints, built, schema, version
+    )
+
+
+def load_partitioned_together(
+    batch_identifier: str,
+    name: str,
+    partitions: Dict[str, List[str]],
+    build_partitions: Callable[[List[str]], Dict[str, pl.DataFrame]],
+    schema: Dict[str, type],
+    version: int,
+    hash_content: bool = False,
+) -> pl.DataFrame:
+    """
+    load_partitioned for partitions built in a single pass, `build_partitions(stale)`
+    returns {partition: frame} for the stale partitions, those it leaves out are
+    built again next time. Nothing is built when no partition is stale.
+    """
+    if not partitions:
+        return load_partitioned(
+            batch_identifier, name, partitions, None, schema, version, hash_content
+        )
+    fingerprints = fingerprint_partitions(partitions, hash_content)
+    stale = stale_partitions(batch_identifier, name, fingerprints, version)
+    built = build_partitions(stale) if stale else {}
+    return store_partitions(
+        batch_identifier, name, fingerprints, built, schema, version
+    )
@@ -0,0 +1,252 @@
+import os
+import re
+import polars as pl
+from typing import Dict, List
+
+import schemas
+
+# Catalog of a results tree, one row per file, stored as Parquet next to the batch
+# caches
+# Paths follow the following format :
+# <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/<FILE>
+#
+# The tree is walked once, later refreshes only list node directories whose mtime
+# changed.
+# rsync replaces files through a rename, which updates the mtime of their directory.
+# Appending to a file (`>>`) leaves the mtime of its directory unchanged, so the files
+# of unchanged directories are still stat'ed and their size and mtime refreshed.
+#
+# A catalog is loaded once per session, files written afterwards are only seen
+# once it is reloaded with load_catalog(refresh=True).
+
+CATALOG_FILE_NAME = "catalog.parquet"
+
+# (run_kind, regex) tried in order, named groups fill the corresponding catalog columns
+FILE_PATTERNS = [
+    (
+        "temperatures",
+        re.compile(
+            r"^temperatures_frequency_(?P<target_frequency>\d+)"
+            r"_(?P<tool>[a-z0-9]+)_and_(?P<companion_tool>[a-z0-9]+)\.csv$"
+        ),
+    ),
+    (
+        "temperatures",
+        re.compile(
+            r"^(?P<tool>[a-z0-9]+)_and_(?P<companion_tool>[a-z0-9]+)"
+            r"_(?P<nb_core>\d+)_(?P<nb_ops_per_core>\d+)_temperatures\.csv$"
+        ),
+    ),
+    (
+        "frequency",
+        re.compile(
+            r"^frequency_(?P<target_frequency>\d+)_(?P<tool>[a-z0-9]+)"
+            r"_and_(?P<companion_tool>[a-z0-9]+)(\.csv|_\d+\.json)?$"
+        ),
+    ),
+    (
+        "consumption",
+        re.compile(
+            r"^(?P<tool>[a-z0-9]+)_(and_(?P<companion_tool>[a-z0-9]+)|alone)"
+            r"_(?P<nb_core>\d+)_(?P<nb_ops_per_core>\d+)(\.csv)?$"
+        ),
+    ),
+    ("baseline", re.compile(r"^(?P<tool>baseline)_consumption\.csv$")),
+]
+
+# Catalogs already loaded during this session, by results directory
+_catalogs: Dict[str, pl.DataFrame] = {}
+
+
+def catalog_path(results_directory: str) -> str:
+    # ../data/<BATCH>.d/results-<BATCH>.d -> ../data/<BATCH>.d/catalog.parquet
+    return os.path.join(
+        os.path.dirname(os.path.normpath(results_directory)), CATALOG_FILE_NAME
+    )
+
+
+def parse_file_name(name: str) -> Dict[str, object]:
+    """
+    Extract the run kind, tools, configuration and target frequency from a results
+    file name
+    """
+    for run_kind, pattern in FILE_PATTERNS:
+        match = pattern.match(name)
+        if match:
+            metadata = {"run_kind": run_kind, **match.groupdict()}
+            if metadata["tool"] == "baseline":
+                metadata["tool"] = "perf"
+            for column in ["nb_core", "nb_ops_per_core", "target_frequency"]:
+                if metadata.get(column) is not None:
+                    metadata[column] = int(metadata[column])
+            return metadata
+    return {"run_kind": None}
+
+
+def scan_node_directory(
+    site: str, g5k_cluster: str, node: os.DirEntry, node_mtime: int
+) -> List[tuple]:
+    rows = []
+    for entry in os.scandir(node.path):
+        if not entry.is_file():
+            continue
+        stat = entry.stat()
+        metadata = parse_file_name(entry.name)
+        rows.append(
+            (
+                entry.path,
+                entry.name,
+                site,
+                g5k_cluster,
+                node.name,
+                metadata.get("tool"),
+                metadata.get("companion_tool"),
+                metadata["run_kind"],
+                metadata.get("nb_core"),
+                metadata.get("nb_ops_per_core"),
+                metadata.get("target_frequency"),
+                stat.st_size,
+                stat.st_mtime_ns,
+                node_mtime,
+                None,
+            )
+        )
+    return rows
+
+
+def refresh_file_stats(catalog_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Size and mtime of the files of `catalog_df` stat'ed again, files appended to
+    in place keep the mtime of their directory
+    """
+    stats = [os.stat(path) for path in catalog_df.get_column("path")]
+    return catalog_df.with_columns(
+        pl.Series("size", [stat.st_size for stat in stats], dtype=pl.Int64),
+        pl.Series("mtime", [stat.st_mtime_ns for stat in stats], dtype=pl.Int64),
+    )
+
+
+def build_catalog(results_directory: str, full: bool = False) -> pl.DataFrame:
+    """
+    Build or refresh the catalog of `results_directory` and store it as Parquet.
+    Node directories whose mtime did not change since the stored catalog are not
+    listed again unless `full` is set, only their files are stat'ed again.
+    """
+    if not os.path.isdir(results_directory):
+        print(f"No results directory {results_directory}, empty catalog")
+        return pl.DataFrame(schema=schemas.catalog_columns)
+    catalog_file = catalog_path(results_directory)
+    previous_df = None
+    if os.path.exists(catalog_file):
+        previous_df = pl.read_parquet(catalog_file)
+        # Catalogs stored before a column was added are built again
+        if previous_df.columns != list(schemas.catalog_columns):
+            previous_df = None
+    previous_node_mtimes = {}
+    if previous_df is not None and not full:
+        previous_node_mtimes = dict(
+            previous_df.select(
+                pl.col("path").str.extract(r"^(.*)/[^/]+$").alias("node_path"),
+                "node_mtime",
+            )
+            .unique()
+            .iter_rows()
+        )
+
+    rows = []
+    unchanged_node_paths = []
+    for site in os.scandir(results_directory):
+        if not site.is_dir():
+            continue
+        for g5k_cluster in os.scandir(site.path):
+            if not g5k_cluster.is_dir():
+                continue
+            for node in os.scandir(g5k_cluster.path):
+                if not node.is_dir():
+                    continue
+                node_mtime = node.stat().st_mtime_ns
+                if previous_node_mtimes.get(node.path) == node_mtime:
+                    unchanged_node_paths.append(node.path)
+                    continue
+                rows += scan_node_directory(
+                    site.name, g5k_cluster.name, node, node_mtime
+                )
+
+    catalog_df = pl.from_records(rows, schema=schemas.catalog_columns, orient="row")
+    if unchanged_node_paths:
+        catalog_df = pl.concat(
+            [
+                refresh_file_stats(
+                    previous_df.filter(
+                        pl.col("path")
+                        .str.extract(r"^(.*)/[^/]+$")
+                        .is_in(unchanged_node_paths)
+                    )
+                ),
+                catalog_df,
+            ]
+        )
+    if previous_df is not None:
+        # Duplicate counts of files left unchanged since they were ingested
+        catalog_df = catalog_df.update(
+            previous_df.select("path", "size", "mtime", "duplicates"),
+            on=["path", "size", "mtime"],
+            how="left",
+        )
+    catalog_df = catalog_df.sort("path")
+    print(
+        f"Catalog of {results_directory} : {catalog_df.height} files,",
+        f"{len(unchanged_node_paths)} unchanged node directories",
+    )
+    catalog_df.write_parquet(catalog_file)
+    return catalog_df
+
+
+def load_catalog(results_directory: str, refresh: bool = False) -> pl.DataFrame:
+    """
+    Return the catalog of `results_directory`, built or refreshed once per session
+    unless `refresh` is set. Set `refresh` after results were added or appended to
+    during the session.
+    """
+    if refresh or results_directory not in _catalogs:
+        _catalogs[results_directory] = build_catalog(results_directory)
+    return _catalogs[results_directory]
+
+
+def record_duplicates(results_directory: str, duplicates: Dict[str, int]) -> None:
+    """
+    Store the number of repeated samples dropped at ingest, by file path
+    """
+    counts_df = pl.DataFrame(
+        {"path": list(duplicates), "duplicates": list(duplicates.values())},
+        schema={"path": pl.String, "duplicates": pl.Int64},
+    )
+    catalog_df = load_catalog(results_directory).update(
+        counts_df, on="path", how="left"
+    )
+    _catalogs[results_directory] = catalog_df
+    catalog_df.write_parquet(catalog_path(results_directory))
+
+
+def query(results_directory: str, **filters) -> pl.DataFrame:
+    """
+    Catalog rows matching every `column=value` filter,
+    e.g. query(dir, tool="hwpc", run_kind="frequency")
+    """
+    catalog_df = load_catalog(results_directory)
+    for column, value in filters.items():
+        catalog_df = catalog_df.filter(pl.col(column) == value)
+    return catalog_df
+
+
+def find_files(root_dir: str = "", regex: str = "") -> List[str]:
+    """
+    Catalog based equivalent of utils.find_files, `regex` is matched at the start of
+    file names
+    """
+    return (
+        load_catalog(root_dir)
+        .filter(pl.col("name").str.contains(f"^(?:{regex})"))
+        .get_column("path")
+        .to_list()
+    )
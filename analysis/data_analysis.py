@@ -8,6 +8,8 @@ import gc
 
 import schemas
 import load
+import processors
+import frequencies as reached_frequency
 import rq1
 import rq2
 import rq3
@@ -29,192 +31,7 @@ palette_for_tools = {
     "vjoule": "#9f2281",
 }
 
-vendor_generation_map = {
-    "E5-2620 v4": {
-        "architecture": "Broadwell-E",
-        "vendor": "Intel",
-        "generation": 6,
-        "launch_date": "Q1 2016",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "E5-2630L v4": {
-        "architecture": "Broadwell-E",
-        "vendor": "Intel",
-        "generation": 6,
-        "launch_date": "Q1 2016",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "E5-2698 v4": {
-        "architecture": "Broadwell-E",
-        "vendor": "Intel",
-        "generation": 6,
-        "launch_date": "Q1 2016",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "E5-2630 v3": {
-        "architecture": "Haswell-E",
-        "vendor": "Intel",
-        "generation": 5,
-        "launch_date": "Q3 2014",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "Gold 5220": {
-        "architecture": "Cascade Lake-SP",
-        "vendor": "Intel",
-        "generation": 10,
-        "launch_date": "Q2 2019",
-        "numa_nodes_number": "1",
-        "numa_nodes_first_cpus": [0],
-    },
-    "Gold 5218": {
-        "architecture": "Cascade Lake-SP",
-        "vendor": "Intel",
-        "generation": 10,
-        "launch_date": "Q2 2019",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "i7-9750H": {
-        "architecture": "Coffee Lake",
-        "vendor": "Intel",
-        "generation": 9,
-        "launch_date": "Q2 2019",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "Silver 4314": {
-        "architecture": "Ice Lake-SP",
-        "vendor": "Intel",
-        "generation": 10,
-        "launch_date": "Q2 2021",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "Gold 5320": {
-        "architecture": "Ice Lake-SP",
-        "vendor": "Intel",
-        "generation": 10,
-        "launch_date": "Q2 2021",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "Gold 6126": {
-        "architecture": "Skylake-SP",
-        "vendor": "Intel",
-        "generation": 6,
-        "launch_date": "Q3 2017",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "Gold 6130": {
-        "architecture": "Skylake-SP",
-        "vendor": "Intel",
-        "generation": 6,
-        "launch_date": "Q3 2017",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "E5-2620": {
-        "architecture": "Sandy Bridge-EP",
-        "vendor": "Intel",
-        "generation": 3,
-        "launch_date": "Q1 2012",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "E5-2630": {
-        "architecture": "Sandy Bridge-EP",
-        "vendor": "Intel",
-        "generation": 3,
-        "launch_date": "Q1 2012",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "E5-2630L": {
-        "architecture": "Sandy Bridge-EP",
-        "vendor": "Intel",
-        "generation": 3,
-        "launch_date": "Q1 2012",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "E5-2660": {
-        "architecture": "Sandy Bridge-EP",
-        "vendor": "Intel",
-        "generation": 3,
-        "launch_date": "Q1 2012",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "X5670": {
-        "architecture": "Westmere-EP",
-        "vendor": "Intel",
-        "generation": 1,
-        "launch_date": "Q1 2010",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "7301": {
-        "architecture": "Zen",
-        "vendor": "AMD",
-        "generation": 1,
-        "launch_date": "Q2 2017",
-        "numa_nodes_number": "8",
-        "numa_nodes_first_cpus": [0, 1, 2, 3, 4, 5, 6, 7],
-    },
-    "7352": {
-        "architecture": "Zen 2",
-        "vendor": "AMD",
-        "generation": 2,
-        "launch_date": "Q3 2019",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "7452": {
-        "architecture": "Zen 2",
-        "vendor": "AMD",
-        "generation": 2,
-        "launch_date": "Q3 2019",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "7642": {
-        "architecture": "Zen 2",
-        "vendor": "AMD",
-        "generation": 2,
-        "launch_date": "Q3 2019",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "7742": {
-        "architecture": "Zen 2",
-        "vendor": "AMD",
-        "generation": 2,
-        "launch_date": "Q3 2019",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "250": {
-        "architecture": "Opteron",
-        "vendor": "AMD",
-        "generation": 1,
-        "launch_date": "Q4 2004",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-    "99xx": {
-        "architecture": "ThunderX2",
-        "vendor": "Cavium",
-        "generation": 1,
-        "launch_date": "Q2 2016",
-        "numa_nodes_number": "2",
-        "numa_nodes_first_cpus": [0, 1],
-    },
-}
+vendor_generation_map = processors.vendor_generation_map()
 
 
 def main(batch_identifier=""):
@@ -387,42 +204,22 @@ def main(batch_identifier=""):
 
 
 def target_vs_reached_frequency(frequency_df, frequencies, metadatada):
-    target_frequencies = []
-    reached_frequencies = []
-    for frequency in frequencies:
-        timestamps = frequency_df.sql(
-            f"SELECT timestamp FROM self WHERE frequency = {frequency} AND iteration = 1 AND node = 'parasilo-24'"
-        ).to_numpy()
-        shapes = timestamps.shape
-        timestamps = np.sort(timestamps.reshape(1, shapes[0]))
-        # t2 - t1
-        intervals = timestamps[0, 1:] - timestamps[0, :-1]
-        print(f"Intervals {metadatada['tool']}: \n", intervals[:5])
-        if metadatada["unit"] == "milliseconds":
-            instant_frequencies = 1_000 / intervals
-        elif metadatada["unit"] == "seconds":
-            instant_frequencies = 1 / intervals
-        print(f"Instant frequencies {metadatada['tool']}: \n", instant_frequencies[:5])
-        reached_frequencies += instant_frequencies.tolist()
-        target_frequencies += [frequency] * len(instant_frequencies)
-        del timestamps
-        gc.collect()
-
-    print(
-        "target_frequencies : ",
-        target_frequencies[:10],
-        target_frequencies[100:110],
-        target_frequencies[1000:1010],
-        target_frequencies[4000:4010],
+    reached_df = reached_frequency.reached_frequencies(
+        {metadatada["tool"]: frequency_df},
+        units={metadatada["tool"]: metadatada["unit"]},
+    ).filter(
+        pl.col("target_frequency").is_in(frequencies),
+        pl.col("iteration") == 1,
+        pl.col("node") == "parasilo-24",
     )
     print(
-        "reached_frequencies : ",
-        reached_frequencies[:10],
-        reached_frequencies[100:110],
-        reached_frequencies[1000:1010],
-        reached_frequencies[4000:4010],
+        f"Intervals {metadatada['tool']}: \n",
+        reached_frequency.interval_summary(reached_df),
+    )
+    # Mean and 2.5-97.5 percentile band of every sample, computed exactly
+    visualization.plot_frequency_bands(
+        reached_frequency.reached_frequency_bands(reached_df), err_style="band"
     )
-    sns.lineplot(x=target_frequencies, y=reached_frequencies, errorbar="pi")
     sns.lineplot(x=[1, 1_000], y=[1, 1_000], label=f"f(x)=x", linestyle="dashed")
     plt.xscale("log")
     plt.xlabel("Target frequency (Hz)")
@@ -0,0 +1,225 @@
+import os
+import tempfile
+import polars as pl
+from typing import List, Union
+
+import moments
+import schemas
+import sketches
+
+# Statistics of the energy facts, one row per (node, task, nb_core, nb_ops_per_core)
+# typed after schemas.stats_fact_columns. Groups are keyed by the narrow fact key
+# only, node attributes are joined afterwards, see inventories.attach_nodes.
+#
+# The streaming mode computes the same statistics out of core. Energy rows are
+# scanned lazily from the results files, see load.load_results(lazy=True), and
+# spilled to a Parquet file with a streaming sink, then aggregated a few nodes at
+# a time. Every group belongs to a single node, so aggregating node chunks
+# separately gives exactly the rows of the in-memory query, medians and
+# quantiles included. A chunk holds as many nodes as fit in the memory budget,
+# a node larger than the budget is aggregated alone.
+
+DEFAULT_MEMORY_BUDGET = 4 << 30
+SPILL_FILE_NAME = "energy.parquet"
+# Rows read to estimate the in-memory size of a spilled row
+SIZE_SAMPLE_ROWS = 10_000
+
+STATS_KEYS = ["node", "task", "nb_core", "nb_ops_per_core"]
+STATS_KEY_COLUMNS = {key: schemas.stats_fact_columns[key] for key in STATS_KEYS}
+DOMAINS = ["pkg", "cores", "ram"]
+
+
+def domain_statistics(
+    domain: str, quantiles: bool = True, averages: bool = True
+) -> List[pl.Expr]:
+    """
+    Aggregations of the energy_<domain> column, medians and 25/75 quantiles
+    are left out without `quantiles`, the other statistics without `averages`
+    """
+    energy = pl.col(f"energy_{domain}")
+    statistics = []
+    if averages:
+        statistics += [
+            energy.mean().alias(f"{domain}_average"),
+            energy.min().alias(f"{domain}_minimum"),
+            energy.max().alias(f"{domain}_maximum"),
+            energy.std().alias(f"{domain}_standard_deviation"),
+            (energy.std() / energy.mean()).alias(
+                f"{domain}_coefficient_of_variation"
+            ),
+        ]
+    if quantiles:
+        statistics += [
+            energy.median().alias(f"{domain}_median"),
+            energy.quantile(0.25, interpolation="linear").alias(
+                f"{domain}_quantile_25"
+            ),
+            energy.quantile(0.75, interpolation="linear").alias(
+                f"{domain}_quantile_75"
+            ),
+        ]
+    return statistics
+
+
+def cast_stats(
+    energy_stats_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    return energy_stats_df.select(
+        [
+            pl.col(column).cast(dtype)
+            for column, dtype in schemas.stats_fact_columns.items()
+        ]
+    )
+
+
+def moment_stats(
+    moments_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    <domain>_average, _minimum, _maximum, _standard_deviation and
+    _coefficient_of_variation columns served from stored moments, see moments.py
+    """
+    moments_df = moments.moment_statistics(
+        moments.merge_moments(moments_df, keys=STATS_KEYS + ["domain"])
+    )
+    statistics = {
+        "mean": "average",
+        "minimum": "minimum",
+        "maximum": "maximum",
+        "standard_deviation": "standard_deviation",
+        "coefficient_of_variation": "coefficient_of_variation",
+    }
+    return moments_df.group_by(STATS_KEYS).agg(
+        [
+            pl.col(column).filter(pl.col("domain") == domain).first().alias(
+                f"{domain}_{statistic}"
+            )
+            for domain in DOMAINS
+            for column, statistic in statistics.items()
+        ]
+    ).cast(STATS_KEY_COLUMNS)
+
+
+def energy_stats(
+    energy_df: Union[pl.DataFrame, pl.LazyFrame],
+    quantile_sketch_accuracy: float = None,
+    moments_df: Union[pl.DataFrame, pl.LazyFrame] = None,
+    sketch_df: Union[pl.DataFrame, pl.LazyFrame] = None,
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    In-memory statistics of the `energy_df` facts, lazy if `energy_df` is.
+    With a `quantile_sketch_accuracy` medians and quantiles are estimated from
+    mergeable sketches of that relative accuracy instead of sorting every group,
+    see sketches.py. They are estimated from `sketch_df` when given, e.g. the
+    sketches stored for the batch, instead of sketching `energy_df`.
+    With `moments_df` averages, extrema, standard deviations and coefficients of
+    variation are served from these moments instead of the energy rows.
+    """
+    exact_quantiles = quantile_sketch_accuracy is None
+    energy_stats_df = energy_df.group_by(STATS_KEYS).agg(
+        [
+            statistic
+            for domain in DOMAINS
+            for statistic in domain_statistics(
+                domain, quantiles=exact_quantiles, averages=moments_df is None
+            )
+        ]
+    )
+    if moments_df is not None:
+        if isinstance(energy_stats_df, pl.LazyFrame):
+            moments_df = moments_df.lazy()
+        energy_stats_df = energy_stats_df.join(
+            moment_stats(moments_df), on=STATS_KEYS, how="left", nulls_equal=True
+        )
+    if not exact_quantiles:
+        if sketch_df is None:
+            sketch_df = sketches.build_sketches(energy_df, quantile_sketch_accuracy)
+        elif isinstance(energy_stats_df, pl.LazyFrame):
+            sketch_df = sketch_df.lazy()
+        energy_stats_df = energy_stats_df.join(
+            sketches.sketch_statistics(sketch_df).cast(STATS_KEY_COLUMNS),
+            on=STATS_KEYS,
+            how="left",
+            nulls_equal=True,
+        )
+    return cast_stats(energy_stats_df)
+
+
+def node_chunks(
+    node_rows: pl.DataFrame, row_size: float, memory_budget: int
+) -> List[List[str]]:
+    """
+    Nodes of `node_rows` (node, rows) grouped so that each chunk holds
+    at most `memory_budget` bytes of rows of `row_size` bytes
+    """
+    chunks = []
+    chunk, chunk_size = [], 0
+    for node, rows in node_rows.sort("node").iter_rows():
+        size = rows * row_size
+        if chunk and chunk_size + size > memory_budget:
+            chunks.append(chunk)
+            chunk, chunk_size = [], 0
+        chunk.append(node)
+        chunk_size += size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def streaming_energy_stats(
+    energy_df: pl.LazyFrame,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    spill_directory: str = None,
+    quantile_sketch_accuracy: float = None,
+    moments_df: pl.DataFrame = None,
+    sketch_df: pl.DataFrame = None,
+) -> pl.DataFrame:
+    """
+    Statistics of `energy_df` computed with at most about `memory_budget` bytes of
+    energy rows in memory. Rows are spilled to `spill_directory`, a temporary
+    directory removed afterwards by default.
+    `energy_df` must be scanned lazily, rows already in memory gain nothing from
+    a round trip to disk and are aggregated by energy_stats.
+    """
+    if not isinstance(energy_df, pl.LazyFrame):
+        raise TypeError(
+            "Streaming energy stats need a LazyFrame, see load.load_results(lazy=True)"
+        )
+    with tempfile.TemporaryDirectory(dir=spill_directory) as directory:
+        spill_file = os.path.join(directory, SPILL_FILE_NAME)
+        energy_df.sink_parquet(spill_file)
+
+        spilled_df = pl.scan_parquet(spill_file)
+        node_rows = (
+            spilled_df.group_by("node")
+            .agg(pl.len().alias("rows"))
+            .collect(engine="streaming")
+        )
+        sample_df = spilled_df.head(SIZE_SAMPLE_ROWS).collect()
+        row_size = sample_df.estimated_size() / max(sample_df.height, 1)
+        chunks = node_chunks(node_rows, row_size, memory_budget)
+        print(
+            f"Streaming energy stats : {node_rows.get_column('rows').sum()} rows,",
+            f"{node_rows.height} nodes in {len(chunks)} chunks",
+        )
+
+        frames = [
+            energy_stats(
+                spilled_df.filter(pl.col("node").is_in(chunk)).collect(),
+                quantile_sketch_accuracy=quantile_sketch_accuracy,
+                moments_df=(
+                    None
+                    if moments_df is None
+                    else moments_df.filter(pl.col("node").is_in(chunk))
+                ),
+                sketch_df=(
+                    None
+                    if sketch_df is None
+                    else sketch_df.filter(pl.col("node").is_in(chunk))
+                ),
+            )
+            for chunk in chunks
+        ]
+    if not frames:
+        return pl.DataFrame(schema=schemas.stats_fact_columns)
+    return pl.concat(frames, how="vertical")
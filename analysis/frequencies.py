@@ -0,0 +1,206 @@
+import math
+import polars as pl
+from typing import Dict, List, Union
+
+import schemas
+import tool_specs
+
+# Reached sampling frequencies of the frequency runs
+# Intervals between consecutive samples and the instantaneous frequency they
+# give are computed for every tool, node, target frequency and iteration in a
+# single sorted pass, instead of one query and one Python loop per target.
+#
+# Timestamps are used in the unit each tool writes them in, HWPC reports epoch
+# milliseconds and the other tools epoch seconds, so reached frequencies are
+# the same values as 1 / interval computed by hand in that unit.
+#
+# Figures are drawn from exact summaries per (tool, target frequency) : percentiles,
+# percentile interval bands and log-spaced histograms of every reached frequency,
+# whatever the number of samples, instead of a random sample of them.
+
+UNIT_SECONDS = {
+    "nanoseconds": 1e-9,
+    "milliseconds": 1e-3,
+    "seconds": 1.0,
+}
+TIMESTAMP_UNITS = {
+    tool: tool_specs.timestamp_unit(spec) for tool, spec in tool_specs.TOOL_SPECS.items()
+}
+RUN_KEYS = ["tool", "g5k_cluster", "node", "target_frequency", "iteration"]
+SUMMARY_KEYS = ["tool", "target_frequency"]
+# Percentiles of the summaries, the 2.5-97.5 band is seaborn's errorbar="pi"
+SUMMARY_PERCENTILES = [2.5, 25, 50, 75, 97.5]
+
+
+def tool_timestamps(
+    frequency_df: Union[pl.DataFrame, pl.LazyFrame],
+    tool: str,
+    unit: str,
+    timestamp_column: str = "timestamp",
+) -> pl.LazyFrame:
+    if unit not in UNIT_SECONDS:
+        raise ValueError(
+            f"Unknown timestamp unit {unit}, expected one of {list(UNIT_SECONDS)}"
+        )
+    return frequency_df.lazy().select(
+        pl.lit(tool).alias("tool"),
+        "g5k_cluster",
+        "node",
+        pl.col("frequency").alias("target_frequency"),
+        "iteration",
+        pl.col(timestamp_column).cast(pl.Float64).alias("timestamp"),
+        pl.lit(UNIT_SECONDS[unit]).alias("unit_seconds"),
+    )
+
+
+def reached_frequencies(
+    frequency_dfs: Dict[str, Union[pl.DataFrame, pl.LazyFrame]],
+    units: Dict[str, str] = TIMESTAMP_UNITS,
+    timestamp_column: str = "timestamp",
+) -> pl.DataFrame:
+    """
+    One row per pair of consecutive samples of every run of `frequency_dfs`
+    ({tool: frequency frame}), typed after schemas.reached_frequency_columns.
+    `units` gives the unit of the `timestamp_column` of each tool, use
+    timestamp_column="timestamp_ns" and "nanoseconds" for normalized timestamps.
+    """
+    interval = pl.col("timestamp").diff().over(RUN_KEYS)
+    return (
+        pl.concat(
+            [
+                tool_timestamps(frequency_df, tool, units[tool], timestamp_column)
+                for tool, frequency_df in frequency_dfs.items()
+            ],
+            how="vertical_relaxed",
+        )
+        .sort(RUN_KEYS + ["timestamp"])
+        .with_columns(interval.alias("interval"))
+        .drop_nulls("interval")
+        .select(
+            RUN_KEYS
+            + [
+                (pl.col("timestamp") * pl.col("unit_seconds")).alias("timestamp"),
+                (pl.col("interval") * pl.col("unit_seconds")).alias("interval"),
+                (1.0 / pl.col("unit_seconds") / pl.col("interval")).alias(
+                    "reached_frequency"
+                ),
+            ]
+        )
+        .cast(schemas.reached_frequency_columns)
+        .collect()
+    )
+
+
+def interval_summary(
+    reached_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Sampling interval statistics of every run, typed after
+    schemas.interval_summary_columns
+    """
+    interval = pl.col("interval")
+    return (
+        reached_df.group_by(RUN_KEYS)
+        .agg(
+            pl.len().alias("intervals"),
+            interval.mean().alias("interval_average"),
+            interval.std().alias("interval_standard_deviation"),
+            interval.min().alias("interval_minimum"),
+            interval.median().alias("interval_median"),
+            interval.quantile(0.95, interpolation="linear").alias("interval_quantile_95"),
+            interval.max().alias("interval_maximum"),
+            (pl.len() / interval.sum()).alias("reached_frequency_average"),
+        )
+        .sort(RUN_KEYS)
+        .cast(schemas.interval_summary_columns)
+    )
+
+
+def finite_frequencies(
+    reached_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Reached frequencies of `reached_df` without the infinite ones of
+    samples sharing a timestamp
+    """
+    return reached_df.filter(pl.col("reached_frequency").is_finite())
+
+
+def percentile_column(percentile: float) -> str:
+    return "percentile_" + f"{percentile:g}".replace(".", "_")
+
+
+def reached_frequency_bands(
+    reached_df: Union[pl.DataFrame, pl.LazyFrame],
+    percentiles: List[float] = SUMMARY_PERCENTILES,
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Exact mean and `percentiles` of the finite reached frequencies per
+    (tool, target_frequency), percentile_<p> columns with "." replaced by "_"
+    """
+    reached = pl.col("reached_frequency")
+    return (
+        reached_df.group_by(SUMMARY_KEYS)
+        .agg(
+            pl.len().alias("samples"),
+            (~reached.is_finite()).sum().alias("non_finite_samples"),
+            reached.filter(reached.is_finite()).mean().alias("mean"),
+            *[
+                reached.filter(reached.is_finite())
+                .quantile(percentile / 100, interpolation="linear")
+                .alias(percentile_column(percentile))
+                for percentile in percentiles
+            ],
+        )
+        .sort(SUMMARY_KEYS)
+    )
+
+
+def reached_frequency_histogram(
+    reached_df: Union[pl.DataFrame, pl.LazyFrame],
+    bins: int = 64,
+    minimum: float = None,
+    maximum: float = None,
+) -> pl.DataFrame:
+    """
+    Counts of finite reached frequencies in `bins` log-spaced bins per
+    (tool, target_frequency), typed after schemas.frequency_histogram_columns.
+    Bins span [`minimum`, `maximum`], the range of the data by default,
+    values outside are counted in the first or last bin.
+    """
+    reached_df = finite_frequencies(reached_df.lazy()).filter(
+        pl.col("reached_frequency") > 0
+    )
+    if minimum is None or maximum is None:
+        low, high = (
+            reached_df.select(
+                pl.col("reached_frequency").min().alias("minimum"),
+                pl.col("reached_frequency").max().alias("maximum"),
+            )
+            .collect()
+            .row(0)
+        )
+        if low is None:
+            return pl.DataFrame(schema=schemas.frequency_histogram_columns)
+        minimum = low if minimum is None else minimum
+        maximum = high if maximum is None else maximum
+    log_minimum = math.log10(minimum)
+    width = max(math.log10(maximum) - log_minimum, 1e-12) / bins
+    bin_index = (
+        ((pl.col("reached_frequency").log10() - log_minimum) / width)
+        .floor()
+        .clip(0, bins - 1)
+        .cast(pl.Int64)
+    )
+    return (
+        reached_df.group_by(SUMMARY_KEYS + [bin_index.alias("bin")])
+        .agg(pl.len().alias("count"))
+        .with_columns(
+            (10 ** (log_minimum + pl.col("bin") * width)).alias("bin_start"),
+            (10 ** (log_minimum + (pl.col("bin") + 1) * width)).alias("bin_end"),
+        )
+        .sort(SUMMARY_KEYS + ["bin"])
+        .select(list(schemas.frequency_histogram_columns))
+        .cast(schemas.frequency_histogram_columns)
+        .collect()
+    )
@@ -0,0 +1,61 @@
+import os
+import multiprocessing
+import polars as pl
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+import schemas
+
+# Parallel ingestion of the files listed by load.extract_csv_files
+# Polars releases the GIL while parsing, so a thread pool is usually enough,
+# a process pool can be used when readers spend time in Python code.
+# Polars' own thread pool does not survive fork(), worker processes are spawned.
+
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": partial(
+        ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")
+    ),
+}
+
+
+def ingest_files(
+    files_by_tool: Dict[str, Tuple[List[str], Callable]],
+    results_directory_match: str,
+    max_workers: int = None,
+    executor: str = "thread",
+) -> Tuple[Dict[str, List[pl.DataFrame]], pl.DataFrame]:
+    """
+    Read every file of `files_by_tool` ({tool: (files, reader)}) on a shared pool.
+    Returns the parsed parts of each tool, in the same order as the input files,
+    and an error report with one row per file that could not be read.
+    A failing file never aborts the run.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor {executor}, expected one of {list(EXECUTORS)}"
+        )
+    max_workers = max_workers or os.cpu_count()
+
+    parts = {tool: [] for tool in files_by_tool}
+    errors = []
+    with EXECUTORS[executor](max_workers=max_workers) as pool:
+        # Futures are submitted and collected in input order so outputs are deterministic
+        futures = [
+            (tool, file, pool.submit(reader, file, results_directory_match))
+            for tool, (files, reader) in files_by_tool.items()
+            for file in files
+        ]
+        for tool, file, future in futures:
+            try:
+                parts[tool].append(future.result())
+            except Exception as error:
+                errors.append((tool, file, f"{type(error).__name__}: {error}"))
+
+    errors_df = pl.from_records(
+        errors, schema=schemas.ingest_errors_columns, orient="row"
+    )
+    if errors_df.height > 0:
+        print(f"{errors_df.height} file(s) could not be ingested :", errors_df)
+    return parts, errors_df
@@ -0,0 +1,190 @@
+import os
+import hashlib
+import polars as pl
+from typing import Dict, List, Union
+
+import ingest
+import schemas
+
+try:
+    import orjson
+
+    def read_json(path: str) -> dict:
+        with open(path, "rb") as json_file:
+            return orjson.loads(json_file.read())
+
+except ImportError:
+    import json
+
+    def read_json(path: str) -> dict:
+        with open(path, "r") as json_file:
+            return json.load(json_file)
+
+
+# Grid5000 node inventories, one JSON file per node :
+# <INVENTORIES_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>.json
+#
+# Files are parsed in parallel and the frame is built once, then cached as
+# ../data/<BATCH>.d/inventory-<MANIFEST_DIGEST>.parquet where the digest covers
+# the path, size and mtime of every JSON file, any change builds a new cache.
+
+INVENTORY_FILE_PREFIX = "inventory-"
+
+
+def find_inventory_files(inventories_directory: str) -> List[str]:
+    files = []
+    for site in os.scandir(inventories_directory):
+        if not site.is_dir():
+            continue
+        for g5k_cluster in os.scandir(site.path):
+            if not g5k_cluster.is_dir():
+                continue
+            for node in os.scandir(g5k_cluster.path):
+                if node.name.endswith(".json"):
+                    files.append(node.path)
+    return sorted(files)
+
+
+def manifest_digest(files: List[str]) -> str:
+    digest = hashlib.sha1()
+    for file in files:
+        stat = os.stat(file)
+        digest.update(f"{file}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def optional(value, cast):
+    return None if value is None else cast(value)
+
+
+def read_node(path: str) -> tuple:
+    """
+    One row of schemas.inventory_columns from the JSON inventory of a node
+    """
+    data = read_json(path)
+    architecture = data.get("architecture", {})
+    processor = data.get("processor", {})
+    operating_system = data.get("operating_system", {})
+    site = os.path.basename(os.path.dirname(os.path.dirname(path)))
+    return (
+        data.get("uid"),
+        data.get("cluster"),
+        optional(data.get("exotic"), bool),
+        optional(architecture.get("nb_cores"), int),
+        optional(architecture.get("nb_threads"), int),
+        processor.get("vendor"),
+        optional(processor.get("clock_speed"), int),
+        processor.get("instruction_set"),
+        optional(processor.get("ht_capable"), bool),
+        processor.get("microarchitecture"),
+        processor.get("microcode"),
+        processor.get("model"),
+        processor.get("version"),
+        operating_system.get("cstate_driver"),
+        operating_system.get("cstate_governor"),
+        operating_system.get("pstate_driver"),
+        operating_system.get("pstate_governor"),
+        optional(operating_system.get("turboboost_enabled"), bool),
+        site,
+        processor.get("other_description"),
+    )
+
+
+def build_inventory(
+    files: List[str], max_workers: int = None, executor: str = "thread"
+) -> pl.DataFrame:
+    if executor not in ingest.EXECUTORS:
+        raise ValueError(
+            f"Unknown executor {executor}, expected one of {list(ingest.EXECUTORS)}"
+        )
+    rows = []
+    with ingest.EXECUTORS[executor](max_workers=max_workers) as pool:
+        futures = [(file, pool.submit(read_node, file)) for file in files]
+        for file, future in futures:
+            try:
+                rows.append(future.result())
+            except Exception as error:
+                print(f"Error reading {file}: {type(error).__name__}: {error}")
+    return pl.from_records(rows, schema=schemas.inventory_columns, orient="row")
+
+
+def load_nodes(
+    inventories_directory: str, max_workers: int = None, executor: str = "thread"
+) -> pl.DataFrame:
+    """
+    One row per node of `inventories_directory`, typed after schemas.inventory_columns
+    """
+    files = find_inventory_files(inventories_directory)
+    cache_directory = os.path.dirname(os.path.normpath(inventories_directory))
+    inventory_file = os.path.join(
+        cache_directory, f"{INVENTORY_FILE_PREFIX}{manifest_digest(files)}.parquet"
+    )
+    if os.path.exists(inventory_file):
+        print("Returning content from :", inventory_file)
+        return pl.read_parquet(inventory_file)
+
+    print(f"Loading inventory of {len(files)} nodes from :", inventories_directory)
+    nodes_df = build_inventory(files, max_workers=max_workers, executor=executor)
+    for entry in os.scandir(cache_directory):
+        if entry.name.startswith(INVENTORY_FILE_PREFIX) and entry.name.endswith(
+            ".parquet"
+        ):
+            os.remove(entry.path)
+    nodes_df.write_parquet(inventory_file)
+    return nodes_df
+
+
+def nodes_configuration(nodes_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    schemas.nodes_configuration_columns view, joined with consumption results
+    """
+    return nodes_df.select(list(schemas.nodes_configuration_columns))
+
+
+def node_dimension(nodes_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Node attributes of the energy star schema, one row per node, typed after
+    schemas.node_dimension_columns. `nodes_df` is an inventory with processors attached.
+    """
+    return (
+        nodes_df.rename({"uid": "node"})
+        .select(list(schemas.node_dimension_columns))
+        .cast(schemas.node_dimension_columns)
+    )
+
+
+def attach_nodes(
+    fact_df: Union[pl.DataFrame, pl.LazyFrame],
+    node_dimension_df: pl.DataFrame,
+    schema: Dict[str, type],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Presentation of energy facts : node attributes joined on the node key,
+    columns and keys typed after `schema`
+    """
+    if isinstance(fact_df, pl.LazyFrame):
+        node_dimension_df = node_dimension_df.lazy()
+    return fact_df.join(
+        node_dimension_df, on="node", how="left", validate="m:1"
+    ).select([pl.col(column).cast(dtype) for column, dtype in schema.items()])
+
+
+def cluster_summary(nodes_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    One row per cluster with its node count, processor and total number of cores
+    """
+    return (
+        nodes_df.group_by("g5k_cluster")
+        .agg(
+            pl.len().alias("node_count"),
+            pl.first("architecture_nb_cores").alias("cores_per_node"),
+            pl.first("processor_microarchitecture").alias("microarchitecture"),
+            pl.first("processor_vendor").alias("vendor"),
+            pl.first("processor_version").alias("version"),
+            pl.first("processor_other_description").alias("other_description"),
+        )
+        .with_columns(
+            (pl.col("node_count") * pl.col("cores_per_node")).alias("total_cores")
+        )
+        .rename({"g5k_cluster": "cluster"})
+    )
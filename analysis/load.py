@@ -2,406 +2,435 @@ import schemas
 from typing import *
 import polars as pl
 from tqdm import tqdm
-from math import ldexp
 import numpy as np
 import os
-import json
-import csv
 import re
+import zlib
 from typing import Tuple, List
-import utils
-from datetime import datetime
+import catalog
+import cache
+import ingest
+import inventories
+import processors
+import rapl
+import energy_stats
+import moments
+import sketches
+import perf_stat
+import samples
+import scaphandre
+import tool_specs
+from functools import partial
 import polars.selectors as cs
 
 TOOLS = ["hwpc", "codecarbon", "alumet", "scaphandre", "vjoule"]
 
+# Version of the code building each cache, bump it when a loader changes its output
+CACHE_VERSIONS = {
+    "perf_frequency": 3,
+    # Frequency samples of every tool spec, see load_samples
+    "samples": 4,
+    "scaphandre_reports": 1,
+    "baseline_consumption": 1,
+    "results": 1,
+}
+
 
 # Extract CSV to Polars DataFrames
 # Extract HWPC, Perf, Codecarbon, alumet, vjoule and scaphandre files
 
 
-def extract_csv_files(directory: str) -> Tuple[List[str], List[str]]:
+def extract_csv_files(
+    directory: str, where: pl.Expr = None
+) -> Tuple[List[str], List[str]]:
     """
-    TODO
+    Consumption CSV files of each tool, listed from the results catalog of `directory`.
+    `where` is an optional predicate on catalog columns (site, g5k_cluster, node,
+    nb_core, ...) so files of other clusters or configurations are never scanned.
     """
-    hwpc_files = []
-    perf_files = []
-    codecarbon_files = []
-    alumet_files = []
-    vjoule_files = []
-    scaphandre_files = []
-    for site in os.scandir(directory):
-        for g5k_g5k_cluster in os.scandir(site.path):
-            for node in os.scandir(g5k_g5k_cluster.path):
-                if node.is_dir():
-                    for filename in os.scandir(node.path):
-                        if filename.path.endswith(".csv"):
-                            if filename.name.startswith("hwpc"):
-                                hwpc_files.append(filename.path)
-                            elif filename.name.startswith("perf"):
-                                perf_files.append(filename.path)
-                            elif filename.name.startswith("codecarbon"):
-                                codecarbon_files.append(filename.path)
-                            elif filename.name.startswith("alumet"):
-                                alumet_files.append(filename.path)
-                            elif filename.name.startswith("vjoule"):
-                                vjoule_files.append(filename.path)
-                            elif filename.name.startswith("scaphandre"):
-                                scaphandre_files.append(filename.path)
+    consumption_files = catalog.query(directory, run_kind="consumption").filter(
+        pl.col("name").str.ends_with(".csv")
+    )
+    if where is not None:
+        consumption_files = consumption_files.filter(where)
+
+    def tool_files(tool):
+        return consumption_files.filter(pl.col("tool") == tool).get_column("path").to_list()
+
     return (
-        hwpc_files,
-        perf_files,
-        codecarbon_files,
-        alumet_files,
-        scaphandre_files,
-        vjoule_files,
+        tool_files("hwpc"),
+        tool_files("perf"),
+        tool_files("codecarbon"),
+        tool_files("alumet"),
+        tool_files("scaphandre"),
+        tool_files("vjoule"),
     )
 
 
-# Parse HWPC files, PKG, Cores or RAM can be missing, if so, we put a 0.0 value
-# Conversions are done later because measures as fixed point arithmetic (32.32) (needs to be ldexp(x, -32)ed)
+# Parse HWPC files, PKG, Cores or RAM can be missing, if so, we put a 0 value
+# Conversions are done later because measures as fixed point arithmetic (32.32) (needs to be ldexp(x, -32)ed, see rapl.py)
+# Files are scanned column-wise with the dtypes of schemas.py, no Python object is built per row
 
 
-def read_hwpc_csv(file_path: str, results_directory_match: str):
-    """ """
+def results_file_metadata(file_path: str, results_directory_match: str):
+    """
+    Extract (task, site, g5k_cluster, node) from a consumption results file path
+    """
     # Paths follow the following format :
     # <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/<TASK>_<NB_CORES>_<NB_OPS_PER_CORE>.csv
-    (site, g5k_g5k_cluster, node, task, nb_cores, nb_ops_per_core) = re.match(
+    (site, g5k_cluster, node, task, _nb_cores, _nb_ops_per_core) = re.match(
         results_directory_match, file_path
     ).groups()
-    parsed_and_converted_rows = []
-    with open(file_path, "r") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for raw_row in reader:
-            parsed_row = (
-                int(raw_row["timestamp"]),
-                raw_row["sensor"],
-                raw_row["target"],
-                int(raw_row["socket"]),
-                int(raw_row["cpu"]),
-                int(raw_row["rapl_energy_pkg"]) if raw_row["rapl_energy_pkg"] else 0,
-                int(raw_row["rapl_energy_dram"]) if raw_row["rapl_energy_dram"] else 0,
-                int(raw_row["rapl_energy_cores"])
-                if raw_row["rapl_energy_cores"]
-                else 0,
-                int(raw_row["time_enabled"]),
-                int(raw_row["time_running"]),
-                int(raw_row["nb_core"]),
-                int(raw_row["nb_ops_per_core"]),
-                int(raw_row["iteration"]),
-                task,
-                site,
-                g5k_g5k_cluster,
-                node,
-            )
-            parsed_and_converted_rows.append(parsed_row)
-    return parsed_and_converted_rows
+    return task, site, g5k_cluster, node
+
+
+def scan_results_csv(
+    file_path: str,
+    results_directory_match: str,
+    schema: Dict[str, type],
+    domains: List[str],
+    renames: Dict[str, str] = {},
+    scale: float = None,
+) -> pl.LazyFrame:
+    """
+    Lazily read a consumption results file into a frame typed after `schema`.
+    `renames` maps file columns to schema columns, `domains` that are missing or
+    empty are filled with 0 and multiplied by `scale` when given.
+    """
+    task, site, g5k_cluster, node = results_file_metadata(
+        file_path, results_directory_match
+    )
+    file_dtypes = {
+        source: schema[target] for source, target in renames.items()
+    } | schema
+    results_lf = pl.scan_csv(file_path, schema_overrides=file_dtypes)
+    file_columns = results_lf.collect_schema().names()
+    results_lf = results_lf.rename(
+        {source: target for source, target in renames.items() if source in file_columns}
+    )
+    file_columns = [renames.get(column, column) for column in file_columns]
+
+    domain_columns = []
+    for domain in domains:
+        if domain in file_columns:
+            domain_column = pl.col(domain).fill_null(0)
+            if scale is not None:
+                domain_column = domain_column * scale
+        else:
+            domain_column = pl.lit(0)
+        domain_columns.append(domain_column.cast(schema[domain]).alias(domain))
+
+    return results_lf.with_columns(
+        domain_columns,
+        task=pl.lit(task),
+        site=pl.lit(site),
+        g5k_cluster=pl.lit(g5k_cluster),
+        node=pl.lit(node),
+    ).select([pl.col(column).cast(dtype) for column, dtype in schema.items()])
+
+
+def socket_leader_cpus(socket_leaders_df: pl.DataFrame) -> Dict[str, List[int]]:
+    """
+    {node: socket leader CPUs} out of processors.socket_leaders
+    """
+    return {
+        node: cpus
+        for node, cpus in socket_leaders_df.group_by("node")
+        .agg(pl.col("cpu").sort())
+        .iter_rows()
+    }
+
+
+def socket_leaders_version(socket_leaders: Dict[str, List[int]]) -> int:
+    """
+    Cache version of HWPC results filtered on `socket_leaders`, changes with the table
+    """
+    digest = zlib.crc32(repr(sorted(socket_leaders.items())).encode())
+    return (CACHE_VERSIONS["results"] << 32) + digest
+
+
+def scan_hwpc_csv(
+    file_path: str,
+    results_directory_match: str,
+    socket_leaders: Dict[str, List[int]] = None,
+) -> pl.LazyFrame:
+    """
+    With `socket_leaders` ({node: cpus}) only the rows of socket leader CPUs are
+    kept while scanning, none if the node is missing from the table
+    """
+    hwpc_lf = scan_results_csv(
+        file_path,
+        results_directory_match,
+        schema=schemas.hwpc_columns,
+        domains=["rapl_energy_pkg", "rapl_energy_dram", "rapl_energy_cores"],
+    )
+    if socket_leaders is not None:
+        _task, _site, _g5k_cluster, node = results_file_metadata(
+            file_path, results_directory_match
+        )
+        hwpc_lf = hwpc_lf.filter(pl.col("cpu").is_in(socket_leaders.get(node, [])))
+    return hwpc_lf
+
+
+def read_hwpc_csv(
+    file_path: str,
+    results_directory_match: str,
+    socket_leaders: Dict[str, List[int]] = None,
+) -> pl.DataFrame:
+    return scan_hwpc_csv(file_path, results_directory_match, socket_leaders).collect()
+
+
+def count_csv_rows(files: List[str]) -> int:
+    """
+    Rows of `files`, counted without parsing their values
+    """
+    return sum(pl.scan_csv(file).select(pl.len()).collect().item() for file in files)
+
+
+def report_pruned_rows(hwpc_files: List[str], hwpc_df: pl.DataFrame) -> int:
+    """
+    Print and return the number of HWPC rows of other CPUs than socket leaders
+    that were dropped while reading `hwpc_files`, every file is scanned again
+    to count its rows
+    """
+    rows = count_csv_rows(hwpc_files)
+    pruned = rows - hwpc_df.height
+    print(
+        f"HWPC socket leaders : {hwpc_df.height} of {rows} rows kept,",
+        f"{pruned} pruned while reading",
+    )
+    return pruned
+
+
+def energy_facts(
+    results_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Fact rows of the energy star schema, typed after schemas.energy_fact_columns.
+    The tool is the first one named by the task of the run.
+    """
+    return results_df.with_columns(
+        pl.col("task").cast(pl.String).str.split("_").list.first().alias("tool")
+    ).select(
+        [pl.col(column).cast(dtype) for column, dtype in schemas.energy_fact_columns.items()]
+    )
 
 
 def load_hwpc_results(hwpc_df):
-    """ """
+    """
+    HWPC energy facts, counters summed per iteration over socket leaders
+    """
     # HWPC, by default, produces reports with 1 row for each combination of (socket, cpu)
     # Considering some system counters (such are RAPL PKG) are shared for all cpu of a given socket
     # We do have to filter out redundant values to prevent counting something twice.
-    # We chose to keep only the first
-    hwpc_df = hwpc_df.filter(pl.col("cpu").is_in("numa_nodes_first_cpus"))
-    print(
-        "HWPC rows :",
-        hwpc_df.sql(
-            "SELECT node, cpu, numa_nodes_first_cpus, rapl_energy_pkg, rapl_energy_cores, rapl_energy_dram FROM self"
-        ).head(),
+    # We chose to keep only the first, see processors.socket_leaders,
+    # other rows are dropped while reading, see scan_hwpc_csv
+    if isinstance(hwpc_df, pl.DataFrame):
+        print(
+            "HWPC rows :",
+            hwpc_df.select(
+                "node", "cpu", "rapl_energy_pkg", "rapl_energy_cores", "rapl_energy_dram"
+            ).head(),
+        )
+    hwpc_results = hwpc_df.group_by(
+        ["nb_core", "nb_ops_per_core", "iteration", "task", "site", "node"]
+    ).agg(
+        rapl.decode_fixed_point(pl.col("rapl_energy_cores").sum()).alias("energy_cores"),
+        rapl.decode_fixed_point(pl.col("rapl_energy_pkg").sum()).alias("energy_pkg"),
+        rapl.decode_fixed_point(pl.col("rapl_energy_dram").sum()).alias("energy_ram"),
     )
-    hwpc_results = hwpc_df.sql("""
-        SELECT
-            SUM(rapl_energy_cores) AS energy_cores_int,
-            SUM(rapl_energy_pkg) AS energy_pkg_int,
-            SUM(rapl_energy_dram) AS energy_ram_int,
-            nb_core,
-            nb_ops_per_core,
-            iteration,
-            task,
-            site,
-            g5k_g5k_cluster,
-            node,
-            exotic,
-            architecture_nb_cores,
-            architecture_nb_threads,
-            processor_vendor,
-            processor_clock_speed,
-            processor_instruction_set,
-            processor_ht_capable,
-            processor_microarchitecture,
-            processor_microcode,
-            processor_model,
-            processor_version,
-            os_cstate_driver,
-            os_cstate_governor,
-            os_pstate_driver,
-            os_pstate_governor,
-            os_turboboost_enabled,
-            processor_detail,
-            processor_generation,
-        FROM self
-        GROUP BY
-            nb_core,
-            nb_ops_per_core,
-            iteration,
-            task,
-            site,
-            g5k_g5k_cluster,
-            node,
-            exotic,
-            architecture_nb_cores,
-            architecture_nb_threads,
-            processor_vendor,
-            processor_clock_speed,
-            processor_instruction_set,
-            processor_ht_capable,
-            processor_microarchitecture,
-            processor_microcode,
-            processor_model,
-            processor_version,
-            os_cstate_driver,
-            os_cstate_governor,
-            os_pstate_driver,
-            os_pstate_governor,
-            os_turboboost_enabled,
-            processor_detail,
-            processor_generation,
-    """)
-
-    hwpc_results = hwpc_results.with_columns(
-        pl.col("energy_pkg_int")
-        .map_elements(lambda x: ldexp(x, -32), return_dtype=pl.Float64)
-        .alias("energy_pkg"),
+    return energy_facts(hwpc_results)
+
+
+# Parse Perf files, again PKG, Cores or RAM can be missing,
+def scan_perf_csv(file_path: str, results_directory_match: str) -> pl.LazyFrame:
+    return scan_results_csv(
+        file_path,
+        results_directory_match,
+        schema=schemas.raw_perf_columns,
+        domains=["energy_pkg", "energy_ram", "energy_cores"],
+        renames={
+            "power_energy_pkg": "energy_pkg",
+            "power_energy_ram": "energy_ram",
+            "power_energy_cores": "energy_cores",
+        },
     )
 
-    hwpc_results = hwpc_results.with_columns(
-        pl.col("energy_cores_int")
-        .map_elements(lambda x: ldexp(x, -32), return_dtype=pl.Float64)
-        .alias("energy_cores"),
+
+def read_perf_csv(file_path: str, results_directory_match: str) -> pl.DataFrame:
+    return scan_perf_csv(file_path, results_directory_match).collect()
+
+
+def load_perf_results(perf_df):
+    return energy_facts(perf_df)
+
+
+ENERGY_DOMAINS = ["energy_cores", "energy_pkg", "energy_ram"]
+
+
+def scan_codecarbon_csv(file_path: str, results_directory_match: str) -> pl.LazyFrame:
+    # Codecarbon reports kWh, converted to Joules
+    return scan_results_csv(
+        file_path,
+        results_directory_match,
+        schema=schemas.raw_energy_columns,
+        domains=ENERGY_DOMAINS,
+        scale=3_600_000,
     )
 
-    hwpc_results = hwpc_results.with_columns(
-        pl.col("energy_ram_int")
-        .map_elements(lambda x: ldexp(x, -32), return_dtype=pl.Float64)
-        .alias("energy_ram"),
+
+def read_codecarbon_csv(file_path: str, results_directory_match: str) -> pl.DataFrame:
+    return scan_codecarbon_csv(file_path, results_directory_match).collect()
+
+
+def scan_alumet_csv(file_path: str, results_directory_match: str) -> pl.LazyFrame:
+    return scan_results_csv(
+        file_path,
+        results_directory_match,
+        schema=schemas.raw_energy_columns,
+        domains=ENERGY_DOMAINS,
     )
 
-    hwpc_results = hwpc_results.drop(
-        ["energy_pkg_int", "energy_cores_int", "energy_ram_int"]
+
+def read_alumet_csv(file_path: str, results_directory_match: str) -> pl.DataFrame:
+    return scan_alumet_csv(file_path, results_directory_match).collect()
+
+
+def scan_scaphandre_csv(file_path: str, results_directory_match: str) -> pl.LazyFrame:
+    return scan_results_csv(
+        file_path,
+        results_directory_match,
+        schema=schemas.raw_energy_columns,
+        domains=ENERGY_DOMAINS,
     )
-    return hwpc_results.sql("""
-                     SELECT 
-                        energy_cores,
-                        energy_pkg,
-                        energy_ram,
-                        nb_core,
-                        nb_ops_per_core,
-                        iteration,
-                        task,
-                        site,
-                        g5k_g5k_cluster,
-                        node,
-                        exotic,
-                        architecture_nb_cores,
-                        architecture_nb_threads,
-                        processor_vendor,
-                        processor_clock_speed,
-                        processor_instruction_set,
-                        processor_ht_capable,
-                        processor_microarchitecture,
-                        processor_microcode,
-                        processor_model,
-                        processor_version,
-                        os_cstate_driver,
-                        os_cstate_governor,
-                        os_pstate_driver,
-                        os_pstate_governor,
-                        os_turboboost_enabled,
-                        processor_detail,
-                        processor_generation,
-                    FROM self
-                     """)
 
 
-# Parse Perf files, again PKG, Cores or RAM can be missing,
-def read_perf_csv(file_path: str, results_directory_match: str):
-    # Paths follow the following format :
-    # <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/<TASK>_<NB_CORES>_<NB_OPS_PER_CORE>.csv
-    (site, g5k_g5k_cluster, node, task, nb_cores, nb_ops_per_core) = re.match(
-        results_directory_match, file_path
-    ).groups()
-    parsed_and_converted_rows = []
-    with open(file_path, "r") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for raw_row in reader:
-            parsed_row = (
-                float(raw_row["power_energy_pkg"])
-                if raw_row["power_energy_pkg"]
-                else 0.0,
-                float(raw_row["power_energy_ram"])
-                if raw_row["power_energy_ram"]
-                else 0.0,
-                float(raw_row["power_energy_cores"])
-                if raw_row["power_energy_cores"]
-                else 0.0,
-                int(raw_row["nb_core"]),
-                int(raw_row["nb_ops_per_core"]),
-                int(raw_row["iteration"]),
-                task,
-                site,
-                g5k_g5k_cluster,
-                node,
-            )
-            print("\tparsed_row :", parsed_row)
-            parsed_and_converted_rows.append(parsed_row)
-    return parsed_and_converted_rows
+def read_scaphandre_csv(file_path: str, results_directory_match: str) -> pl.DataFrame:
+    return scan_scaphandre_csv(file_path, results_directory_match).collect()
 
 
-def load_perf_results(perf_df):
-    return perf_df.sql("""
-                     SELECT 
-                        energy_cores,
-                        energy_pkg,
-                        energy_ram,
-                        nb_core,
-                        nb_ops_per_core,
-                        iteration,
-                        task,
-                        site,
-                        g5k_g5k_cluster,
-                        node,
-                        exotic,
-                        architecture_nb_cores,
-                        architecture_nb_threads,
-                        processor_vendor,
-                        processor_clock_speed,
-                        processor_instruction_set,
-                        processor_ht_capable,
-                        processor_microarchitecture,
-                        processor_microcode,
-                        processor_model,
-                        processor_version,
-                        os_cstate_driver,
-                        os_cstate_governor,
-                        os_pstate_driver,
-                        os_pstate_governor,
-                        os_turboboost_enabled,
-                        processor_detail,
-                        processor_generation,
-                    FROM self
-                     """)
-
-
-def read_codecarbon_csv(file_path: str, results_directory_match: str):
-    # Paths follow the following format :
-    # <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/<TASK>_<NB_CORES>_<NB_OPS_PER_CORE>.csv
-    (site, g5k_g5k_cluster, node, task, nb_cores, nb_ops_per_core) = re.match(
-        results_directory_match, file_path
-    ).groups()
-    parsed_and_converted_rows = []
-    with open(file_path, "r") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for raw_row in reader:
-            parsed_row = (
-                float(raw_row["energy_cores"]) * 3_600_000
-                if raw_row["energy_cores"]
-                else 0.0,
-                float(raw_row["energy_pkg"]) * 3_600_000
-                if raw_row["energy_pkg"]
-                else 0.0,
-                float(raw_row["energy_ram"]) * 3_600_000
-                if raw_row["energy_ram"]
-                else 0.0,
-                int(raw_row["nb_core"]),
-                int(raw_row["nb_ops_per_core"]),
-                int(raw_row["iteration"]),
-                task,
-                site,
-                g5k_g5k_cluster,
-                node,
-            )
-            parsed_and_converted_rows.append(parsed_row)
-    return parsed_and_converted_rows
+def scan_vjoule_csv(file_path: str, results_directory_match: str) -> pl.LazyFrame:
+    return scan_results_csv(
+        file_path,
+        results_directory_match,
+        schema=schemas.raw_energy_columns,
+        domains=ENERGY_DOMAINS,
+    )
 
 
-def read_alumet_csv(file_path: str, results_directory_match: str):
-    # Paths follow the following format :
-    # <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/<TASK>_<NB_CORES>_<NB_OPS_PER_CORE>.csv
-    (site, g5k_g5k_cluster, node, task, nb_cores, nb_ops_per_core) = re.match(
-        results_directory_match, file_path
-    ).groups()
-    parsed_and_converted_rows = []
-    with open(file_path, "r") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for raw_row in reader:
-            parsed_row = (
-                float(raw_row["energy_cores"]) if raw_row["energy_cores"] else 0.0,
-                float(raw_row["energy_pkg"]) if raw_row["energy_pkg"] else 0.0,
-                float(raw_row["energy_ram"]) if raw_row["energy_ram"] else 0.0,
-                int(raw_row["nb_core"]),
-                int(raw_row["nb_ops_per_core"]),
-                int(raw_row["iteration"]),
-                task,
-                site,
-                g5k_g5k_cluster,
-                node,
-            )
-            parsed_and_converted_rows.append(parsed_row)
-    return parsed_and_converted_rows
+def read_vjoule_csv(file_path: str, results_directory_match: str) -> pl.DataFrame:
+    return scan_vjoule_csv(file_path, results_directory_match).collect()
 
 
-def read_scaphandre_csv(file_path: str, results_directory_match: str):
-    # Paths follow the following format :
-    # <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/<TASK>_<NB_CORES>_<NB_OPS_PER_CORE>.csv
-    (site, g5k_g5k_cluster, node, task, nb_cores, nb_ops_per_core) = re.match(
-        results_directory_match, file_path
-    ).groups()
-    parsed_and_converted_rows = []
-    with open(file_path, "r") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for raw_row in reader:
-            parsed_row = (
-                float(raw_row["energy_cores"]) if raw_row["energy_cores"] else 0.0,
-                float(raw_row["energy_pkg"]) if raw_row["energy_pkg"] else 0.0,
-                float(raw_row["energy_ram"]) if raw_row["energy_ram"] else 0.0,
-                int(raw_row["nb_core"]),
-                int(raw_row["nb_ops_per_core"]),
-                int(raw_row["iteration"]),
-                task,
-                site,
-                g5k_g5k_cluster,
-                node,
-            )
-            parsed_and_converted_rows.append(parsed_row)
-    return parsed_and_converted_rows
+SCANNERS = {
+    "hwpc": scan_hwpc_csv,
+    "perf": scan_perf_csv,
+    "codecarbon": scan_codecarbon_csv,
+    "alumet": scan_alumet_csv,
+    "scaphandre": scan_scaphandre_csv,
+    "vjoule": scan_vjoule_csv,
+}
 
 
-def read_vjoule_csv(file_path: str, results_directory_match: str):
-    # Paths follow the following format :
-    # <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/<TASK>_<NB_CORES>_<NB_OPS_PER_CORE>.csv
-    (site, g5k_g5k_cluster, node, task, nb_cores, nb_ops_per_core) = re.match(
-        results_directory_match, file_path
-    ).groups()
-    parsed_and_converted_rows = []
-    with open(file_path, "r") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for raw_row in reader:
-            parsed_row = (
-                float(raw_row["energy_cores"]) if raw_row["energy_cores"] else 0.0,
-                float(raw_row["energy_pkg"]) if raw_row["energy_pkg"] else 0.0,
-                float(raw_row["energy_ram"]) if raw_row["energy_ram"] else 0.0,
-                int(raw_row["nb_core"]),
-                int(raw_row["nb_ops_per_core"]),
-                int(raw_row["iteration"]),
-                task,
-                site,
-                g5k_cluster,
-                node,
-            )
-            parsed_and_converted_rows.append(parsed_row)
-    return parsed_and_converted_rows
+def concat_lazy_frames(
+    frames: List[pl.LazyFrame], schema: Dict[str, type]
+) -> pl.LazyFrame:
+    """
+    Lazy union of per-file scans, nothing is read until the plan is collected
+    """
+    if not frames:
+        return pl.LazyFrame(schema=schema)
+    return pl.concat(frames, how="vertical")
+
+
+def concat_frames(frames: List[pl.DataFrame], schema: Dict[str, type]) -> pl.DataFrame:
+    """
+    Concatenate per-file parts in a single pass, or build an empty frame typed after `schema`
+    """
+    if not frames:
+        return pl.DataFrame(schema=schema, strict=True)
+    return pl.concat(frames, how="vertical", rechunk=True)
+
+
+def report_frames(frames: Dict[str, pl.DataFrame]) -> pl.DataFrame:
+    """
+    Print and return the number of rows and estimated bytes of each tool frame
+    """
+    report_df = pl.DataFrame(
+        {
+            "tool": list(frames.keys()),
+            "rows": [frame.height for frame in frames.values()],
+            "bytes": [int(frame.estimated_size()) for frame in frames.values()],
+        },
+        schema={"tool": str, "rows": int, "bytes": int},
+    )
+    print("Loaded frames :", report_df)
+    return report_df
+
+
+def load_results_partitions(
+    batch_identifier: str,
+    files_by_tool: Dict[str, Tuple[List[str], Callable, Dict[str, type]]],
+    results_directory_match: str,
+    max_workers: int = None,
+    executor: str = "thread",
+    versions: Dict[str, int] = {},
+) -> Tuple[Dict[str, pl.DataFrame], pl.DataFrame]:
+    """
+    Node partitioned <TOOL>_results caches of the raw consumption frames.
+    Only the files of new or changed nodes are read, on a single ingest pool,
+    a node with a failing file is left out of the cache and read again next time.
+    `versions` overrides the cache version of some tools, when their reader
+    depends on more than the files.
+    """
+    partitions = {}
+    fingerprints = {}
+    stale = {}
+    for tool, (files, _reader, _schema) in files_by_tool.items():
+        partitions[tool] = node_partitions(files)
+        fingerprints[tool] = cache.fingerprint_partitions(partitions[tool])
+        stale[tool] = cache.stale_partitions(
+            batch_identifier,
+            f"{tool}_results",
+            fingerprints[tool],
+            version=versions.get(tool, CACHE_VERSIONS["results"]),
+        )
+
+    parts, errors_df = ingest.ingest_files(
+        {
+            tool: (
+                [file for node in stale[tool] for file in partitions[tool][node]],
+                reader,
+            )
+            for tool, (_files, reader, _schema) in files_by_tool.items()
+        },
+        results_directory_match=results_directory_match,
+        max_workers=max_workers,
+        executor=executor,
+    )
+    failed_files = set(errors_df.get_column("file").to_list())
+
+    frames = {}
+    for tool, (_files, _reader, schema) in files_by_tool.items():
+        # Parts come in input order without the failed files
+        tool_parts = iter(parts[tool])
+        built = {}
+        for node in stale[tool]:
+            node_files = partitions[tool][node]
+            node_parts = [
+                next(tool_parts) for file in node_files if file not in failed_files
+            ]
+            if len(node_parts) == len(node_files):
+                built[node] = concat_frames(node_parts, schema=schema)
+        frames[tool] = cache.store_partitions(
+            batch_identifier,
+            f"{tool}_results",
+            fingerprints[tool],
+            built,
+            schema=schema,
+            version=versions.get(tool, CACHE_VERSIONS["results"]),
+        )
+    return frames, errors_df
 
 
 def load_results(
@@ -413,276 +442,217 @@ def load_results(
     vjoule_files,
     results_directory_match,
     nodes_df,
+    max_workers=None,
+    executor="thread",
+    errors_file=None,
+    batch_identifier=None,
+    lazy=False,
+    star=False,
+    report_pruned=False,
 ):
-    perf_df = pl.DataFrame(schema=schemas.raw_perf_columns, strict=True)
-    hwpc_df = pl.DataFrame(schema=schemas.hwpc_columns, strict=True)
-    codecarbon_df = pl.DataFrame(schema=schemas.raw_energy_columns, strict=True)
-    alumet_df = pl.DataFrame(schema=schemas.raw_energy_columns, strict=True)
-    scaphandre_df = pl.DataFrame(schema=schemas.raw_energy_columns, strict=True)
-    vjoule_df = pl.DataFrame(schema=schemas.raw_energy_columns, strict=True)
-
-    for hwpc_file in hwpc_files:
-        hwpc_df = pl.concat(
-            [
-                hwpc_df,
-                pl.from_records(
-                    schema=schemas.hwpc_columns,
-                    data=read_hwpc_csv(hwpc_file, results_directory_match),
-                    strict=True,
-                    orient="row",
-                ),
-            ]
+    """
+    Read all consumption files on `max_workers` workers of a `executor` ("thread" or
+    "process") pool, files that fail are skipped and listed in `errors_file` if given.
+    With a `batch_identifier` the raw frames are cached per node and only the files
+    of new or changed nodes are read.
+    With `lazy` nothing is read, LazyFrames are returned so projections and filters
+    reach the CSV scans, their plans can be inspected with explain().
+    With `star` energy facts are returned without node attributes, see
+    schemas.energy_fact_columns and inventories.node_dimension.
+    With `report_pruned` the HWPC files read without a batch are counted again
+    to report the rows of other CPUs than socket leaders, see report_pruned_rows.
+    """
+    socket_leaders = socket_leader_cpus(processors.socket_leaders(nodes_df))
+    files_by_tool = {
+        "hwpc": (
+            hwpc_files,
+            partial(read_hwpc_csv, socket_leaders=socket_leaders),
+            schemas.hwpc_columns,
+        ),
+        "perf": (perf_files, read_perf_csv, schemas.raw_perf_columns),
+        "codecarbon": (codecarbon_files, read_codecarbon_csv, schemas.raw_energy_columns),
+        "alumet": (alumet_files, read_alumet_csv, schemas.raw_energy_columns),
+        "scaphandre": (scaphandre_files, read_scaphandre_csv, schemas.raw_energy_columns),
+        "vjoule": (vjoule_files, read_vjoule_csv, schemas.raw_energy_columns),
+    }
+    if lazy:
+        scanners = SCANNERS | {
+            "hwpc": partial(scan_hwpc_csv, socket_leaders=socket_leaders)
+        }
+        frames = {
+            tool: concat_lazy_frames(
+                [scanners[tool](file, results_directory_match) for file in files],
+                schema=schema,
+            )
+            for tool, (files, _reader, schema) in files_by_tool.items()
+        }
+        errors_df = pl.DataFrame(schema=schemas.ingest_errors_columns)
+    elif batch_identifier is None:
+        # Files are parsed in parallel, per-file parts are collected first and each tool
+        # frame is materialized once, concatenating inside the loop would copy
+        # everything read so far for every file
+        parts, errors_df = ingest.ingest_files(
+            {
+                tool: (files, reader)
+                for tool, (files, reader, _schema) in files_by_tool.items()
+            },
+            results_directory_match=results_directory_match,
+            max_workers=max_workers,
+            executor=executor,
         )
+        frames = {
+            tool: concat_frames(parts[tool], schema=schema)
+            for tool, (_files, _reader, schema) in files_by_tool.items()
+        }
+        if report_pruned:
+            failed_files = set(errors_df.get_column("file").to_list())
+            report_pruned_rows(
+                [file for file in hwpc_files if file not in failed_files],
+                frames["hwpc"],
+            )
+    else:
+        frames, errors_df = load_results_partitions(
+            batch_identifier,
+            files_by_tool,
+            results_directory_match=results_directory_match,
+            max_workers=max_workers,
+            executor=executor,
+            versions={"hwpc": socket_leaders_version(socket_leaders)},
+        )
+    if errors_file is not None:
+        errors_df.write_csv(errors_file)
+    hwpc_df = frames["hwpc"]
+    perf_df = frames["perf"]
+    codecarbon_df = frames["codecarbon"]
+    alumet_df = frames["alumet"]
+    scaphandre_df = frames["scaphandre"]
+    vjoule_df = frames["vjoule"]
+    if not lazy:
+        report_frames(frames)
 
-    hwpc_df = hwpc_df.join(
-        other=nodes_df,
-        left_on=["node", "g5k_cluster"],
-        right_on=["uid", "g5k_cluster"],
-        how="left",
-        validate="m:1",
-    )
     hwpc_df = load_hwpc_results(hwpc_df)
-    for perf_file in perf_files:
-        perf_df = pl.concat(
-            [
-                perf_df,
-                pl.from_records(
-                    schema=schemas.raw_perf_columns,
-                    data=read_perf_csv(perf_file, results_directory_match),
-                    strict=True,
-                    orient="row",
-                ),
-            ]
+    perf_df = load_perf_results(perf_df)
+    codecarbon_df = energy_facts(codecarbon_df)
+    alumet_df = energy_facts(alumet_df)
+    scaphandre_df = energy_facts(scaphandre_df)
+    vjoule_df = energy_facts(vjoule_df)
+    if star:
+        return (hwpc_df, perf_df, codecarbon_df, alumet_df, scaphandre_df, vjoule_df)
+
+    node_dimension_df = inventories.node_dimension(nodes_df)
+    return tuple(
+        inventories.attach_nodes(fact_df, node_dimension_df, schemas.energy_columns)
+        for fact_df in (
+            hwpc_df,
+            perf_df,
+            codecarbon_df,
+            alumet_df,
+            scaphandre_df,
+            vjoule_df,
         )
-    print("perf", perf_df.head())
+    )
 
-    for codecarbon_file in codecarbon_files:
-        codecarbon_df = pl.concat(
-            [
-                codecarbon_df,
-                pl.from_records(
-                    schema=schemas.raw_energy_columns,
-                    data=read_codecarbon_csv(codecarbon_file, results_directory_match),
-                    strict=True,
-                    orient="row",
-                ),
-            ]
-        )
-    for alumet_file in alumet_files:
-        alumet_df = pl.concat(
+
+def load_energy(
+    hwpc_df,
+    perf_df,
+    codecarbon_df,
+    alumet_df,
+    scaphandre_df,
+    vjoule_df,
+    streaming=False,
+    memory_budget=energy_stats.DEFAULT_MEMORY_BUDGET,
+    spill_directory=None,
+    quantile_sketch_accuracy=None,
+    batch_identifier=None,
+    files=None,
+    nodes_df=None,
+    star=False,
+):
+    """
+    Energy rows of every tool and their statistics, as LazyFrames when
+    the frames of load_results(lazy=True) are given.
+    Statistics are aggregated on the energy facts and node attributes are joined
+    afterwards, from `nodes_df` or from the given frames when they carry them.
+    With `star` facts and statistics are returned without node attributes.
+    With `streaming` the statistics are computed out of core from the frames of
+    load_results(lazy=True), energy rows are spilled to `spill_directory` and
+    aggregated a few nodes at a time within `memory_budget` bytes, see energy_stats.py.
+    With a `quantile_sketch_accuracy` medians and quantiles are estimated from
+    mergeable quantile sketches, see sketches.py.
+    With a `batch_identifier` the moments, and sketches if any, of the nodes whose
+    consumption `files` (the lists of extract_csv_files) changed are computed
+    again in the stores of the batch, averages, deviations and coefficients of
+    variation are served from the moments and quantiles from the sketches,
+    see moments.py.
+    """
+    if batch_identifier is not None and files is None:
+        raise ValueError("files are required to update the moment store of a batch")
+    frames = [hwpc_df, perf_df, codecarbon_df, alumet_df, scaphandre_df, vjoule_df]
+    node_dimension_df = None
+    if nodes_df is not None:
+        node_dimension_df = inventories.node_dimension(nodes_df)
+    elif "exotic" in frames[0].collect_schema().names():
+        node_dimension_df = pl.concat(
             [
-                alumet_df,
-                pl.from_records(
-                    schema=schemas.raw_energy_columns,
-                    data=read_alumet_csv(alumet_file, results_directory_match),
-                    strict=True,
-                    orient="row",
-                ),
+                frame.select(
+                    [
+                        pl.col(column).cast(dtype)
+                        for column, dtype in schemas.node_dimension_columns.items()
+                    ]
+                ).unique("node")
+                for frame in frames
             ]
+        ).unique("node")
+        if isinstance(node_dimension_df, pl.LazyFrame):
+            node_dimension_df = node_dimension_df.collect()
+    energy_df = pl.concat([energy_facts(frame) for frame in frames])
+
+    moments_df = None
+    sketch_df = None
+    if batch_identifier is not None:
+        partitions = node_partitions(
+            [file for tool_files in files for file in tool_files]
         )
-    for scaphandre_file in scaphandre_files:
-        scaphandre_df = pl.concat(
-            [
-                scaphandre_df,
-                pl.from_records(
-                    schema=schemas.raw_energy_columns,
-                    data=read_scaphandre_csv(scaphandre_file, results_directory_match),
-                    strict=True,
-                    orient="row",
-                ),
-            ]
+        moments_df = moments.update_moments(batch_identifier, energy_df, partitions)
+        if quantile_sketch_accuracy is not None:
+            sketch_df = sketches.update_sketches(
+                batch_identifier, energy_df, partitions, quantile_sketch_accuracy
+            )
+
+    if streaming:
+        energy_stats_df = energy_stats.streaming_energy_stats(
+            energy_df,
+            memory_budget=memory_budget,
+            spill_directory=spill_directory,
+            quantile_sketch_accuracy=quantile_sketch_accuracy,
+            moments_df=moments_df,
+            sketch_df=sketch_df,
         )
-    for vjoule_file in vjoule_files:
-        vjoule_df = pl.concat(
-            [
-                vjoule_df,
-                pl.from_records(
-                    schema=schemas.raw_energy_columns,
-                    data=read_vjoule_csv(vjoule_file, results_directory_match),
-                    strict=True,
-                    orient="row",
-                ),
-            ]
+    else:
+        energy_stats_df = energy_stats.energy_stats(
+            energy_df,
+            quantile_sketch_accuracy=quantile_sketch_accuracy,
+            moments_df=moments_df,
+            sketch_df=sketch_df,
         )
 
-    perf_df = perf_df.join(
-        other=nodes_df,
-        left_on=["node", "g5k_cluster"],
-        right_on=["uid", "g5k_cluster"],
-        how="left",
-        validate="m:1",
-    )
-    perf_df = perf_df.drop(["numa_nodes_first_cpus"])
-    perf_df = load_perf_results(perf_df)
-    print("Perf columns :", perf_df.columns)
-    codecarbon_df = codecarbon_df.join(
-        other=nodes_df,
-        left_on=["node", "g5k_cluster"],
-        right_on=["uid", "g5k_cluster"],
-        how="left",
-        validate="m:1",
-    )
-    codecarbon_df = codecarbon_df.drop(["numa_nodes_first_cpus"])
-    print("codecarbon columns :", codecarbon_df.columns)
-    alumet_df = alumet_df.join(
-        other=nodes_df,
-        left_on=["node", "g5k_cluster"],
-        right_on=["uid", "g5k_cluster"],
-        how="left",
-        validate="m:1",
-    )
-    alumet_df = alumet_df.drop(["numa_nodes_first_cpus"])
-    print("alumet columns :", alumet_df.columns)
-    scaphandre_df = scaphandre_df.join(
-        other=nodes_df,
-        left_on=["node", "g5k_cluster"],
-        right_on=["uid", "g5k_cluster"],
-        how="left",
-        validate="m:1",
-    )
-    scaphandre_df = scaphandre_df.drop(["numa_nodes_first_cpus"])
-    print("scaphandre columns :", scaphandre_df.columns)
-    vjoule_df = vjoule_df.join(
-        other=nodes_df,
-        left_on=["node", "g5k_cluster"],
-        right_on=["uid", "g5k_cluster"],
-        how="left",
-        validate="m:1",
-    )
-    vjoule_df = vjoule_df.drop(["numa_nodes_first_cpus"])
-    print("vjoule columns :", vjoule_df.columns)
-    # perf_df = load_perf_results(perf_df)
-
-    return (hwpc_df, perf_df, codecarbon_df, alumet_df, scaphandre_df, vjoule_df)
-
-
-def load_energy(hwpc_df, perf_df, codecarbon_df, alumet_df, scaphandre_df, vjoule_df):
-    energy_df = pl.concat(
-        [hwpc_df, perf_df, codecarbon_df, alumet_df, scaphandre_df, vjoule_df]
-    )
-    energy_df = pl.DataFrame(schema=schemas.energy_columns, data=energy_df)
-
-    energy_stats_df = energy_df.sql(
-        """
-        SELECT
-            node,
-            task,
-            nb_core,
-            nb_ops_per_core,
-            avg(energy_pkg) as pkg_average,
-            median(energy_pkg) as pkg_median,
-            min(energy_pkg) as pkg_minimum,
-            max(energy_pkg) as pkg_maximum,
-            stddev(energy_pkg) as pkg_standard_deviation,
-            quantile_cont(energy_pkg, 0.25) as pkg_quantile_25,
-            quantile_cont(energy_pkg, 0.75) as pkg_quantile_75,
-            (stddev(energy_pkg) / avg(energy_pkg)) as pkg_coefficient_of_variation,
-            avg(energy_cores) as cores_average,
-            median(energy_cores) as cores_median,
-            min(energy_cores) as cores_minimum,
-            max(energy_cores) as cores_maximum,
-            stddev(energy_cores) as cores_standard_deviation,
-            quantile_cont(energy_cores, 0.25) as cores_quantile_25,
-            quantile_cont(energy_cores, 0.75) as cores_quantile_75,
-            (stddev(energy_cores)/avg(energy_cores)) as cores_coefficient_of_variation,
-            avg(energy_ram) as ram_average,
-            median(energy_ram) as ram_median,
-            min(energy_ram) as ram_minimum,
-            max(energy_ram) as ram_maximum,
-            stddev(energy_ram) as ram_standard_deviation,
-            quantile_cont(energy_ram, 0.25) as ram_quantile_25,
-            quantile_cont(energy_ram, 0.75) as ram_quantile_75,
-            (stddev(energy_ram) / avg(energy_ram)) as ram_coefficient_of_variation,
-            exotic,
-            architecture_nb_cores,
-            architecture_nb_threads,
-            processor_vendor,
-            processor_clock_speed,
-            processor_instruction_set,
-            processor_ht_capable,
-            processor_microarchitecture,
-            processor_microcode,
-            processor_model,
-            processor_version,
-            os_cstate_driver,
-            os_cstate_governor,
-            os_pstate_driver,
-            os_pstate_governor,
-            os_turboboost_enabled,
-            processor_detail,
-            processor_generation,
-        FROM self
-        GROUP BY 
-            node, 
-            task, 
-            nb_core, 
-            nb_ops_per_core,
-            exotic,
-            architecture_nb_cores,
-            architecture_nb_threads,
-            processor_vendor,
-            processor_clock_speed,
-            processor_instruction_set,
-            processor_ht_capable,
-            processor_microarchitecture,
-            processor_microcode,
-            processor_model,
-            processor_version,
-            os_cstate_driver,
-            os_cstate_governor,
-            os_pstate_driver,
-            os_pstate_governor,
-            os_turboboost_enabled,
-            processor_detail,
-            processor_generation,
-    """
+    if star:
+        return energy_df, energy_stats_df
+    if node_dimension_df is None:
+        raise ValueError("nodes_df is required to present energy facts")
+    return (
+        inventories.attach_nodes(energy_df, node_dimension_df, schemas.energy_columns),
+        inventories.attach_nodes(
+            energy_stats_df, node_dimension_df, schemas.stats_columns
+        ),
     )
-    energy_stats_df = pl.DataFrame(energy_stats_df, schema=schemas.stats_columns)
-
-    return energy_df, energy_stats_df
 
 
 # Extract JSON nodes information
 def extract_inventory_json_files(directory: str, schema: str):
-    nodes_df = pl.DataFrame(schema=schema, strict=True)
-    for site in os.scandir(directory):
-        for g5k_cluster in os.scandir(site.path):
-            for node in os.scandir(g5k_cluster.path):
-                if node.name.endswith(".json"):
-                    with open(node.path, "r") as json_file:
-                        data = json.load(json_file)
-                        node = (
-                            data["uid"],
-                            data["cluster"],
-                            bool(data["exotic"]),
-                            int(data["architecture"]["nb_cores"]),
-                            int(data["architecture"]["nb_threads"]),
-                            data["processor"]["vendor"],
-                            int(data["processor"]["clock_speed"]),
-                            data["processor"]["instruction_set"],
-                            bool(data["processor"]["ht_capable"]),
-                            data["processor"]["microarchitecture"],
-                            data["processor"]["microcode"],
-                            data["processor"]["model"],
-                            data["processor"]["version"],
-                            data["operating_system"]["cstate_driver"],
-                            data["operating_system"]["cstate_governor"],
-                            data["operating_system"]["pstate_driver"],
-                            data["operating_system"]["pstate_governor"],
-                            bool(data["operating_system"]["turboboost_enabled"]),
-                        )
-                        nodes_df = pl.concat(
-                            [
-                                nodes_df,
-                                pl.from_records(
-                                    schema=schema,
-                                    data=[node],
-                                    strict=True,
-                                    orient="row",
-                                ),
-                            ]
-                        )
-    return nodes_df
+    # Parsed in parallel and built once, see inventories.py
+    return inventories.load_nodes(directory).select(list(schema))
 
 
 def frequency_file_metadata(filename):
@@ -691,7 +661,7 @@ def frequency_file_metadata(filename):
     return site, g5k_cluster, node, int(frequency), tool1, tool2.split(".")[0]
 
 
-def load_frequency(batch_identifier="", results_directory=""):
+def load_frequency(batch_identifier="", results_directory="", samples_df=None):
     print("Loading Frequency Results")
     frequency_csv_file = f"../data/{batch_identifier}/frequency.csv"
     if os.path.exists(frequency_csv_file):
@@ -702,495 +672,269 @@ def load_frequency(batch_identifier="", results_directory=""):
     perf_frequency_df = load_perf_frequency(
         batch_identifier=batch_identifier, results_directory=results_directory
     )
-    hwpc_frequency_df = load_hwpc_frequency(
-        batch_identifier=batch_identifier, results_directory=results_directory
-    )
-    codecarbon_frequency_df = load_codecarbon_frequency(
-        batch_identifier=batch_identifier, results_directory=results_directory
-    )
-    alumet_frequency_df = load_alumet_frequency(
-        batch_identifier=batch_identifier, results_directory=results_directory
-    )
-    scaphandre_frequency_df = load_scaphandre_frequency(
-        batch_identifier=batch_identifier, results_directory=results_directory
-    )
-    vjoule_frequency_df = load_vjoule_frequency(
-        batch_identifier=batch_identifier, results_directory=results_directory
-    )
-
-    return (
-        perf_frequency_df,
-        hwpc_frequency_df,
-        codecarbon_frequency_df,
-        alumet_frequency_df,
-        scaphandre_frequency_df,
-        vjoule_frequency_df,
-    )
+    if samples_df is None:
+        samples_df = load_samples(
+            batch_identifier=batch_identifier, results_directory=results_directory
+        )
+    # hwpc, codecarbon, alumet, scaphandre and vjoule views of the same samples
+    tool_frequency_dfs = [
+        load_tool_frequency(tool, samples_df=samples_df)
+        for tool in tool_specs.TOOL_SPECS
+    ]
+    return (perf_frequency_df, *tool_frequency_dfs)
 
 
-def load_perf_frequency(batch_identifier="", results_directory=""):
-    print("Loading Perf Frequency Results")
-    perf_frequency_csv_file = f"../data/{batch_identifier}.d/perf_frequency.csv"
-    if os.path.exists(perf_frequency_csv_file):
-        print("Returning content from :", perf_frequency_csv_file)
-        perf_df = pl.read_csv(perf_frequency_csv_file)
-        return perf_df
-    else:
-        regex = "frequency.*perf_and.*csv"
-        print("No import found, will load from raw files matching regex : ", regex)
-        perf_frequency_raw_files = utils.find_files(
-            root_dir=results_directory, regex=regex
-        )
-        perf_dfs = []
-        for file in perf_frequency_raw_files:
-            print("Reading perf file :", file)
-            site, g5k_cluster, node, frequency, tool1, tool2 = frequency_file_metadata(
-                file
-            )
-            matching_temperature_file = f"{results_directory}/{site}/{g5k_cluster}/{node}/temperatures_frequency_{frequency}_perf_and_{tool2}.csv"
-            perf_df = pl.read_csv(file).with_columns(
-                tool=pl.lit(tool2),
-                node=pl.lit(node),
-                g5k_cluster=pl.lit(g5k_cluster),
-                target_frequency=pl.lit(frequency),
-            )
-            temperature_df = pl.read_csv(matching_temperature_file)
-            perf_df = pl.sql(
-                "SELECT * FROM perf_df JOIN temperature_df ON perf_df.iteration = temperature_df.iteration"
-            ).collect()
-            perf_dfs.append(perf_df)
-        perf_df = pl.concat(perf_dfs)
-        perf_df.write_csv(perf_frequency_csv_file)
-        return perf_df.sql(
-            "SELECT g5k_cluster, node, tool, power_energy_cores as cores, power_energy_pkg as pkg, power_energy_ram as ram, target_frequency, temperature_start, temperature_stop, iteration FROM self"
-        )
+def node_partitions(files: List[str]) -> Dict[str, List[str]]:
+    """
+    Group files by node directory, <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>
+    """
+    partitions = {}
+    for file in files:
+        partitions.setdefault(os.path.dirname(file), []).append(file)
+    return partitions
 
 
-def load_hwpc_frequency(batch_identifier="", results_directory=""):
-    print("Loading HWPC Frequency Results")
-    hwpc_frequency_csv_file = f"../data/{batch_identifier}.d/hwpc_frequency.csv"
-    if os.path.exists(hwpc_frequency_csv_file):
-        print("Returning content from :", hwpc_frequency_csv_file)
-        hwpc_df = pl.read_csv(hwpc_frequency_csv_file)
-        return hwpc_df
-    else:
-        regex = "frequency.*hwpc_and.*csv"
-        print("No import found, will load from raw files matching regex : ", regex)
-        hwpc_frequency_raw_files = utils.find_files(
-            root_dir=results_directory, regex=regex
-        )
-        hwpc_dfs = []
-        for file in hwpc_frequency_raw_files:
-            site, g5k_cluster, node, frequency, _tool1, _tool2 = (
-                frequency_file_metadata(file)
-            )
-            hwpc_df = pl.read_csv(file)
-            hwpc_df = hwpc_df.with_columns(
-                node=pl.lit(node),
-                g5k_cluster=pl.lit(g5k_cluster),
-            )
-            hwpc_dfs.append(hwpc_df)
-        hwpc_df = pl.concat(hwpc_dfs)
-        hwpc_df = hwpc_df.drop(["sensor", "target", "time_enabled", "time_running"])
-        hwpc_df = hwpc_df.sql("""
-                              SELECT g5k_cluster, node, timestamp, SUM(rapl_energy_cores) as cores, SUM(rapl_energy_pkg) as pkg, SUM(rapl_energy_dram) as ram, iteration, frequency 
-                              FROM self 
-                              GROUP BY timestamp, frequency, iteration, node, g5k_cluster
-                              """)
-        hwpc_df.write_csv(hwpc_frequency_csv_file)
-        return hwpc_df
-
-
-def load_codecarbon_frequency(batch_identifier="", results_directory=""):
-    print("Loading Codecarbon Frequency Results")
-    codecarbon_frequency_csv_file = (
-        f"../data/{batch_identifier}.d/codecarbon_frequency.csv"
+def read_node_files(
+    files: List[str], read_file: Callable[[str], Optional[pl.DataFrame]]
+) -> Optional[pl.DataFrame]:
+    """
+    Build the partition of a node from the frames `read_file` returns for each of its files
+    """
+    frames = [df for df in map(read_file, files) if df is not None]
+    if not frames:
+        return None
+    return pl.concat(frames, how="vertical")
+
+
+def read_perf_frequency_file(file: str) -> Optional[pl.DataFrame]:
+    # Temperature files are inputs of the node partition, read along their perf file
+    if os.path.basename(file).startswith("temperatures_"):
+        return None
+    print("Reading perf file :", file)
+    site, g5k_cluster, node, frequency, tool1, tool2 = frequency_file_metadata(file)
+    matching_temperature_file = os.path.join(
+        os.path.dirname(file), f"temperatures_frequency_{frequency}_perf_and_{tool2}.csv"
     )
-    if os.path.exists(codecarbon_frequency_csv_file):
-        print("Returning content from :", codecarbon_frequency_csv_file)
-        codecarbon_df = pl.read_csv(codecarbon_frequency_csv_file)
-        return codecarbon_df
-    else:
-        regex = "frequency.*codecarbon_and.*csv"
-        print("No import found, will load from raw files matching regex : ", regex)
-        codecarbon_frequency_raw_files = utils.find_files(
-            root_dir=results_directory, regex=regex
+    if file.endswith(".csv"):
+        perf_df = pl.read_csv(file).with_columns(
+            window_start_ns=pl.lit(None, dtype=pl.Int64)
         )
-
-        codecarbon_dfs = []
-        for file in codecarbon_frequency_raw_files:
-            site, g5k_cluster, node, frequency, _tool1, _tool2 = (
-                frequency_file_metadata(file)
-            )
-            codecarbon_df = pl.read_csv(
-                source=file,
-            )
-            codecarbon_df = codecarbon_df.unique(keep="any")
-            codecarbon_df = codecarbon_df.with_columns(
-                [
-                    (
-                        pl.col("timestamp")
-                        .map_elements(
-                            lambda x: datetime.timestamp(datetime.fromisoformat(x)),
-                            return_dtype=pl.Float64,
-                        )
-                        .alias("timestamp")
-                    )
-                ]
-            )
-            codecarbon_df = codecarbon_df.pivot(
-                on="domain",
-                index="timestamp",
-                values=["energy", "iteration"],
-                aggregate_function="sum",
-            )
-            codecarbon_df = codecarbon_df.with_columns(
-                g5k_cluster=pl.lit(g5k_cluster),
-                node=pl.lit(node),
-                frequency=pl.lit(frequency),
-                pkg=pl.lit(0.0),
-            )
-            codecarbon_dfs.append(
-                codecarbon_df.sql(
-                    "SELECT g5k_cluster, node, timestamp, energy_CPU as cores, pkg, energy_RAM as ram, iteration_CPU as iteration, frequency FROM self"
-                )
-            )
-
-        codecarbon_df = pl.concat(codecarbon_dfs)
-        codecarbon_df.write_csv(codecarbon_frequency_csv_file)
-        return codecarbon_df
-
-
-def load_alumet_frequency(batch_identifier="", results_directory=""):
-    print("Loading alumet Frequency Results")
-    alumet_frequency_csv_file = f"../data/{batch_identifier}.d/alumet_frequency.csv"
-    if os.path.exists(alumet_frequency_csv_file):
-        print("Returning content from :", alumet_frequency_csv_file)
-        alumet_df = pl.read_csv(alumet_frequency_csv_file)
-        return alumet_df
     else:
-        regex = "frequency.*alumet_and.*csv"
-        print("No import found, will load from raw files matching regex : ", regex)
-        alumet_frequency_raw_files = utils.find_files(
-            root_dir=results_directory, regex=regex
+        # Raw perf stat output, parsed without the intermediate CSV
+        perf_df = perf_stat.read_perf_stat(file).with_columns(
+            frequency=pl.lit(frequency)
         )
-        alumet_dfs = []
-        for file in alumet_frequency_raw_files:
-            site, g5k_cluster, node, frequency, _tool1, _tool2 = (
-                frequency_file_metadata(file)
-            )
-            alumet_df = pl.read_csv(
-                source=file,
-            )
-            alumet_df = alumet_df.with_columns(
-                [
-                    (
-                        pl.col("timestamp")
-                        .map_elements(
-                            lambda x: datetime.timestamp(
-                                datetime.fromisoformat(clamp_date(x))
-                            ),
-                            return_dtype=pl.Float64,
-                        )
-                        .alias("timestamp")
-                    )
-                ]
-            )
-            alumet_df = alumet_df.unique(keep="any")
-            alumet_df = alumet_df.sql(
-                "SELECT domain, timestamp, SUM(energy) as energy, iteration FROM self GROUP BY domain, timestamp, iteration"
-            )
-            alumet_df = alumet_df.pivot(
-                on="domain", index="timestamp", values=["energy", "iteration"]
-            )
-            alumet_df = alumet_df.with_columns(
-                g5k_cluster=pl.lit(g5k_cluster),
-                node=pl.lit(node),
-                frequency=pl.lit(frequency),
-                cores=pl.lit(0.0),
-            )
-            alumet_dfs.append(
-                alumet_df.sql(
-                    "SELECT g5k_cluster, node, timestamp, cores, energy_package as pkg, energy_dram as ram, iteration_package as iteration, frequency FROM self"
-                )
+    perf_df = perf_df.with_columns(
+        tool=pl.lit(tool2),
+        node=pl.lit(node),
+        g5k_cluster=pl.lit(g5k_cluster),
+        target_frequency=pl.lit(frequency),
+    )
+    # Windows recorded around perf stat in epoch nanoseconds by the benchmark, older
+    # temperature files do not have them and the ctime header of perf is used instead
+    temperature_df = pl.read_csv(matching_temperature_file).rename(
+        {"window_start_ns": "recorded_start_ns", "window_stop_ns": "recorded_stop_ns"},
+        strict=False,
+    )
+    for column in ["recorded_start_ns", "recorded_stop_ns"]:
+        if column not in temperature_df.columns:
+            temperature_df = temperature_df.with_columns(
+                pl.lit(None, dtype=pl.Int64).alias(column)
             )
-        alumet_df = pl.concat(alumet_dfs)
-        alumet_df.write_csv(alumet_frequency_csv_file)
-        return alumet_df
-
-
-def clamp_date(date):
-    if len(date) > 26:
-        return date[:26]
-    elif len(date) > 23:
-        return date[:23]
-    else:
-        return date
+    return (
+        pl.sql(
+            "SELECT * FROM perf_df JOIN temperature_df ON perf_df.iteration = temperature_df.iteration"
+        )
+        .collect()
+        .with_columns(
+            window_start_ns=pl.coalesce("recorded_start_ns", "window_start_ns"),
+            window_stop_ns=pl.col("recorded_stop_ns"),
+        )
+        .drop("recorded_start_ns", "recorded_stop_ns")
+    )
 
 
-def load_scaphandre_frequency(batch_identifier="", results_directory=""):
-    print("Loading scaphandre Frequency Results")
-    scaphandre_frequency_csv_file = (
-        f"../data/{batch_identifier}.d/scaphandre_frequency.csv"
+def perf_frequency_files(results_directory: str) -> List[str]:
+    """
+    Perf frequency files of `results_directory`, raw perf stat outputs are read
+    directly and the CSV aggregated from them is then ignored
+    """
+    raw_files = catalog.find_files(
+        root_dir=results_directory, regex="frequency_[0-9]+_perf_and_[a-z]+$"
     )
-    if os.path.exists(scaphandre_frequency_csv_file):
-        print("Returning content from :", scaphandre_frequency_csv_file)
-        scaphandre_df = pl.read_csv(scaphandre_frequency_csv_file)
-        return scaphandre_df
-    else:
-        regex = "frequency.*scaphandre_and.*csv"
-        print("No import found, will load from raw files matching regex : ", regex)
-        scaphandre_frequency_raw_files = utils.find_files(
-            root_dir=results_directory, regex=regex
-        )
-        scaphandre_dfs = []
-        for file in scaphandre_frequency_raw_files:
-            print("Reading scaphandre frequency file", file)
-            site, g5k_cluster, node, frequency, _tool1, _tool2 = (
-                frequency_file_metadata(file)
-            )
-            scaphandre_df = pl.read_csv(
-                source=file,
-            )
-            scaphandre_df = scaphandre_df.unique(keep="any")
-            scaphandre_df = scaphandre_df.pivot(
-                on="domain", index="timestamp", values=["energy", "iteration"]
-            )
-            scaphandre_df = scaphandre_df.with_columns(
-                g5k_cluster=pl.lit(g5k_cluster),
-                node=pl.lit(node),
-                cores=pl.lit(0.0),
-                ram=pl.lit(0.0),
-                frequency=pl.lit(frequency),
-            )
-            scaphandre_dfs.append(
-                scaphandre_df.sql(
-                    "SELECT g5k_cluster, node, timestamp, cores, energy_package as pkg, ram, iteration_package as iteration, frequency FROM self"
-                )
-            )
-        scaphandre_df = pl.concat(scaphandre_dfs)
-        scaphandre_df.write_csv(scaphandre_frequency_csv_file)
-        return scaphandre_df
-
-
-def load_vjoule_frequency(batch_identifier="", results_directory=""):
-    print("Loading vjoule Frequency Results")
-    vjoule_frequency_csv_file = f"../data/{batch_identifier}.d/vjoule_frequency.csv"
-    if os.path.exists(vjoule_frequency_csv_file):
-        print("Returning content from :", vjoule_frequency_csv_file)
-        vjoule_df = pl.read_csv(vjoule_frequency_csv_file)
-        return vjoule_df
-    else:
-        regex = "frequency.*vjoule_and.*csv"
-        print("No import found, will load from raw files matching regex : ", regex)
-        vjoule_dfs = []
-        vjoule_frequency_raw_files = utils.find_files(
-            root_dir=results_directory, regex=regex
-        )
-        for file in vjoule_frequency_raw_files:
-            site, g5k_cluster, node, frequency, _tool1, _tool2 = (
-                frequency_file_metadata(file)
-            )
-            vjoule_df = pl.read_csv(
-                source=file,
-            )
-            vjoule_df = vjoule_df.unique(keep="any")
-            vjoule_df = vjoule_df.with_columns(
-                [
-                    (pl.col("timestamp").str.strip_chars().alias("timestamp")),
-                    (pl.col("energy").str.strip_chars().alias("energy")),
-                ]
-            )
-            vjoule_df = vjoule_df.cast(
-                {
-                    "energy": pl.Float64,
-                }
-            )
+    csv_files = catalog.find_files(
+        root_dir=results_directory, regex="frequency.*perf_and.*csv"
+    )
+    raw = set(raw_files)
+    return raw_files + [file for file in csv_files if file[: -len(".csv")] not in raw]
 
-            vjoule_df = vjoule_df.pivot(
-                on="domain",
-                index="timestamp",
-                values=["energy", "iteration"],
-                aggregate_function="sum",
-            )
-            vjoule_df = vjoule_df.with_columns(
-                g5k_cluster=pl.lit(g5k_cluster),
-                node=pl.lit(node),
-                cores=pl.lit(0.0),
-                frequency=pl.lit(frequency),
+
+def load_perf_frequency(batch_identifier="", results_directory=""):
+    print("Loading Perf Frequency Results")
+    perf_frequency_raw_files = perf_frequency_files(results_directory)
+    partitions = node_partitions(perf_frequency_raw_files)
+    for node_directory, files in partitions.items():
+        for file in list(files):
+            site, g5k_cluster, node, frequency, tool1, tool2 = frequency_file_metadata(
+                file
             )
-            vjoule_dfs.append(
-                vjoule_df.sql(
-                    "SELECT g5k_cluster, node, timestamp, cores, energy_CPU as pkg, energy_RAM as ram, iteration_CPU as iteration, frequency FROM self"
-                )
+            files.append(
+                f"{node_directory}/temperatures_frequency_{frequency}_perf_and_{tool2}.csv"
             )
-        vjoule_df = pl.concat(vjoule_dfs)
-        vjoule_df.write_csv(vjoule_frequency_csv_file)
-        return vjoule_df
-
-def load_vjoule_frequency_agg(batch_identifier="", results_directory=""):
-    print("Loading vjoule Frequency Results")
-    vjoule_frequency_csv_file = f"../data/{batch_identifier}.d/vjoule_frequency_agg.csv"
-
-    if os.path.exists(vjoule_frequency_csv_file):
-        print("Returning content from :", vjoule_frequency_csv_file)
-        return pl.read_csv(vjoule_frequency_csv_file)
-
-    # Else: load raw files
-    regex = "frequency.*vjoule_and.*csv"
-    print("No import found, will load from raw files matching regex : ", regex)
-
-    vjoule_dfs = []
-    vjoule_frequency_raw_files = utils.find_files(
-        root_dir=results_directory,
-        regex=regex
+    return cache.load_partitioned(
+        batch_identifier,
+        "perf_frequency",
+        partitions,
+        partial(read_node_files, read_file=read_perf_frequency_file),
+        schema=schemas.perf_frequency_columns,
+        version=CACHE_VERSIONS["perf_frequency"],
     )
 
-    for file in vjoule_frequency_raw_files:
-        site, g5k_cluster, node, frequency, _tool1, _tool2 = frequency_file_metadata(file)
-
-        vjoule_df = pl.read_csv(file).unique(keep="any")
 
-        # Clean columns
-        vjoule_df = vjoule_df.with_columns(
-            [
-                pl.col("timestamp").str.strip_chars().alias("timestamp"),
-                pl.col("energy").str.strip_chars().alias("energy"),
-            ]
-        )
+def tool_frequency_files(tool: str, results_directory: str) -> List[str]:
+    """
+    Frequency files of `tool` in `results_directory`, see tool_specs.TOOL_SPECS
+    """
+    return catalog.find_files(
+        root_dir=results_directory, regex=tool_specs.TOOL_SPECS[tool]["file_regex"]
+    )
 
-        # Cast types
-        vjoule_df = vjoule_df.cast({"energy": pl.Float64})
 
-        # ---- NEW PART: keep only last energy per (iteration, domain) ----
-        vjoule_df = (
-            vjoule_df
-            .sort("timestamp")
-            .group_by(["iteration", "domain"])
-            .tail(1)    # keep latest record for each pair
-        )
+SCAPHANDRE_REPORTS_FILE = re.compile(
+    r"^frequency_(\d+)_scaphandre_and_[a-z0-9]+_(\d+)\.json$"
+)
 
-        # Pivot
-        vjoule_df = vjoule_df.pivot(
-            on="domain",
-            index="timestamp",
-            values=["energy", "iteration"],
-            aggregate_function="sum",
-        )
 
-        # Add metadata
-        vjoule_df = vjoule_df.with_columns(
+def read_scaphandre_reports_file(file: str) -> pl.DataFrame:
+    print("Reading scaphandre reports file", file)
+    site, g5k_cluster, node, frequency, _tool1, _tool2 = frequency_file_metadata(file)
+    iteration = int(SCAPHANDRE_REPORTS_FILE.match(os.path.basename(file)).group(2))
+    frames = list(scaphandre.iter_report_batches(file, iteration))
+    if not frames:
+        return pl.DataFrame(schema=schemas.scaphandre_report_columns)
+    return (
+        pl.concat(frames, how="vertical")
+        .with_columns(
             g5k_cluster=pl.lit(g5k_cluster),
             node=pl.lit(node),
-            cores=pl.lit(0.0),
             frequency=pl.lit(frequency),
         )
-
-        # Reorder/select columns via SQL
-        vjoule_dfs.append(
-            vjoule_df.sql(
-                """
-                SELECT 
-                    g5k_cluster, node, timestamp, cores,
-                    energy_CPU AS pkg,
-                    energy_RAM AS ram,
-                    iteration_CPU AS iteration,
-                    frequency
-                FROM self
-                """
-            )
-        )
-
-    # Concatenate across files
-    vjoule_df = pl.concat(vjoule_dfs)
-
-    # Save cache
-    vjoule_df.write_csv(vjoule_frequency_csv_file)
-
-    return vjoule_df
-
-
-def load_codecarbon_frequency_agg(batch_identifier="", results_directory=""):
-    print("Loading codecarbon Frequency Results")
-    codecarbon_frequency_csv_file = f"../data/{batch_identifier}.d/codecarbon_frequency_agg.csv"
-
-    if os.path.exists(codecarbon_frequency_csv_file):
-        print("Returning content from :", codecarbon_frequency_csv_file)
-        return pl.read_csv(codecarbon_frequency_csv_file)
-
-    # Else: load raw files
-    regex = "frequency.*codecarbon_and.*csv"
-    print("No import found, will load from raw files matching regex : ", regex)
-
-    codecarbon_dfs = []
-    codecarbon_frequency_raw_files = utils.find_files(
-        root_dir=results_directory,
-        regex=regex
+        .select(list(schemas.scaphandre_report_columns))
     )
 
-    for file in codecarbon_frequency_raw_files:
-        site, g5k_cluster, node, frequency, _tool1, _tool2 = frequency_file_metadata(file)
 
-        codecarbon_df = pl.read_csv(file).unique(keep="any")
-
-        # Clean columns
-        codecarbon_df = codecarbon_df.with_columns(
-            [
-                pl.col("timestamp").str.strip_chars().alias("timestamp"),
-            ]
-        )
-
-        # Cast types
-        codecarbon_df = codecarbon_df.cast({"energy": pl.Float64})
+def load_scaphandre_reports(batch_identifier="", results_directory=""):
+    """
+    Scaphandre JSON reports of frequency runs with their per-socket and per-process
+    fields, see scaphandre.socket_domains and scaphandre.consumers for flat views
+    """
+    print("Loading scaphandre Frequency Reports")
+    regex = "frequency_[0-9]+_scaphandre_and_.*json"
+    scaphandre_reports_files = catalog.find_files(
+        root_dir=results_directory, regex=regex
+    )
+    return cache.load_partitioned(
+        batch_identifier,
+        "scaphandre_reports",
+        node_partitions(scaphandre_reports_files),
+        partial(read_node_files, read_file=read_scaphandre_reports_file),
+        schema=schemas.scaphandre_report_columns,
+        version=CACHE_VERSIONS["scaphandre_reports"],
+    )
 
-        # ---- NEW PART: keep only last energy per (iteration, domain) ----
-        codecarbon_df = (
-            codecarbon_df
-            .sort("timestamp")
-            .group_by(["iteration", "domain"])
-            .tail(1)    # keep latest record for each pair
-        )
 
-        # Pivot
-        codecarbon_df = codecarbon_df.pivot(
-            on="domain",
-            index="timestamp",
-            values=["energy", "iteration"],
-            aggregate_function="sum",
+def read_sample_files(
+    files: List[str], results_directory: str
+) -> Optional[pl.DataFrame]:
+    """
+    Samples of the frequency `files` of a node and tool, read after the spec of the tool.
+    Repeated samples are dropped file by file and counted in the catalog.
+    """
+    frames = []
+    duplicates = {}
+    for file in files:
+        print("Reading frequency file :", file)
+        site, g5k_cluster, node, frequency, tool, _tool2 = frequency_file_metadata(file)
+        spec = tool_specs.TOOL_SPECS[tool]
+        samples_lf = samples.long_samples(
+            tool_specs.scan_samples(file, spec).with_columns(
+                g5k_cluster=pl.lit(g5k_cluster),
+                node=pl.lit(node),
+                frequency=pl.lit(frequency),
+            ),
+            tool,
+            spec,
         )
+        if spec["deduplicate"] is not None:
+            samples_df, duplicates[file] = samples.deduplicate(
+                samples_lf.collect(), samples.DEDUPLICATION_KEYS[spec["deduplicate"]]
+            )
+            if duplicates[file]:
+                print(f"{duplicates[file]} repeated samples dropped from {file}")
+            samples_lf = samples_df.lazy()
+        frames.append(samples.canonical_samples(samples_lf, spec))
+    if duplicates:
+        catalog.record_duplicates(results_directory, duplicates)
+    if not frames:
+        return None
+    return pl.concat(frames, how="vertical").collect(engine="streaming")
+
+
+def load_samples(batch_identifier="", results_directory=""):
+    """
+    Frequency samples of every tool spec in long format, sorted by samples.SAMPLE_KEYS,
+    see samples.py. Scaphandre samples are streamed from the JSON reports of each run,
+    runs without reports are read from the CSV written by the yq projection.
+    """
+    print("Loading Frequency Samples")
+    reports_df = load_scaphandre_reports(
+        batch_identifier=batch_identifier, results_directory=results_directory
+    )
+    report_runs = set(reports_df.select("node", "frequency").unique().iter_rows())
+    # Cached per node and tool, only the partitions with new or modified files are
+    # loaded again and a file that fails leaves out the samples of its tool only
+    partitions = {}
+    for tool in tool_specs.TOOL_SPECS:
+        tool_files = [
+            file
+            for file in tool_frequency_files(tool, results_directory)
+            if tool != "scaphandre"
+            or frequency_file_metadata(file)[2:4] not in report_runs
+        ]
+        for node_directory, files in node_partitions(tool_files).items():
+            partitions[os.path.join(node_directory, tool)] = files
+    samples_df = cache.load_partitioned(
+        batch_identifier,
+        "samples",
+        partitions,
+        partial(read_sample_files, results_directory=results_directory),
+        schema=schemas.sample_columns,
+        version=CACHE_VERSIONS["samples"],
+    )
+    return pl.concat(
+        [samples_df, scaphandre.samples(reports_df)], how="vertical"
+    ).sort(samples.SAMPLE_KEYS)
 
-        # Add metadata
-        codecarbon_df = codecarbon_df.with_columns(
-            g5k_cluster=pl.lit(g5k_cluster),
-            node=pl.lit(node),
-            cores=pl.lit(0.0),
-            frequency=pl.lit(frequency),
-        )
 
-        # Reorder/select columns via SQL
-        codecarbon_dfs.append(
-            codecarbon_df.sql(
-                """
-                SELECT 
-                    g5k_cluster, node, timestamp, cores,
-                    energy_CPU AS pkg,
-                    energy_RAM AS ram,
-                    iteration_CPU AS iteration,
-                    frequency
-                FROM self
-                """
-            )
+def load_tool_frequency(
+    tool: str,
+    batch_identifier="",
+    results_directory="",
+    last_sample: bool = False,
+    samples_df: pl.DataFrame = None,
+):
+    """
+    Frequency samples of `tool` with one column per domain, see samples.frequency_view.
+    With `last_sample` only the last sample of each domain of an iteration is kept,
+    the iteration totals of cumulative tools (the former *_frequency_agg loaders).
+    `samples_df` defaults to load_samples.
+    """
+    print(f"Loading {tool} Frequency Results")
+    if samples_df is None:
+        samples_df = load_samples(
+            batch_identifier=batch_identifier, results_directory=results_directory
         )
-
-    # Concatenate across files
-    codecarbon_df = pl.concat(codecarbon_dfs)
-
-    # Save cache
-    codecarbon_df.write_csv(codecarbon_frequency_csv_file)
-
-    return codecarbon_df
-
-
+    return samples.frequency_view(samples_df, tool, last_sample=last_sample).collect()
 
 
 def polish_frequency(frequency_df):
@@ -1219,55 +963,8 @@ def load_inventory(batch_identifier=""):
         directory=inventories_directory, schema=schemas.nodes_configuration_columns
     )
 
-    inventory_df = inventory_df.with_columns(
-        [
-            # (pl.col("processor_version").map_elements(lambda x: f"{x}\nGen: {vendor_generation_map[x]['architecture']}\nRelease: {vendor_generation_map[x]['launch_date']}", return_dtype=pl.String).alias("processor_detail")),
-            (
-                pl.col("processor_version")
-                .map_elements(
-                    lambda x: f"{x}\n{vendor_generation_map[x]['architecture']}",
-                    return_dtype=pl.String,
-                )
-                .alias("processor_detail")
-            ),
-            (
-                pl.col("processor_version")
-                .map_elements(
-                    lambda x: f"{vendor_generation_map[x]['generation']}",
-                    return_dtype=pl.String,
-                )
-                .alias("processor_generation")
-            ),
-            (
-                pl.col("processor_version")
-                .map_elements(
-                    lambda x: f"{vendor_generation_map[x]['vendor']}",
-                    return_dtype=pl.String,
-                )
-                .alias("processor_vendor")
-            ),
-            (
-                pl.col("processor_version")
-                .map_elements(
-                    lambda x: vendor_generation_map[x]["numa_nodes_first_cpus"],
-                    return_dtype=pl.List(pl.Int64),
-                )
-                .alias("numa_nodes_first_cpus")
-            ),
-        ]
-    )
-    return inventory_df
-
-
-def load_energy(batch_identifier=""):
-    print("Loading Energy Results")
-    energy_csv_file = f"../data/{batch_identifier}/energy.csv"
-    if os.path.exists(energy_csv_file):
-        print("Returning content from :", energy_csv_file)
-        energy_df = pd.read_csv(energy_csv_file)
-        return energy_df
-    # TODO
-    return energy_df
+    # Single join with the processor catalog, unknown versions are reported
+    return processors.attach_processors(inventory_df)
 
 
 def load_energy_stats(batch_identifier=""):
@@ -1286,30 +983,25 @@ def baseline_file_metadata(filename):
     return g5k_cluster, node
 
 
+def read_baseline_file(file: str) -> Optional[pl.DataFrame]:
+    g5k_cluster, node = baseline_file_metadata(file)
+    baseline_df = pl.read_csv(file)
+    if baseline_df.shape[0] == 0:
+        print("No Baseline data found for ", file)
+        return None
+    baseline_df = baseline_df.cast({cs.numeric(): pl.Float32})
+    return baseline_df.with_columns(g5k_cluster=pl.lit(g5k_cluster), node=pl.lit(node))
+
+
 def load_baseline(batch_identifier="", results_directory=""):
     print("Loading Baseline Results")
-    baseline_csv_file = f"../data/{batch_identifier}.d/baseline_consumption.csv"
-    if os.path.exists(baseline_csv_file):
-        print("Returning content from :", baseline_csv_file)
-        baseline_df = pl.read_csv(baseline_csv_file)
-        return baseline_df
-    else:
-        regex = "baseline_consumption.csv"
-        print("No import found, will load from raw files matching regex : ", regex)
-        baseline_raw_files = utils.find_files(root_dir=results_directory, regex=regex)
-        baseline_dfs = []
-        for file in baseline_raw_files:
-            g5k_cluster, node = baseline_file_metadata(file)
-            baseline_df = pl.read_csv(file)
-            if baseline_df.shape[0] == 0:
-                print("No Baseline data found for ", file)
-                continue
-            baseline_df = baseline_df.cast({cs.numeric(): pl.Float32})
-            baseline_df = baseline_df.with_columns(
-                g5k_cluster=pl.lit(g5k_cluster), node=pl.lit(node)
-            )
-            baseline_dfs.append(baseline_df)
-
-        baseline_df = pl.concat(baseline_dfs)
-        baseline_df.write_csv(baseline_csv_file)
-        return baseline_df
+    regex = "baseline_consumption.csv"
+    baseline_raw_files = catalog.find_files(root_dir=results_directory, regex=regex)
+    return cache.load_partitioned(
+        batch_identifier,
+        "baseline_consumption",
+        node_partitions(baseline_raw_files),
+        partial(read_node_files, read_file=read_baseline_file),
+        schema=schemas.baseline_columns,
+        version=CACHE_VERSIONS["baseline_consumption"],
+    )
@@ -6,6 +6,7 @@
 #     "matplotlib==3.10.7",
 #     "mplcyberpunk==0.7.6",
 #     "numpy==2.3.5",
+#     "orjson",
 #     "polars==1.34.0",
 #     "pyarrow",
 #     "ruff==0.14.4",
@@ -56,7 +57,33 @@ def _():
 
     import json
     from pathlib import Path
-    return Path, json, load, math, mo, np, pd, pl, plt, re, sns, test_file_load
+    import catalog # Results tree catalog
+    import inventories # Grid5000 node inventories
+    import processors # Processor catalog
+    import rapl # HWPC fixed point decoding
+    import moments # Mergeable energy moments
+    import frequencies # Reached sampling frequencies
+    import visualization # Shared plots
+    return (
+        Path,
+        catalog,
+        frequencies,
+        inventories,
+        json,
+        load,
+        mo,
+        moments,
+        np,
+        pd,
+        pl,
+        plt,
+        processors,
+        rapl,
+        re,
+        sns,
+        test_file_load,
+        visualization,
+    )
 
 
 @app.cell
@@ -66,195 +93,10 @@ def _(mo):
 
 
 @app.cell(hide_code=True)
-def vendor_generation_map_1():
-    vendor_generation_map = {
-        "E5-2620 v4": {
-            "architecture": "Broadwell-E",
-            "vendor": "Intel",
-            "generation": 6,
-            "launch_date": "2016 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "E5-2630L v4": {
-            "architecture": "Broadwell-E",
-            "vendor": "Intel",
-            "generation": 6,
-            "launch_date": "2016 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "E5-2698 v4": {
-            "architecture": "Broadwell-E",
-            "vendor": "Intel",
-            "generation": 6,
-            "launch_date": "2016 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "E5-2630 v3": {
-            "architecture": "Haswell-E",
-            "vendor": "Intel",
-            "generation": 5,
-            "launch_date": "2014 Q3",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "Gold 5220": {
-            "architecture": "Cascade Lake-SP",
-            "vendor": "Intel",
-            "generation": 10,
-            "launch_date": "2019 Q2",
-            "numa_nodes_number": "1",
-            "numa_nodes_first_cpus": [0],
-        },
-        "Gold 5218": {
-            "architecture": "Cascade Lake-SP",
-            "vendor": "Intel",
-            "generation": 10,
-            "launch_date": "2019 Q2",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "i7-9750H": {
-            "architecture": "Coffee Lake",
-            "vendor": "Intel",
-            "generation": 9,
-            "launch_date": "2019 Q2",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "Silver 4314": {
-            "architecture": "Ice Lake-SP",
-            "vendor": "Intel",
-            "generation": 10,
-            "launch_date": "2021 Q2",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "Gold 5320": {
-            "architecture": "Ice Lake-SP",
-            "vendor": "Intel",
-            "generation": 10,
-            "launch_date": "2021 Q2",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "Gold 6126": {
-            "architecture": "Skylake-SP",
-            "vendor": "Intel",
-            "generation": 6,
-            "launch_date": "2017 Q3",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "Gold 6130": {
-            "architecture": "Skylake-SP",
-            "vendor": "Intel",
-            "generation": 6,
-            "launch_date": "2017 Q3",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "E5-2620": {
-            "architecture": "Sandy Bridge-EP",
-            "vendor": "Intel",
-            "generation": 3,
-            "launch_date": "2012 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "E5-2630": {
-            "architecture": "Sandy Bridge-EP",
-            "vendor": "Intel",
-            "generation": 3,
-            "launch_date": "2012 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "E5-2630L": {
-            "architecture": "Sandy Bridge-EP",
-            "vendor": "Intel",
-            "generation": 3,
-            "launch_date": "2012 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "E5-2660": {
-            "architecture": "Sandy Bridge-EP",
-            "vendor": "Intel",
-            "generation": 3,
-            "launch_date": "2012 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "X5670": {
-            "architecture": "Westmere-EP",
-            "vendor": "Intel",
-            "generation": 1,
-            "launch_date": "2010 Q1",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "7301": {
-            "architecture": "Zen",
-            "vendor": "AMD",
-            "generation": 1,
-            "launch_date": "2017 Q2",
-            "numa_nodes_number": "8",
-            "numa_nodes_first_cpus": [0, 1, 2, 3, 4, 5, 6, 7],
-        },
-        "7352": {
-            "architecture": "Zen 2",
-            "vendor": "AMD",
-            "generation": 2,
-            "launch_date": "2019 Q3",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "7452": {
-            "architecture": "Zen 2",
-            "vendor": "AMD",
-            "generation": 2,
-            "launch_date": "2019 Q3",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "7642": {
-            "architecture": "Zen 2",
-            "vendor": "AMD",
-            "generation": 2,
-            "launch_date": "2019 Q3",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "7742": {
-            "architecture": "Zen 2",
-            "vendor": "AMD",
-            "generation": 2,
-            "launch_date": "2019 Q3",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "250": {
-            "architecture": "Opteron",
-            "vendor": "AMD",
-            "generation": 1,
-            "launch_date": "2004 Q4",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-        "99xx": {
-            "architecture": "ThunderX2",
-            "vendor": "Cavium",
-            "generation": 1,
-            "launch_date": "2016 Q2",
-            "numa_nodes_number": "2",
-            "numa_nodes_first_cpus": [0, 1],
-        },
-    }
-
-    return (vendor_generation_map,)
+def vendor_generation_map_1(processors):
+    # Shared with load.py, see processor_catalog.json
+    processor_catalog = processors.load_catalog()
+    return (processor_catalog,)
 
 
 @app.cell
@@ -281,72 +123,20 @@ def globals(sns):
 
 
 @app.cell
-def _(Path, inventories_directory, json, pl, vendor_generation_map):
-    def load_inventory(directory: str) -> pl.DataFrame:
-        data = []
-        print("Loading inventory from:", directory)
-
-        for file_path in Path(directory).rglob("*.json"):
-            try:
-                with open(file_path, "r") as f:
-                    content = json.load(f)
-
-                cluster = content.get("cluster")
-                cores = content.get("architecture", {}).get("nb_cores")
-                microarch = content.get("processor", {}).get("microarchitecture")
-                vendor = content.get("processor", {}).get("vendor")
-                version = content.get("processor", {}).get("version")
-                other_desc = content.get("processor", {}).get("other_description")
-
-                data.append({
-                    "cluster": cluster,
-                    "cores_per_node": cores,
-                    "microarchitecture": microarch,
-                    "vendor": vendor,
-                    "version": version,
-                    "other_description": other_desc
-                })
-
-            except Exception as e:
-                print(f"Error reading {file_path}: {e}")
-
-        df = pl.DataFrame(data)
-
-        # Count nodes & compute total cores per cluster
-        return (
-            df.group_by("cluster")
-            .agg([
-                pl.len().alias("node_count"),
-                pl.first("cores_per_node"),
-                pl.first("microarchitecture"),
-                pl.first("vendor"),
-                pl.first("version"),
-                pl.first("other_description")
-            ])
-            .with_columns(
-                (pl.col("node_count") * pl.col("cores_per_node")).alias("total_cores")
-            )
-        )
+def _(inventories, inventories_directory, pl, processor_catalog):
+    # Node inventories are parsed once per change of the inventory directory
+    nodes = inventories.load_nodes(inventories_directory)
+    inventory = inventories.cluster_summary(nodes)
 
-    inventory = load_inventory(directory=inventories_directory)
-
-    # Step 1: Convert vendor_generation_map to a Polars DataFrame
-    map_data = [
-        {"version": version, **info}
-        for version, info in vendor_generation_map.items()
-    ]
-
-    vendor_map_df = pl.DataFrame(map_data)
-
-    # Step 2: Join with inventory on "version"
+    # Join the processor catalog on "version"
     inventory = inventory.join(
-        vendor_map_df,
+        processor_catalog,
         left_on="version",
         right_on="version",
         how="left"
     )
 
-    # Step 3: Optional: create processor_description column
+    # Optional: create processor_description column
     inventory = inventory.with_columns([
         (pl.col("architecture").cast(str) + " (" + pl.col("launch_date") + ")").alias("processor_description")
     ])
@@ -633,6 +423,9 @@ def _(mo):
 @app.cell
 def _(batch_identifier, load, results_directory):
 
+    frequency_samples = load.load_samples(
+        batch_identifier=batch_identifier, results_directory=results_directory
+    )
     (
         perf_frequency,
         hwpc_frequency,
@@ -641,15 +434,18 @@ def _(batch_identifier, load, results_directory):
         scaphandre_frequency,
         vjoule_frequency,
     ) = load.load_frequency(
-        batch_identifier=batch_identifier, results_directory=results_directory
+        batch_identifier=batch_identifier,
+        results_directory=results_directory,
+        samples_df=frequency_samples,
     )
 
-    vjoule_frequency_agg_raw = load.load_vjoule_frequency_agg(batch_identifier, results_directory)
-    codecarbon_frequency_agg_raw = load.load_codecarbon_frequency_agg(batch_identifier, results_directory)
+    vjoule_frequency_agg_raw = load.load_tool_frequency("vjoule", last_sample=True, samples_df=frequency_samples)
+    codecarbon_frequency_agg_raw = load.load_tool_frequency("codecarbon", last_sample=True, samples_df=frequency_samples)
     return (
         alumet_frequency,
         codecarbon_frequency,
         codecarbon_frequency_agg_raw,
+        frequency_samples,
         hwpc_frequency,
         scaphandre_frequency,
         vjoule_frequency,
@@ -661,76 +457,39 @@ def _(batch_identifier, load, results_directory):
 def _(
     alumet_frequency,
     codecarbon_frequency,
+    frequencies,
     hwpc_frequency,
-    np,
     pl,
     scaphandre_frequency,
     vjoule_frequency,
 ):
-    def collect_frequency_data(frequency_df, frequencies, metadatada):
-        tool = metadatada["tool"]
-        unit = metadatada["unit"]
-
-        target = []
-        reached = []
-
-        for frequency in frequencies:
-            df_ts = frequency_df.sql(
-                f"""
-                SELECT node, iteration, timestamp
-                FROM self
-                WHERE frequency = {frequency}
-                ORDER BY node, iteration, timestamp
-                """
-            ).to_pandas()
-
-            for (node, iteration), group in df_ts.groupby(["node", "iteration"]):
-                arr = group["timestamp"].values.astype(float)
-
-                if arr.size < 2:
-                    continue
-
-                # computes (n+1 - n) interval and get inverse
-                arr = np.sort(arr)
-                intervals = arr[1:] - arr[:-1]
-
-                if unit == "milliseconds":
-                    inst_freqs = 1000.0 / intervals
-                else:
-                    inst_freqs = 1.0 / intervals
-
-                reached.extend(inst_freqs.tolist())
-                target.extend([frequency] * len(inst_freqs))
-
-        return pl.DataFrame({
-            "tool": tool,
-            "target_frequency": target,
-            "reached_frequency": reached,
-        })
+    # Sampling intervals and instantaneous frequencies of every tool, node, iteration
+    # and target in one sorted pass, HWPC timestamps are in ms, see frequencies.py
+    reached_frequency_df = frequencies.reached_frequencies({
+        "hwpc": hwpc_frequency,
+        "codecarbon": codecarbon_frequency,
+        "alumet": alumet_frequency,
+        "scaphandre": scaphandre_frequency,
+        "vjoule": vjoule_frequency,
+    }).filter(pl.col("target_frequency").is_in([1, 10, 100, 1000]))
+    interval_summary_df = frequencies.interval_summary(reached_frequency_df)
 
-
-
-    df_all = pl.concat([
-        collect_frequency_data(hwpc_frequency, [1, 10, 100, 1000], {"tool": "hwpc", "unit": "milliseconds"}),
-        collect_frequency_data(codecarbon_frequency, [1, 10, 100, 1000], {"tool": "codecarbon", "unit": "seconds"}),
-        collect_frequency_data(alumet_frequency, [1, 10, 100, 1000], {"tool": "alumet", "unit": "seconds"}),
-        collect_frequency_data(scaphandre_frequency, [1, 10, 100, 1000], {"tool": "scaphandre", "unit": "seconds"}),
-        collect_frequency_data(vjoule_frequency, [1, 10, 100, 1000], {"tool": "vjoule", "unit": "seconds"}),
-    ])
-    return (df_all,)
+    return interval_summary_df, reached_frequency_df
 
 
 @app.cell
-def _(df_all):
-    sampled = df_all.sample(fraction=0.10).sort("tool")
-    return (sampled,)
+def _(frequencies, reached_frequency_df):
+    # Exact per (tool, target) summaries of every reached frequency, see frequencies.py
+    reached_frequency_bands = frequencies.reached_frequency_bands(reached_frequency_df)
+    reached_frequency_histogram = frequencies.reached_frequency_histogram(reached_frequency_df)
+    return reached_frequency_bands, reached_frequency_histogram
 
 
 @app.cell
-def _(palette_for_tools, plt, sampled, sns):
+def _(palette_for_tools, plt, reached_frequency_bands, sns, visualization):
     plt.figure(figsize=(8,8))
-    sns.lineplot(
-        data=sampled, x="target_frequency", y="reached_frequency", hue="tool", err_style="bars", errorbar=("ci"), palette=palette_for_tools
+    visualization.plot_frequency_bands(
+        reached_frequency_bands, palette=palette_for_tools, err_style="bars"
     )
     sns.lineplot(
         x=[0,1000], y=[0,1000], dashes=(2, 2), legend="auto"
@@ -761,26 +520,20 @@ def _(mo):
 
 
 @app.cell
-def _(Path, pl, re, results_directory):
-    # Define the root directory to search
-    temperatures_root_dir = Path(results_directory)  # change this to your directory
-
-    # Define the filename pattern (regex to extract frequency and tool)
-    temperatures_pattern = re.compile(r"temperatures_frequency_(\d+)_perf_and_(\w+)\.csv")
-
+def _(catalog, pl, results_directory):
     # List of tools of interest
-    temperatures_valid_tools = {"hwpc", "codecarbon", "scaphandre", "alumet", "vjoule"}
-
-    # Collect all matching CSV files
-    temperatures_csv_files = []
-    for temperatures_file_path in temperatures_root_dir.rglob("temperatures_frequency_*_perf_and_*.csv"):
-        temperatures_match = temperatures_pattern.match(temperatures_file_path.name)
-        if temperatures_match:
-            temperatures_frequency, temperatures_tested_tool = temperatures_match.groups()
-            if temperatures_tested_tool in temperatures_valid_tools:
-                temperatures_node = temperatures_file_path.parent.name  
-                temperatures_g5k_cluster = temperatures_node.split("-")[0] if "-" in temperatures_node else temperatures_node
-                temperatures_csv_files.append((temperatures_file_path, int(temperatures_frequency), temperatures_tested_tool, temperatures_node, temperatures_g5k_cluster))
+    temperatures_valid_tools = ["hwpc", "codecarbon", "scaphandre", "alumet", "vjoule"]
+
+    # Collect all matching CSV files from the results catalog
+    temperatures_csv_files = (
+        catalog.query(results_directory, run_kind="temperatures", tool="perf")
+        .filter(
+            pl.col("target_frequency").is_not_null(),
+            pl.col("companion_tool").is_in(temperatures_valid_tools),
+        )
+        .select(["path", "target_frequency", "companion_tool", "node", "g5k_cluster"])
+        .rows()
+    )
 
     # Load all CSVs into a list of DataFrames
     temperatures_overhead_dfs = []
@@ -798,7 +551,7 @@ def _(Path, pl, re, results_directory):
 
     # Concatenate all into one big Polars DataFrame
     if temperatures_overhead_dfs:
-        temperatures_all_data = pl.concat(temperatures_overhead_dfs, how="vertical")
+        temperatures_all_data = pl.concat(temperatures_overhead_dfs, how="diagonal_relaxed")
     else:
         temperatures_all_data = pl.DataFrame()
 
@@ -811,34 +564,27 @@ def _(Path, pl, re, results_directory):
 
 @app.cell
 def _(
-    Path,
     baseline,
+    catalog,
     inventory,
     pl,
-    re,
     results_directory,
     temperatures_all_data,
 ):
 
-    # Define the root directory to search
-    root_dir = Path(results_directory)  # change this to your directory
-
-    # Define the filename pattern (regex to extract frequency and tool)
-    pattern = re.compile(r"frequency_(\d+)_perf_and_(\w+)\.csv")
-
     # List of tools of interest
-    valid_tools = {"hwpc", "codecarbon", "scaphandre", "alumet", "vjoule"}
-
-    # Collect all matching CSV files
-    csv_files = []
-    for file_path in root_dir.rglob("frequency_*_perf_and_*.csv"):
-        match = pattern.match(file_path.name)
-        if match:
-            frequency, tested_tool = match.groups()
-            if tested_tool in valid_tools:
-                node = file_path.parent.name  # e.g. "paravance-5"
-                g5k_cluster = node.split("-")[0] if "-" in node else node
-                csv_files.append((file_path, int(frequency), tested_tool, node, g5k_cluster))
+    valid_tools = ["hwpc", "codecarbon", "scaphandre", "alumet", "vjoule"]
+
+    # Collect all matching CSV files from the results catalog
+    csv_files = (
+        catalog.query(results_directory, run_kind="frequency", tool="perf")
+        .filter(
+            pl.col("name").str.ends_with(".csv"),
+            pl.col("companion_tool").is_in(valid_tools),
+        )
+        .select(["path", "target_frequency", "companion_tool", "node", "g5k_cluster"])
+        .rows()
+    )
 
     # Load all CSVs into a list of DataFrames
     overhead_dfs = []
@@ -1045,8 +791,8 @@ def _(
     alumet_frequency,
     codecarbon_frequency_agg_raw,
     hwpc_frequency,
-    math,
     pl,
+    rapl,
     scaphandre_frequency,
     vjoule_frequency_agg_raw,
 ):
@@ -1058,9 +804,9 @@ def _(
                                 pl.sum("ram").alias("ram_raw"),
                             ])
                             .with_columns([
-                                pl.col("cores_raw").map_elements(lambda x: math.ldexp(x, -32), return_dtype=pl.Float64).alias("cores_total"),
-                                pl.col("pkg_raw").map_elements(lambda x: math.ldexp(x, -32),return_dtype=pl.Float64).alias("pkg_total"),
-                                pl.col("ram_raw").map_elements(lambda x: math.ldexp(x, -32),return_dtype=pl.Float64).alias("ram_total"),
+                                rapl.decode_fixed_point("cores_raw").alias("cores_total"),
+                                rapl.decode_fixed_point("pkg_raw").alias("pkg_total"),
+                                rapl.decode_fixed_point("ram_raw").alias("ram_total"),
 
                 pl.lit("hwpc").alias("tool")
                             ])
@@ -1282,7 +1028,7 @@ def _(mo):
 
 
 @app.cell
-def _(Path, inventory, math, pl, re, results_directory):
+def _(catalog, inventory, pl, rapl, results_directory):
     def load_tool_csvs(base_directory: str):
         """
         Load all TOOL_and_perf_*.csv and perf_and_TOOL_*.csv files recursively
@@ -1292,33 +1038,23 @@ def _(Path, inventory, math, pl, re, results_directory):
         """
         # Define the supported tools
         tools = ["hwpc", "alumet", "codecarbon", "vjoule", "scaphandre"]
-        pattern = re.compile(rf"({'|'.join(tools)})_and_perf_\d+_\d+\.csv")
 
         # Prepare results dict
         dfs = {tool: [] for tool in tools}
 
-        base_path = Path(base_directory)
-        print(f"Loading CSVs from: {base_path.resolve()}")
-
-        for file_path in base_path.rglob("*.csv"):
-            filename = file_path.name
-
-            # Match the file pattern
-            if not pattern.match(filename):
-                continue
+        print(f"Loading CSVs from: {base_directory}")
 
-            # Extract node and cluster
-            node = file_path.parent.name
-            g5k_cluster = node.split("-")[0] if "-" in node else node
+        tool_csv_files = (
+            catalog.query(base_directory, run_kind="consumption", companion_tool="perf")
+            .filter(
+                pl.col("name").str.ends_with(".csv"),
+                pl.col("tool").is_in(tools),
+            )
+            .select(["path", "node", "g5k_cluster", "tool"])
+            .rows()
+        )
 
-            # Determine tool name
-            tool = None
-            for t in tools:
-                if t in filename:
-                    tool = t
-                    break
-            if tool is None:
-                continue
+        for file_path, node, g5k_cluster, tool in tool_csv_files:
             print("Reading file:", file_path)
 
             # Choose schema depending on the tool
@@ -1337,9 +1073,9 @@ def _(Path, inventory, math, pl, re, results_directory):
                                 pl.first("nb_ops_per_core"),
                             ])
                             .with_columns([
-                                pl.col("energy_cores_raw").map_elements(lambda x: math.ldexp(x, -32), return_dtype=pl.Float64).alias("energy_cores"),
-                                pl.col("energy_pkg_raw").map_elements(lambda x: math.ldexp(x, -32),return_dtype=pl.Float64).alias("energy_pkg"),
-                                pl.col("energy_ram_raw").map_elements(lambda x: math.ldexp(x, -32),return_dtype=pl.Float64).alias("energy_ram"),
+                                rapl.decode_fixed_point("energy_cores_raw").alias("energy_cores"),
+                                rapl.decode_fixed_point("energy_pkg_raw").alias("energy_pkg"),
+                                rapl.decode_fixed_point("energy_ram_raw").alias("energy_ram"),
                             ])
                             .select([
                                 "energy_cores", "energy_pkg", "energy_ram",
@@ -1406,55 +1142,48 @@ def _(Path, inventory, math, pl, re, results_directory):
 
 
 @app.cell
-def _(dfs, np, pl, plt, selected_clusters, sns):
+def _(dfs, moments, np, pl, plt, selected_clusters, sns):
     def compute_cv_per_tool(tool_dfs, filler=np.nan):
         """
         Compute coefficient of variation (std/mean) across iterations for each tool, node, and cluster.
         If a field is missing or has only nulls, fill with a filler value.
+        The moments of every group are computed in one pass over all the rows of
+        `tool_dfs` with moments.compute_moments, these frames are not read from the
+        moment store of a batch.
         """
         all_domains = ["energy_cores", "energy_pkg", "energy_ram"]
         results = []
 
         for tool_name, df in tool_dfs.items():
-            df = df.lazy()
-            available_cols = set(df.columns)
+            available_cols = df.columns
 
             # Identify grouping columns dynamically (some datasets may not have g5k_cluster)
             group_cols = ["node"]
             if "g5k_cluster" in available_cols:
                 group_cols.append("g5k_cluster")
 
-            for field in all_domains:
-                if field in available_cols:
-                    # Check if at least one non-null value exists
-                    has_data = df.select(pl.col(field).drop_nulls().count()).collect().item() > 0
-                else:
-                    has_data = False
-
-                if has_data:
-                    # Compute CV across iterations for each node (+ cluster if present)
-                    cv_df = (
-                        df.group_by(group_cols)
-                        .agg([
-                            (pl.std(field) / pl.mean(field)).alias("cv")
-                        ])
-                        .with_columns([
-                            pl.lit(tool_name).alias("tool"),
-                            pl.lit(field).alias("domain")
-                        ])
-                        .collect()
-                    )
-
-                else:
-                    # Fill with the filler value for each node/cluster
-                    nodes = df.select(group_cols).unique().collect()
-                    cv_df = nodes.with_columns([
-                        pl.lit(filler).alias("cv"),
-                        pl.lit(tool_name).alias("tool"),
-                        pl.lit(field).alias("domain")
-                    ])
-
-                results.append(cv_df)
+            values = df.unpivot(
+                on=[field for field in all_domains if field in available_cols],
+                index=group_cols,
+                variable_name="domain",
+                value_name="value",
+            ).drop_nulls("value")
+            cv_df = moments.moment_statistics(
+                moments.compute_moments(values, keys=group_cols + ["domain"])
+            ).select(group_cols + ["domain", pl.col("coefficient_of_variation").alias("cv")])
+
+            # Fill with the filler value for each node/cluster of fields without data
+            cv_df = (
+                df.select(group_cols)
+                .unique()
+                .join(pl.DataFrame({"domain": all_domains}), how="cross")
+                .join(cv_df, on=group_cols + ["domain"], how="left", nulls_equal=True)
+                .with_columns(
+                    pl.col("cv").fill_null(filler),
+                    pl.lit(tool_name).alias("tool"),
+                )
+            )
+            results.append(cv_df)
 
         all_cv = pl.concat(results)
         return all_cv.to_pandas()
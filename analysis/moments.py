@@ -0,0 +1,143 @@
+import os
+import polars as pl
+from typing import Dict, List, Union
+
+import cache
+import schemas
+
+# Mergeable moments of the energy rows : count, mean, M2 (sum of squared deviations
+# to the mean), minimum and maximum per group. Means, standard deviations and
+# coefficients of variation are served from them in O(groups).
+#
+# New rows are summarized in one vectorized pass and merged with stored moments
+# using Chan's parallel formulas, generalized to any number of parts :
+#   n = sum(n_i), mean = sum(n_i * mean_i) / n,
+#   M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2)
+# Moments can also be rolled up to coarser keys, e.g. per node across configurations.
+#
+# The store of a batch is the node partitioned `node_moments` cache, keyed on the
+# fingerprints of the consumption files of each node like the other partitioned
+# caches, see cache.py. The moments of a node are computed again from its current
+# rows when one of its files is added, changed or removed, so a re-run or corrected
+# iteration replaces the previous one. The moments of the given nodes are served
+# from the store, rows are only read for the nodes built again.
+
+MOMENT_KEYS = ["tool", "node", "task", "nb_core", "nb_ops_per_core", "domain"]
+DOMAINS = ["pkg", "cores", "ram"]
+# Version of the code building the moment store, bump it when the moments change
+CACHE_VERSION = 1
+
+
+def energy_values(
+    energy_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    One row per (MOMENT_KEYS, iteration) with its value, the tool is the first
+    one named by the task of the run
+    """
+    return (
+        energy_df.with_columns(pl.col("node", "task").cast(pl.String))
+        .with_columns(pl.col("task").str.split("_").list.first().alias("tool"))
+        .unpivot(
+            on=[f"energy_{domain}" for domain in DOMAINS],
+            index=MOMENT_KEYS[:-1] + ["iteration"],
+            variable_name="domain",
+            value_name="value",
+        )
+        .with_columns(pl.col("domain").str.strip_prefix("energy_"))
+        .drop_nulls("value")
+    )
+
+
+def compute_moments(
+    values_df: Union[pl.DataFrame, pl.LazyFrame], keys: List[str] = MOMENT_KEYS
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Moments of the `value` column of `values_df` per `keys`
+    """
+    value = pl.col("value")
+    return values_df.group_by(keys).agg(
+        pl.len().alias("count"),
+        value.mean().alias("mean"),
+        ((value - value.mean()) ** 2).sum().alias("m2"),
+        value.min().alias("minimum"),
+        value.max().alias("maximum"),
+    )
+
+
+def merge_moments(
+    moments_df: Union[pl.DataFrame, pl.LazyFrame], keys: List[str] = MOMENT_KEYS
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Merge the rows of `moments_df` that share `keys`
+    """
+    count = pl.col("count")
+    mean = (count * pl.col("mean")).sum() / count.sum()
+    return (
+        moments_df.group_by(keys)
+        .agg(
+            count.sum(),
+            mean.alias("mean"),
+            (
+                pl.col("m2").sum() + (count * (pl.col("mean") - mean) ** 2).sum()
+            ).alias("m2"),
+            pl.col("minimum").min(),
+            pl.col("maximum").max(),
+        )
+    )
+
+
+def moment_statistics(
+    moments_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Add the sample standard deviation and coefficient of variation of each row
+    """
+    standard_deviation = (
+        pl.when(pl.col("count") > 1)
+        .then((pl.col("m2") / (pl.col("count") - 1)).sqrt())
+        .otherwise(None)
+    )
+    return moments_df.with_columns(
+        standard_deviation.alias("standard_deviation"),
+        (standard_deviation / pl.col("mean")).alias("coefficient_of_variation"),
+    )
+
+
+def node_moments(
+    energy_df: Union[pl.DataFrame, pl.LazyFrame], node_directories: List[str]
+) -> Dict[str, pl.DataFrame]:
+    """
+    {node directory: moments} of the nodes of `node_directories`, computed in one
+    pass over their rows. Nodes without rows in `energy_df` are left out.
+    """
+    nodes = {os.path.basename(directory): directory for directory in node_directories}
+    moments_df = compute_moments(
+        energy_values(
+            energy_df.lazy().filter(pl.col("node").cast(pl.String).is_in(list(nodes)))
+        )
+    ).collect()
+    return {
+        nodes[node]: node_df.select(list(schemas.moment_columns))
+        for (node,), node_df in moments_df.partition_by("node", as_dict=True).items()
+    }
+
+
+def update_moments(
+    batch_identifier: str,
+    energy_df: Union[pl.DataFrame, pl.LazyFrame],
+    partitions: Dict[str, List[str]],
+) -> pl.DataFrame:
+    """
+    Moments of the nodes of `partitions` ({node directory: consumption files}) from
+    the moment store of the batch. Rows of `energy_df`, read from these files, are
+    only scanned for the nodes whose files changed.
+    """
+    return cache.load_partitioned_together(
+        batch_identifier,
+        "node_moments",
+        partitions,
+        lambda node_directories: node_moments(energy_df, node_directories),
+        schema=schemas.moment_columns,
+        version=CACHE_VERSION,
+    )
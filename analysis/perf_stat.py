@@ -0,0 +1,181 @@
+import mmap
+import re
+import polars as pl
+from typing import Iterator
+
+import schemas
+import timestamps
+
+# Raw `perf stat -a -o` output, as appended by the benchmark templates to
+# <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/frequency_<F>_perf_and_<TOOL>
+# One block per iteration :
+#
+# # started on Mon Jan  6 10:00:00 2025
+#
+#  Performance counter stats for 'system wide':
+#
+#             1,234.56 Joules power/energy-pkg/
+#               123.45 Joules power/energy-ram/
+#
+#         40.001234567 seconds time elapsed
+#
+# The file is memory-mapped and read in windows of `window_bytes` ending on a line
+# boundary. Only the lines of interest are matched, then grouped into blocks with
+# Polars : a block ends at its "seconds time elapsed" line like in the aggregation
+# of src/results.rs, and iterations are numbered from 1 in file order. The lines
+# of a block cut by the end of a window are carried over to the next one, pages
+# of finished windows are released so memory stays flat whatever the file size.
+#
+# The "# started on" header is in the local time of the node with no zone and a 1 s
+# resolution, window_start_ns only approximates the start of perf from it. The
+# benchmark records exact windows next to the temperatures, see load.py.
+
+DEFAULT_WINDOW_BYTES = 16 << 20
+# Time zone of the node clocks, the ctime header does not carry it
+DEFAULT_TIME_ZONE = "UTC"
+DOMAINS = ["pkg", "ram", "cores"]
+
+# Groups : started, energy, domain, elapsed, unmatched groups are empty
+PERF_STAT_LINES = re.compile(
+    rb"^(?:"
+    rb"# started on ([^\n]+)"
+    rb"|[ \t]*([0-9<][^ \t\n]*)[^\n/]*power/energy-(pkg|ram|cores)/"
+    rb"|[ \t]*([0-9][^ \t\n]*)[ \t]+seconds time elapsed"
+    rb")",
+    re.MULTILINE,
+)
+LINE_COLUMNS = ["started", "energy", "domain", "elapsed"]
+
+
+def perf_stat_lines(matches: list) -> pl.DataFrame:
+    """
+    Matched lines as a frame of LINE_COLUMNS, with nulls for unmatched groups
+    """
+    values = list(zip(*matches)) or [()] * len(LINE_COLUMNS)
+    return pl.DataFrame(
+        [
+            pl.Series(column, column_values, dtype=pl.Binary)
+            for column, column_values in zip(LINE_COLUMNS, values)
+        ]
+    ).select(
+        pl.when(pl.col(column) != b"")
+        .then(pl.col(column).cast(pl.String))
+        .alias(column)
+        for column in LINE_COLUMNS
+    )
+
+
+def perf_stat_value(column: str) -> pl.Expr:
+    # ',' is the thousands separator, "<not counted>" values are null
+    return (
+        pl.col(column)
+        .str.replace_all(",", "", literal=True)
+        .cast(pl.Float64, strict=False)
+    )
+
+
+def perf_stat_blocks(
+    lines_df: pl.DataFrame, first_iteration: int, time_zone: str = DEFAULT_TIME_ZONE
+) -> pl.DataFrame:
+    """
+    One row per block of `lines_df`, which ends with a "seconds time elapsed" line,
+    typed after schemas.perf_stat_columns
+    """
+    block_end = pl.col("elapsed").is_not_null()
+    return (
+        lines_df.with_columns(block=block_end.cum_sum() - block_end)
+        .group_by("block", maintain_order=True)
+        .agg(
+            *[
+                pl.col("energy")
+                .filter(pl.col("domain") == domain)
+                .last()
+                .alias(f"power_energy_{domain}")
+                for domain in DOMAINS
+            ],
+            pl.col("elapsed").drop_nulls().first().alias("time_elapsed"),
+            pl.col("started").drop_nulls().last(),
+        )
+        .select(
+            *[perf_stat_value(f"power_energy_{domain}") for domain in DOMAINS],
+            perf_stat_value("time_elapsed"),
+            (pl.col("block") + first_iteration).alias("iteration"),
+            timestamps.ctime_to_ns("started", time_zone).alias("window_start_ns"),
+        )
+        .cast(schemas.perf_stat_columns)
+    )
+
+
+def release_pages(mapped: mmap.mmap, end: int) -> None:
+    # Pages before `end` leave the process, they would be read again from the file
+    if hasattr(mmap, "MADV_DONTNEED"):
+        mapped.madvise(mmap.MADV_DONTNEED, 0, end - end % mmap.PAGESIZE)
+
+
+def window_end(mapped: mmap.mmap, start: int, window_bytes: int) -> int:
+    """
+    End of the window starting at `start`, just after its last complete line
+    """
+    end = min(start + window_bytes, len(mapped))
+    if end == len(mapped):
+        return end
+    line_end = mapped.rfind(b"\n", start, end) + 1
+    if line_end > start:
+        return line_end
+    # A single line longer than the window
+    return mapped.find(b"\n", end) + 1 or len(mapped)
+
+
+def iter_perf_stat(
+    path: str,
+    window_bytes: int = DEFAULT_WINDOW_BYTES,
+    time_zone: str = DEFAULT_TIME_ZONE,
+) -> Iterator[pl.DataFrame]:
+    """
+    Iterations of the raw perf output `path`, one batch per window holding a block end
+    """
+    with open(path, "rb") as perf_file:
+        try:
+            mapped = mmap.mmap(perf_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+        with mapped:
+            start, iteration = 0, 1
+            carried_df = perf_stat_lines([])
+            while start < len(mapped):
+                end = window_end(mapped, start, window_bytes)
+                lines_df = pl.concat(
+                    [
+                        carried_df,
+                        perf_stat_lines(PERF_STAT_LINES.findall(mapped, start, end)),
+                    ]
+                )
+                block_ends = lines_df.get_column("elapsed").is_not_null()
+                if block_ends.any():
+                    complete = lines_df.height - block_ends.reverse().arg_max()
+                    blocks_df = perf_stat_blocks(
+                        lines_df.head(complete), iteration, time_zone
+                    )
+                    iteration += blocks_df.height
+                    yield blocks_df
+                    lines_df = lines_df.slice(complete)
+                carried_df = lines_df
+                release_pages(mapped, end)
+                start = end
+
+
+def read_perf_stat(
+    path: str,
+    window_bytes: int = DEFAULT_WINDOW_BYTES,
+    time_zone: str = DEFAULT_TIME_ZONE,
+) -> pl.DataFrame:
+    """
+    One row per iteration of the raw perf output `path`, typed after
+    schemas.perf_stat_columns, `time_zone` is the one of the clock of the node
+    that wrote it
+    """
+    frames = list(iter_perf_stat(path, window_bytes=window_bytes, time_zone=time_zone))
+    if not frames:
+        return pl.DataFrame(schema=schemas.perf_stat_columns)
+    return pl.concat(frames, how="vertical")
@@ -0,0 +1,116 @@
+import os
+import json
+import polars as pl
+from functools import lru_cache
+from typing import Dict
+
+import schemas
+
+# Processor catalog, the single copy of what used to be vendor_generation_map
+# processor_catalog.json is versioned with the code, bump `catalog_version` when
+# entries change. It is loaded once into a small dimension frame attached to
+# node inventories with a single join on processor_version.
+
+PROCESSOR_CATALOG_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "processor_catalog.json"
+)
+SUPPORTED_CATALOG_VERSIONS = [1]
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path: str = PROCESSOR_CATALOG_FILE) -> pl.DataFrame:
+    """
+    Dimension frame of the processor catalog, typed after schemas.processor_catalog_columns
+    """
+    with open(path, "r") as catalog_file:
+        catalog = json.load(catalog_file)
+    if catalog["catalog_version"] not in SUPPORTED_CATALOG_VERSIONS:
+        raise ValueError(
+            f"Unsupported processor catalog version {catalog['catalog_version']} in {path}"
+        )
+    return pl.from_dicts(
+        catalog["processors"], schema=schemas.processor_catalog_columns
+    )
+
+
+def vendor_generation_map(path: str = PROCESSOR_CATALOG_FILE) -> Dict[str, dict]:
+    """
+    The catalog as the former {processor_version: {...}} dictionary
+    """
+    return {row["version"]: row for row in load_catalog(path).iter_rows(named=True)}
+
+
+def unknown_processors(
+    nodes_df: pl.DataFrame, catalog_df: pl.DataFrame = None
+) -> pl.DataFrame:
+    """
+    Processor versions of `nodes_df` missing from the catalog, with their node count
+    """
+    if catalog_df is None:
+        catalog_df = load_catalog()
+    return (
+        nodes_df.join(
+            catalog_df, left_on="processor_version", right_on="version", how="anti"
+        )
+        .group_by("processor_version")
+        .agg(pl.len().alias("node_count"))
+        .sort("processor_version")
+    )
+
+
+def attach_processors(
+    nodes_df: pl.DataFrame, catalog_df: pl.DataFrame = None
+) -> pl.DataFrame:
+    """
+    Add processor_detail, processor_generation, processor_vendor and
+    numa_nodes_first_cpus to `nodes_df`. Versions missing from the catalog are
+    reported and get nulls, processor_vendor then keeps the inventory value.
+    """
+    if catalog_df is None:
+        catalog_df = load_catalog()
+    unknown_df = unknown_processors(nodes_df, catalog_df)
+    if unknown_df.height > 0:
+        print(
+            f"{unknown_df.height} processor version(s) missing from the processor catalog :",
+            unknown_df,
+        )
+    return (
+        nodes_df.join(
+            catalog_df.select(
+                pl.col("version").alias("processor_version"),
+                pl.col("architecture").alias("catalog_architecture"),
+                pl.col("generation").alias("catalog_generation"),
+                pl.col("vendor").alias("catalog_vendor"),
+                "numa_nodes_first_cpus",
+            ),
+            on="processor_version",
+            how="left",
+            validate="m:1",
+        )
+        .with_columns(
+            (
+                pl.col("processor_version") + "\n" + pl.col("catalog_architecture")
+            ).alias("processor_detail"),
+            pl.col("catalog_generation").cast(pl.String).alias("processor_generation"),
+            pl.coalesce("catalog_vendor", "processor_vendor").alias("processor_vendor"),
+        )
+        .drop(["catalog_architecture", "catalog_generation", "catalog_vendor"])
+    )
+
+
+def socket_leaders(nodes_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    HWPC socket leaders, the first CPU of each NUMA node, one row per (node, cpu).
+    RAPL counters are shared by the CPUs of a socket, only leaders are kept.
+    `nodes_df` is an inventory with processors attached.
+    """
+    return (
+        nodes_df.select(
+            "g5k_cluster",
+            pl.col("uid").alias("node"),
+            pl.col("numa_nodes_first_cpus").alias("cpu"),
+        )
+        .explode("cpu")
+        .drop_nulls("cpu")
+        .cast(schemas.socket_leaders_columns)
+    )
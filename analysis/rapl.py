@@ -0,0 +1,90 @@
+import time
+import numpy as np
+import polars as pl
+from math import ldexp
+from typing import List, Union
+
+# Decoding of the fixed point RAPL counters reported by HWPC
+# HWPC stores energies as 32.32 fixed point integers, the value in Joules is ldexp(x, -32).
+# Casting to Float64 rounds to nearest even like Python's int to float conversion and
+# 2**-32 is a power of two, so the native expression is bit-exact with math.ldexp.
+
+FIXED_POINT_FRACTION_BITS = 32
+FIXED_POINT_SCALE = 2.0**-FIXED_POINT_FRACTION_BITS
+
+# Every RAPL domain HWPC can report, raw reports only hold the enabled ones
+HWPC_FIXED_POINT_COLUMNS = [
+    "rapl_energy_pkg",
+    "rapl_energy_dram",
+    "rapl_energy_cores",
+    "rapl_energy_gpu",
+    "rapl_energy_psys",
+]
+
+
+def decode_fixed_point(column: Union[str, pl.Expr]) -> pl.Expr:
+    """
+    Native equivalent of map_elements(lambda x: ldexp(x, -32)) on a 32.32 fixed point column
+    """
+    if isinstance(column, str):
+        column = pl.col(column)
+    return column.cast(pl.Float64) * FIXED_POINT_SCALE
+
+
+def decode_fixed_point_columns(
+    df: Union[pl.DataFrame, pl.LazyFrame], columns: List[str] = None
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Decode `columns` of `df` in place, every HWPC fixed point column present by default
+    """
+    if columns is None:
+        names = df.collect_schema().names()
+        columns = [column for column in HWPC_FIXED_POINT_COLUMNS if column in names]
+    return df.with_columns([decode_fixed_point(column) for column in columns])
+
+
+def benchmark(rows: int = 1_000_000, seed: int = 0):
+    """
+    Compare map_elements(ldexp) with the native decoding on a `rows` rows frame
+    of pkg/cores/dram counters and check that both give the same bits
+    """
+    rng = np.random.default_rng(seed)
+    # Values above 2**53 exercise the rounding of the integer to float conversion
+    df = pl.DataFrame(
+        {
+            column: rng.integers(0, 2**62, size=rows, dtype=np.int64)
+            for column in HWPC_FIXED_POINT_COLUMNS[:3]
+        }
+    )
+
+    start = time.perf_counter()
+    python_df = df.with_columns(
+        [
+            pl.col(column).map_elements(
+                lambda x: ldexp(x, -FIXED_POINT_FRACTION_BITS),
+                return_dtype=pl.Float64,
+            )
+            for column in df.columns
+        ]
+    )
+    python_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    native_df = decode_fixed_point_columns(df)
+    native_time = time.perf_counter() - start
+
+    for column in df.columns:
+        assert np.array_equal(
+            python_df.get_column(column).to_numpy().view(np.uint64),
+            native_df.get_column(column).to_numpy().view(np.uint64),
+        ), f"{column} is not bit-exact"
+    print(
+        f"Decoded {rows} rows x {len(df.columns)} columns :",
+        f"map_elements {python_time:.3f}s, native {native_time:.3f}s,",
+        f"x{python_time / native_time:.0f}, bit-exact",
+    )
+    return python_time, native_time
+
+
+if __name__ == "__main__":
+    benchmark()
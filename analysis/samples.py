@@ -0,0 +1,161 @@
+import polars as pl
+from typing import List, Tuple, Union
+
+import schemas
+import timestamps
+import tool_specs
+
+# Canonical store of the frequency run samples of every tool
+# One row per (tool, g5k_cluster, node, frequency, iteration, domain, timestamp_ns)
+# typed after schemas.sample_columns, keys are categorical and rows sorted by SAMPLE_KEYS.
+#
+# Domains are the pkg, cores and ram targets of the tool spec, see tool_specs.py,
+# values of the tool domains mapped to the same target are summed at ingest, as are
+# the per CPU rows of HWPC. Values are kept in the unit each tool writes them in,
+# HWPC 32.32 fixed point integers are exact as Float64 below 2^53.
+#
+# Tools whose spec deduplicates have the rows of each file deduplicated on their
+# DEDUPLICATION_KEYS before domains are mapped, the number of dropped rows is kept
+# in the catalog.
+#
+# The wide frames of the former loaders, one column per target, are lazy views
+# of the store, see frequency_view.
+
+SAMPLE_KEYS = [
+    "tool",
+    "g5k_cluster",
+    "node",
+    "frequency",
+    "iteration",
+    "domain",
+    "timestamp_ns",
+]
+RUN_KEYS = ["tool", "g5k_cluster", "node", "frequency", "iteration"]
+# A sample is repeated when a tool domain has two rows at the same timestamp,
+# keys follow the order of the rows of a file : templates/frequencies_benchmark.sh
+# appends all the rows of a domain, then those of the next domain, per iteration
+NATURAL_KEY = ["tool", "node", "frequency", "iteration", "domain", "timestamp_ns"]
+# Alumet writes one row per socket without the socket, rows of the same sample
+# only differ by their energy and are all summed. Sockets reporting the same energy
+# for a sample cannot be told from a repeated row, only one of them is kept
+DEDUPLICATION_KEYS = {"key": NATURAL_KEY, "row": NATURAL_KEY + ["energy"]}
+
+
+def long_samples(
+    scanned_lf: pl.LazyFrame, tool: str, spec: tool_specs.ToolSpec
+) -> pl.LazyFrame:
+    """
+    Rows of frequency files scanned with tool_specs.scan_samples, with their g5k_cluster,
+    node and frequency, as (NATURAL_KEY, g5k_cluster, energy) with the tool domains
+    """
+    if spec["layout"] == "wide":
+        file_columns = scanned_lf.collect_schema().names()
+        scanned_lf = scanned_lf.unpivot(
+            on=[domain for domain in spec["domains"] if domain in file_columns],
+            index=["g5k_cluster", "node", "frequency", "iteration", "timestamp"],
+            variable_name="domain",
+            value_name="energy",
+        )
+    return scanned_lf.filter(pl.col("domain").is_in(list(spec["domains"]))).select(
+        tool=pl.lit(tool),
+        g5k_cluster="g5k_cluster",
+        node="node",
+        frequency="frequency",
+        iteration="iteration",
+        timestamp_ns=tool_specs.timestamp_ns(spec),
+        domain="domain",
+        energy="energy",
+    )
+
+
+def ordered(keys: List[str]) -> pl.Expr:
+    """
+    Whether rows are sorted by `keys`, each row compared lexically to the previous one
+    """
+    not_lower = pl.lit(True)
+    for key in reversed(keys):
+        previous = pl.col(key).shift()
+        not_lower = (pl.col(key) > previous) | ((pl.col(key) == previous) & not_lower)
+    return not_lower.fill_null(True).all()
+
+
+def deduplicate(
+    samples_df: pl.DataFrame, keys: List[str] = NATURAL_KEY
+) -> Tuple[pl.DataFrame, int]:
+    """
+    Rows of `samples_df` without the later rows of a repeated `keys`, and the
+    number of rows dropped. Repeated keys of sorted rows are adjacent and found by
+    comparing each row to the previous one, other rows are hashed on their key.
+    """
+    if samples_df.select(ordered(keys)).item():
+        repeated = pl.all_horizontal(
+            pl.col(key).eq_missing(pl.col(key).shift()) for key in keys
+        ) & (pl.int_range(pl.len()) > 0)
+        unique_df = samples_df.filter(~repeated)
+    else:
+        unique_df = samples_df.filter(pl.struct(keys).is_first_distinct())
+    return unique_df, samples_df.height - unique_df.height
+
+
+def canonical_samples(
+    samples_lf: pl.LazyFrame, spec: tool_specs.ToolSpec
+) -> pl.LazyFrame:
+    """
+    Samples in the store layout from long_samples rows of the tool of `spec`
+    """
+    return (
+        samples_lf.with_columns(domain=pl.col("domain").replace_strict(spec["domains"]))
+        .group_by(SAMPLE_KEYS)
+        .agg(pl.col("energy").sum().alias("value"))
+        .select(list(schemas.sample_columns))
+        .cast(schemas.sample_columns)
+    )
+
+
+def timestamp_value(spec: tool_specs.ToolSpec) -> pl.Expr:
+    """
+    timestamp column of the wide views, in tool_specs.timestamp_unit(spec)
+    """
+    if tool_specs.timestamp_unit(spec) == "milliseconds":
+        return pl.col("timestamp_ns") // 1_000_000
+    return timestamps.ns_to_seconds("timestamp_ns")
+
+
+def frequency_view(
+    samples_df: Union[pl.DataFrame, pl.LazyFrame],
+    tool: str,
+    last_sample: bool = False,
+) -> pl.LazyFrame:
+    """
+    Samples of `tool` with one column per target, typed after the schema of its spec
+    and sorted like the store. Targets the tool does not
+    measure are 0, targets missing from a sample are null.
+    With `last_sample` only the last sample of each domain of an iteration is kept,
+    the iteration totals of cumulative tools, typed after schemas.frequency_agg_columns.
+    """
+    spec = tool_specs.TOOL_SPECS[tool]
+    schema = schemas.frequency_agg_columns if last_sample else spec["schema"]
+    samples_lf = samples_df.lazy().filter(pl.col("tool") == tool)
+    if last_sample:
+        if not spec["cumulative"]:
+            raise ValueError(
+                f"Last samples are iteration totals for cumulative tools only, not {tool}"
+            )
+        # Rows of a group keep the store order, the last one has the latest timestamp
+        samples_lf = samples_lf.group_by(RUN_KEYS + ["domain"]).last()
+    targets = set(spec["domains"].values())
+    return (
+        samples_lf.group_by(RUN_KEYS[1:] + ["timestamp_ns"])
+        .agg(
+            (
+                pl.col("value").filter(pl.col("domain") == target).first()
+                if target in targets
+                else pl.lit(0)
+            ).alias(target)
+            for target in tool_specs.TARGET_DOMAINS
+        )
+        .with_columns(timestamp=timestamp_value(spec))
+        .select(list(schema))
+        .cast(schema)
+        .sort(RUN_KEYS[1:] + ["timestamp_ns"])
+    )
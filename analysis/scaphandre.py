@@ -0,0 +1,273 @@
+import json
+import re
+import polars as pl
+from typing import Dict, Iterator, List
+
+import schemas
+import timestamps
+
+# Scaphandre `json` exporter dumps of frequency runs, one per iteration :
+# <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/
+#     frequency_<F>_scaphandre_and_<TOOL>_<ITERATION>.json
+# Each file is a JSON array of reports :
+#
+# [{"host": {"consumption": ..., "timestamp": ..., "components": {...}},
+#   "consumers": [{"exe": ..., "cmdline": ..., "pid": ..., "resources_usage": {...},
+#                  "consumption": ..., "timestamp": ..., "container": {...}}, ...],
+#   "sockets": [{"id": ..., "consumption": ..., "timestamp": ...,
+#                "domains": [{"name": ..., "consumption": ..., "timestamp": ...},
+#                            ...]}, ...]},
+#  ...]
+#
+# The array is decoded one report at a time from a bounded buffer, reports are
+# turned into columnar batches of `batch_reports` rows. Numbers are kept as their
+# JSON text until the batch is cast, so timestamps are converted to nanoseconds
+# without going through floats, like the CSV the yq projection used to produce.
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_BATCH_REPORTS = 10_000
+
+DECODER = json.JSONDecoder(parse_float=str, parse_int=str)
+SEPARATORS = re.compile(r"[\s,]*")
+
+# Flat parts of a batch, numbers are strings until the batch is cast
+RAW_HOST_COLUMNS = {"timestamp": pl.String, "consumption": pl.String}
+RAW_SOCKET_COLUMNS = {"report": pl.Int64, "id": pl.String, "consumption": pl.String}
+RAW_DOMAIN_COLUMNS = {
+    "report": pl.Int64,
+    "id": pl.String,
+    "name": pl.String,
+    "consumption": pl.String,
+}
+RAW_CONSUMER_COLUMNS = {
+    "report": pl.Int64,
+    "pid": pl.String,
+    "exe": pl.String,
+    "cmdline": pl.String,
+    "container": pl.String,
+    "consumption": pl.String,
+    "cpu_usage": pl.String,
+    "memory_usage": pl.String,
+}
+
+
+def iter_json_array(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Elements of the JSON array of `path`, decoded one at a time.
+    Elements are objects, so an element cut by the end of the buffer never decodes
+    and more of the file is read. A truncated array, e.g. when the exporter was
+    interrupted while writing, ends at its last complete element.
+    """
+    with open(path, "r") as json_file:
+        buffer = json_file.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            return
+        position = 1
+        while True:
+            position = SEPARATORS.match(buffer, position).end()
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                element, position = DECODER.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = json_file.read(chunk_size)
+                if not chunk:
+                    if buffer[position:].strip():
+                        print(f"Truncated JSON array in {path}, last element ignored")
+                    return
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            yield element
+
+
+def raw_frame(rows: List[tuple], schema: Dict[str, pl.DataType]) -> pl.DataFrame:
+    return pl.DataFrame(rows, schema=schema, orient="row")
+
+
+def nested(
+    parts_df: pl.DataFrame, keys: List[str], name: str, fields: List[str]
+) -> pl.DataFrame:
+    # One list of structs of `fields` per `keys`
+    return parts_df.group_by(keys, maintain_order=True).agg(
+        pl.struct(fields).alias(name)
+    )
+
+
+def report_batch(reports: List[dict], iteration: int) -> pl.DataFrame:
+    """
+    Columnar batch of `reports`, typed after schemas.scaphandre_report_columns
+    except for the g5k_cluster, node and frequency run columns.
+    Reports are flattened into host, socket, domain and consumer rows, nested
+    lists are then rebuilt by Polars.
+    """
+    hosts, sockets, domains, consumers = [], [], [], []
+    for report_index, report in enumerate(reports):
+        host = report.get("host") or {}
+        hosts.append((host.get("timestamp"), host.get("consumption")))
+        for socket in report.get("sockets") or []:
+            socket_id = socket.get("id")
+            sockets.append((report_index, socket_id, socket.get("consumption")))
+            for domain in socket.get("domains") or []:
+                domains.append(
+                    (
+                        report_index,
+                        socket_id,
+                        domain.get("name"),
+                        domain.get("consumption"),
+                    )
+                )
+        for consumer in report.get("consumers") or []:
+            usage = consumer.get("resources_usage") or {}
+            consumers.append(
+                (
+                    report_index,
+                    consumer.get("pid"),
+                    consumer.get("exe"),
+                    consumer.get("cmdline"),
+                    (consumer.get("container") or {}).get("name"),
+                    consumer.get("consumption"),
+                    usage.get("cpu_usage"),
+                    usage.get("memory_usage"),
+                )
+            )
+
+    sockets_df = raw_frame(sockets, RAW_SOCKET_COLUMNS).join(
+        nested(
+            raw_frame(domains, RAW_DOMAIN_COLUMNS),
+            ["report", "id"],
+            "domains",
+            ["name", "consumption"],
+        ),
+        on=["report", "id"],
+        how="left",
+        maintain_order="left",
+    )
+    return (
+        raw_frame(hosts, RAW_HOST_COLUMNS)
+        .with_row_index("report")
+        .cast({"report": pl.Int64})
+        .join(
+            nested(sockets_df, ["report"], "sockets", ["id", "consumption", "domains"]),
+            on="report",
+            how="left",
+            maintain_order="left",
+        )
+        .join(
+            nested(
+                raw_frame(consumers, RAW_CONSUMER_COLUMNS),
+                ["report"],
+                "consumers",
+                list(RAW_CONSUMER_COLUMNS)[1:],
+            ),
+            on="report",
+            how="left",
+            maintain_order="left",
+        )
+        .select(
+            pl.lit(iteration).alias("iteration"),
+            "timestamp",
+            timestamps.epoch_seconds_to_ns("timestamp").alias("timestamp_ns"),
+            "consumption",
+            "sockets",
+            "consumers",
+        )
+        .cast(
+            {
+                column: schemas.scaphandre_report_columns[column]
+                for column in [
+                    "iteration",
+                    "timestamp",
+                    "consumption",
+                    "sockets",
+                    "consumers",
+                ]
+            },
+            strict=False,
+        )
+    )
+
+
+def iter_report_batches(
+    path: str,
+    iteration: int,
+    batch_reports: int = DEFAULT_BATCH_REPORTS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[pl.DataFrame]:
+    """
+    Reports of the scaphandre dump `path` of `iteration`, in batches of `batch_reports`
+    """
+    reports = []
+    for report in iter_json_array(path, chunk_size=chunk_size):
+        reports.append(report)
+        if len(reports) >= batch_reports:
+            yield report_batch(reports, iteration)
+            reports = []
+    if reports:
+        yield report_batch(reports, iteration)
+
+
+def samples(reports_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Host consumption of the reports as pkg rows of schemas.sample_columns, the rows
+    the yq projection of the benchmark used to write
+    """
+    return reports_df.select(
+        tool=pl.lit("scaphandre"),
+        g5k_cluster="g5k_cluster",
+        node="node",
+        frequency="frequency",
+        iteration="iteration",
+        domain=pl.lit("pkg"),
+        timestamp_ns="timestamp_ns",
+        value="consumption",
+    ).cast(schemas.sample_columns)
+
+
+def socket_domains(reports_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Per-socket consumption of the reports, typed after schemas.scaphandre_socket_columns
+    """
+    sockets_df = (
+        reports_df.select(
+            "g5k_cluster", "node", "frequency", "iteration", "timestamp_ns", "sockets"
+        )
+        .explode("sockets")
+        .drop_nulls("sockets")
+        .unnest("sockets")
+        .rename({"id": "socket"})
+    )
+    package_df = sockets_df.select(
+        pl.exclude("domains", "consumption"),
+        domain=pl.lit("package"),
+        consumption="consumption",
+    )
+    domains_df = (
+        sockets_df.drop("consumption")
+        .explode("domains")
+        .drop_nulls("domains")
+        .unnest("domains")
+        .rename({"name": "domain"})
+    )
+    return pl.concat(
+        [
+            package_df.select(list(schemas.scaphandre_socket_columns)),
+            domains_df.select(list(schemas.scaphandre_socket_columns)),
+        ]
+    ).cast(schemas.scaphandre_socket_columns)
+
+
+def consumers(reports_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Per-process consumption of the reports, typed after
+    schemas.scaphandre_consumer_columns
+    """
+    return (
+        reports_df.select(
+            "g5k_cluster", "node", "frequency", "iteration", "timestamp_ns", "consumers"
+        )
+        .explode("consumers")
+        .drop_nulls("consumers")
+        .unnest("consumers")
+        .select(list(schemas.scaphandre_consumer_columns))
+        .cast(schemas.scaphandre_consumer_columns)
+    )
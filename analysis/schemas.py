@@ -1,4 +1,5 @@
-from typing import Dict
+import polars as pl
+from typing import Dict, List
 
 hwpc_columns: Dict[str, type] = {
     "timestamp": int,
@@ -123,6 +124,31 @@ energy_columns: Dict[str, type] = {
     "processor_generation": str,
 }
 
+# Star schema of the energy results : fact rows keep categorical keys and measures,
+# node attributes live once per node in node_dimension_columns and are joined
+# only to present energy_columns and stats_columns frames
+energy_fact_columns: Dict[str, type] = {
+    "energy_cores": float,
+    "energy_pkg": float,
+    "energy_ram": float,
+    "nb_core": int,
+    "nb_ops_per_core": int,
+    "iteration": int,
+    "tool": pl.Categorical,
+    "task": pl.Categorical,
+    "site": pl.Categorical,
+    "node": pl.Categorical,
+}
+
+node_dimension_columns: Dict[str, type] = {
+    "node": pl.Categorical,
+    **{
+        column: dtype
+        for column, dtype in energy_columns.items()
+        if column not in energy_fact_columns
+    },
+}
+
 stats_columns: Dict[str, type] = {
     "node": str,
     "task": str,
@@ -172,6 +198,42 @@ stats_columns: Dict[str, type] = {
     "processor_generation": str,
 }
 
+stats_fact_columns: Dict[str, type] = {
+    "node": pl.Categorical,
+    "task": pl.Categorical,
+    **{
+        column: dtype
+        for column, dtype in stats_columns.items()
+        if column not in node_dimension_columns and column not in ("node", "task")
+    },
+}
+
+quantile_sketch_columns: Dict[str, type] = {
+    "node": str,
+    "task": str,
+    "nb_core": int,
+    "nb_ops_per_core": int,
+    "domain": str,
+    "sign": int,
+    "bucket": int,
+    "count": int,
+    "relative_accuracy": float,
+}
+
+moment_columns: Dict[str, type] = {
+    "tool": str,
+    "node": str,
+    "task": str,
+    "nb_core": int,
+    "nb_ops_per_core": int,
+    "domain": str,
+    "count": int,
+    "mean": float,
+    "m2": float,
+    "minimum": float,
+    "maximum": float,
+}
+
 nodes_configuration_columns: Dict[str, type] = {
     "uid": str,
     "g5k_cluster": str,
@@ -192,3 +254,266 @@ nodes_configuration_columns: Dict[str, type] = {
     "os_pstate_governor": str,
     "os_turboboost_enabled": bool,
 }
+
+# Rows of the inventory cache, nodes_configuration_columns is a view of it
+inventory_columns: Dict[str, type] = {
+    **nodes_configuration_columns,
+    "site": str,
+    "processor_other_description": str,
+}
+
+ingest_errors_columns: Dict[str, type] = {
+    "tool": str,
+    "file": str,
+    "error": str,
+}
+
+catalog_columns: Dict[str, type] = {
+    "path": str,
+    "name": str,
+    "site": str,
+    "g5k_cluster": str,
+    "node": str,
+    "tool": str,
+    "companion_tool": str,
+    "run_kind": str,
+    "nb_core": int,
+    "nb_ops_per_core": int,
+    "target_frequency": int,
+    "size": int,
+    "mtime": int,
+    "node_mtime": int,
+    # Repeated samples dropped at ingest, null until the file is ingested, see samples.py
+    "duplicates": int,
+}
+
+# Columns of the ../data/<BATCH>.d/*_frequency caches
+perf_frequency_columns: Dict[str, type] = {
+    "power_energy_pkg": float,
+    "power_energy_ram": float,
+    "power_energy_cores": float,
+    "time_elapsed": float,
+    "frequency": int,
+    "iteration": int,
+    "tool": str,
+    "node": str,
+    "g5k_cluster": str,
+    "target_frequency": int,
+    "temperature_start": float,
+    "temperature_stop": float,
+    "window_start_ns": int,
+    "window_stop_ns": int,
+}
+
+# One row per iteration of raw perf stat output, see perf_stat.py
+perf_stat_columns: Dict[str, type] = {
+    "power_energy_pkg": float,
+    "power_energy_ram": float,
+    "power_energy_cores": float,
+    "time_elapsed": float,
+    "iteration": int,
+    "window_start_ns": int,
+}
+
+# HWPC RAPL values are kept as raw 32.32 fixed point integers
+# timestamp_ns is the epoch nanoseconds of every tool, see timestamps.py
+hwpc_frequency_columns: Dict[str, type] = {
+    "g5k_cluster": str,
+    "node": str,
+    "timestamp": int,
+    "timestamp_ns": int,
+    "cores": int,
+    "pkg": int,
+    "ram": int,
+    "iteration": int,
+    "frequency": int,
+}
+
+frequency_columns: Dict[str, type] = {
+    "g5k_cluster": str,
+    "node": str,
+    "timestamp": float,
+    "timestamp_ns": int,
+    "cores": float,
+    "pkg": float,
+    "ram": float,
+    "iteration": int,
+    "frequency": int,
+}
+
+# Frequency samples of every tool in long format, see samples.py
+sample_columns: Dict[str, type] = {
+    "tool": pl.Categorical,
+    "g5k_cluster": pl.Categorical,
+    "node": pl.Categorical,
+    "frequency": int,
+    "iteration": int,
+    "domain": pl.Categorical,
+    "timestamp_ns": int,
+    "value": float,
+}
+
+# Scaphandre JSON reports of frequency runs, one row per report, see scaphandre.py
+# consumption is the host consumption, sockets and top consumers are kept nested
+scaphandre_report_columns: Dict[str, type] = {
+    "g5k_cluster": str,
+    "node": str,
+    "frequency": int,
+    "iteration": int,
+    "timestamp": float,
+    "timestamp_ns": int,
+    "consumption": float,
+    "sockets": pl.List(
+        pl.Struct(
+            {
+                "id": pl.Int64,
+                "consumption": pl.Float64,
+                "domains": pl.List(
+                    pl.Struct({"name": pl.String, "consumption": pl.Float64})
+                ),
+            }
+        )
+    ),
+    "consumers": pl.List(
+        pl.Struct(
+            {
+                "pid": pl.Int64,
+                "exe": pl.String,
+                "cmdline": pl.String,
+                "container": pl.String,
+                "consumption": pl.Float64,
+                "cpu_usage": pl.Float64,
+                "memory_usage": pl.Float64,
+            }
+        )
+    ),
+}
+
+# One row per (report, socket, domain), the socket total has the "package" domain
+scaphandre_socket_columns: Dict[str, type] = {
+    "g5k_cluster": str,
+    "node": str,
+    "frequency": int,
+    "iteration": int,
+    "timestamp_ns": int,
+    "socket": int,
+    "domain": str,
+    "consumption": float,
+}
+
+scaphandre_consumer_columns: Dict[str, type] = {
+    "g5k_cluster": str,
+    "node": str,
+    "frequency": int,
+    "iteration": int,
+    "timestamp_ns": int,
+    "pid": int,
+    "exe": str,
+    "cmdline": str,
+    "container": str,
+    "consumption": float,
+    "cpu_usage": float,
+    "memory_usage": float,
+}
+
+# Reached sampling frequencies of frequency runs, see frequencies.py
+# timestamp and interval are in seconds
+reached_frequency_columns: Dict[str, type] = {
+    "tool": str,
+    "g5k_cluster": str,
+    "node": str,
+    "target_frequency": int,
+    "iteration": int,
+    "timestamp": float,
+    "interval": float,
+    "reached_frequency": float,
+}
+
+interval_summary_columns: Dict[str, type] = {
+    "tool": str,
+    "g5k_cluster": str,
+    "node": str,
+    "target_frequency": int,
+    "iteration": int,
+    "intervals": int,
+    "interval_average": float,
+    "interval_standard_deviation": float,
+    "interval_minimum": float,
+    "interval_median": float,
+    "interval_quantile_95": float,
+    "interval_maximum": float,
+    "reached_frequency_average": float,
+}
+
+frequency_histogram_columns: Dict[str, type] = {
+    "tool": str,
+    "target_frequency": int,
+    "bin": int,
+    "bin_start": float,
+    "bin_end": float,
+    "count": int,
+}
+
+# perf stat windows of frequency runs, see alignment.py
+perf_window_columns: Dict[str, type] = {
+    "tool": str,
+    "g5k_cluster": str,
+    "node": str,
+    "target_frequency": int,
+    "iteration": int,
+    "window_start_ns": int,
+    "window_stop_ns": int,
+}
+
+baseline_columns: Dict[str, type] = {
+    "timestamp": float,
+    "pkg": float,
+    "ram": float,
+    "average_temperature": float,
+    "cpu_percent": float,
+    "mem_percent": float,
+    "g5k_cluster": str,
+    "node": str,
+}
+
+# Last sample of each domain of an iteration, see samples.frequency_view
+frequency_agg_columns: Dict[str, type] = {
+    "g5k_cluster": str,
+    "node": str,
+    "timestamp": float,
+    "timestamp_ns": int,
+    "cores": float,
+    "pkg": float,
+    "ram": float,
+    "iteration": int,
+    "frequency": int,
+}
+
+# Manifest of a partitioned cache, one row per input file of each partition
+cache_manifest_columns: Dict[str, type] = {
+    "partition": str,
+    "file": str,
+    "path": str,
+    "size": int,
+    "mtime": int,
+    "hash": str,
+    "version": int,
+}
+
+# Dimension frame of processor_catalog.json, one row per processor version
+processor_catalog_columns: Dict[str, type] = {
+    "version": str,
+    "architecture": str,
+    "vendor": str,
+    "generation": int,
+    "launch_date": str,
+    "numa_nodes_number": int,
+    "numa_nodes_first_cpus": List[int],
+}
+
+# HWPC socket leaders, one row per (node, cpu) whose RAPL counters are kept
+socket_leaders_columns: Dict[str, type] = {
+    "g5k_cluster": str,
+    "node": str,
+    "cpu": int,
+}
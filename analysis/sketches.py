@@ -0,0 +1,229 @@
+import math
+import os
+import polars as pl
+from typing import Dict, List, Union
+
+import cache
+import schemas
+
+# Mergeable quantile sketches of the energy rows, one per
+# (node, task, nb_core, nb_ops_per_core, domain).
+#
+# Sketches are relative error log histograms (DDSketch) : a value x > 0 is counted
+# in bucket ceil(log_gamma(x)) with gamma = (1 + a) / (1 - a), negative values in
+# the mirrored buckets and zeros apart. Any quantile is then estimated within a
+# relative error `a` of the exact closest rank value. Merging two sketches of the
+# same accuracy sums their bucket counts, so sites can be sketched in parallel and
+# a new batch extends the sketches of the previous ones without their raw rows.
+# Sketches are plain frames typed after schemas.quantile_sketch_columns.
+#
+# The sketches of a batch are stored like its moments, in the node partitioned
+# `sketches_<accuracy>` cache keyed on the fingerprints of the consumption files
+# of each node, see moments.py. Only the nodes whose files changed are sketched
+# again, the others are read back. extend_sketches merges them with the stored
+# sketches of other batches, whose raw rows are not read again.
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+SKETCH_KEYS = ["node", "task", "nb_core", "nb_ops_per_core", "domain"]
+DOMAINS = ["pkg", "cores", "ram"]
+QUANTILES = {"median": 0.5, "quantile_25": 0.25, "quantile_75": 0.75}
+# Version of the code building the sketch store, bump it when the sketches change
+CACHE_VERSION = 1
+
+
+def gamma(relative_accuracy: float) -> float:
+    if not 0 < relative_accuracy < 1:
+        raise ValueError(
+            f"Relative accuracy must be in ]0, 1[, got {relative_accuracy}"
+        )
+    return (1 + relative_accuracy) / (1 - relative_accuracy)
+
+
+def build_sketches(
+    energy_df: Union[pl.DataFrame, pl.LazyFrame],
+    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Sketches of the energy_<domain> columns of `energy_df`, lazy if `energy_df` is
+    """
+    log_gamma = math.log(gamma(relative_accuracy))
+    value = pl.col("value")
+    return (
+        energy_df.unpivot(
+            on=[f"energy_{domain}" for domain in DOMAINS],
+            index=SKETCH_KEYS[:-1],
+            variable_name="domain",
+            value_name="value",
+        )
+        .drop_nulls("value")
+        .with_columns(
+            pl.col("domain").str.strip_prefix("energy_"),
+            value.sign().cast(pl.Int64).alias("sign"),
+            pl.when(value == 0)
+            .then(0)
+            .otherwise((value.abs().log() / log_gamma).ceil())
+            .cast(pl.Int64)
+            .alias("bucket"),
+        )
+        .group_by(SKETCH_KEYS + ["sign", "bucket"])
+        .agg(pl.len().alias("count"))
+        .with_columns(pl.lit(relative_accuracy).alias("relative_accuracy"))
+        .cast(schemas.quantile_sketch_columns)
+    )
+
+
+def merge_sketches(
+    sketches: List[Union[pl.DataFrame, pl.LazyFrame]],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    One sketch per key out of `sketches`, built with the same relative accuracy
+    """
+    sketch_df = pl.concat(sketches, how="vertical")
+    if isinstance(sketch_df, pl.DataFrame):
+        accuracies = sketch_df.get_column("relative_accuracy").unique()
+        if accuracies.len() > 1:
+            raise ValueError(
+                f"Cannot merge sketches of different accuracies {accuracies.to_list()}"
+            )
+    return (
+        sketch_df.group_by(SKETCH_KEYS + ["sign", "bucket", "relative_accuracy"])
+        .agg(pl.col("count").sum())
+        .select(list(schemas.quantile_sketch_columns))
+    )
+
+
+def sketch_quantiles(
+    sketch_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Estimated count, median and 25/75 quantiles of every sketch, one row per key
+    """
+    growth = pl.lit(1.0) + pl.col("relative_accuracy")
+    growth = growth / (pl.lit(1.0) - pl.col("relative_accuracy"))
+    # Middle of the bucket in relative terms, 2 * gamma^i / (gamma + 1)
+    estimate = (
+        pl.col("sign").cast(pl.Float64)
+        * 2
+        * growth.pow(pl.col("bucket"))
+        / (growth + 1)
+    )
+    rank = pl.col("count").cum_sum() - 1
+    return (
+        sketch_df.with_columns(estimate.alias("estimate"))
+        .sort(SKETCH_KEYS + ["sign", pl.col("sign") * pl.col("bucket")])
+        .group_by(SKETCH_KEYS, maintain_order=True)
+        .agg(
+            pl.col("count").sum(),
+            *[
+                pl.col("estimate")
+                .filter(rank >= ((pl.col("count").sum() - 1) * quantile).floor())
+                .first()
+                .alias(name)
+                for name, quantile in QUANTILES.items()
+            ],
+        )
+    )
+
+
+def sketch_statistics(
+    sketch_df: Union[pl.DataFrame, pl.LazyFrame],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    <domain>_median and <domain>_quantile_25/75 columns of schemas.stats_columns
+    estimated from the sketches, one row per (node, task, nb_core, nb_ops_per_core)
+    """
+    return sketch_quantiles(sketch_df).group_by(SKETCH_KEYS[:-1]).agg(
+        [
+            pl.col(name).filter(pl.col("domain") == domain).first().alias(
+                f"{domain}_{name}"
+            )
+            for domain in DOMAINS
+            for name in QUANTILES
+        ]
+    )
+
+
+def store_name(relative_accuracy: float) -> str:
+    """
+    Name of the sketch store of a relative accuracy, sketches of different
+    accuracies cannot be merged
+    """
+    gamma(relative_accuracy)
+    return f"sketches_{relative_accuracy:g}"
+
+
+def node_sketches(
+    energy_df: Union[pl.DataFrame, pl.LazyFrame],
+    node_directories: List[str],
+    relative_accuracy: float,
+) -> Dict[str, pl.DataFrame]:
+    """
+    {node directory: sketches} of the nodes of `node_directories`, built in one
+    pass over their rows. Nodes without rows in `energy_df` are left out.
+    """
+    nodes = {os.path.basename(directory): directory for directory in node_directories}
+    sketch_df = build_sketches(
+        energy_df.lazy().filter(pl.col("node").cast(pl.String).is_in(list(nodes))),
+        relative_accuracy,
+    ).collect()
+    return {
+        nodes[node]: node_df
+        for (node,), node_df in sketch_df.partition_by("node", as_dict=True).items()
+    }
+
+
+def update_sketches(
+    batch_identifier: str,
+    energy_df: Union[pl.DataFrame, pl.LazyFrame],
+    partitions: Dict[str, List[str]],
+    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+) -> pl.DataFrame:
+    """
+    Sketches of the nodes of `partitions` ({node directory: consumption files}) from
+    the sketch store of the batch. Rows of `energy_df`, read from these files, are
+    only scanned for the nodes whose files changed.
+    """
+    return cache.load_partitioned_together(
+        batch_identifier,
+        store_name(relative_accuracy),
+        partitions,
+        lambda node_directories: node_sketches(
+            energy_df, node_directories, relative_accuracy
+        ),
+        schema=schemas.quantile_sketch_columns,
+        version=CACHE_VERSION,
+    )
+
+
+def stored_sketches(
+    batch_identifier: str, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+) -> pl.DataFrame:
+    """
+    Sketches stored for the batch by update_sketches, without reading its rows
+    """
+    return cache.load_partitioned(
+        batch_identifier,
+        store_name(relative_accuracy),
+        {},
+        None,
+        schema=schemas.quantile_sketch_columns,
+        version=CACHE_VERSION,
+    )
+
+
+def extend_sketches(
+    sketch_df: pl.DataFrame,
+    batch_identifiers: List[str],
+    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+) -> pl.DataFrame:
+    """
+    Merge `sketch_df` with the stored sketches of `batch_identifiers`,
+    quantiles of the merged sketches cover the rows of every batch
+    """
+    return merge_sketches(
+        [sketch_df]
+        + [
+            stored_sketches(batch_identifier, relative_accuracy)
+            for batch_identifier in batch_identifiers
+        ]
+    )
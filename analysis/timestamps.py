@@ -0,0 +1,91 @@
+import polars as pl
+from typing import Union
+
+# Timestamp normalization of the frequency samples
+# Every tool gets a `timestamp_ns` Int64 column, nanoseconds since the epoch (UTC),
+# parsed with native Polars expressions instead of one Python call per row.
+#
+# Formats emitted by the tools :
+# - codecarbon : naive ISO 8601, e.g. 2025-01-01T10:00:00.123456
+# - alumet : ISO 8601 with up to nanosecond fractions and an offset or Z
+# - scaphandre, vjoule : epoch seconds as a decimal string, e.g. 1735725600.123456
+# - hwpc : epoch milliseconds as an integer
+# - perf stat : ctime header of each block, e.g. "# started on Mon Jan  6 10:00:00 2025",
+#   in the local time of the node at 1 s resolution
+# Naive ISO timestamps are read as UTC, perf ones in the time zone they are given.
+
+ISO_FORMAT = "%Y-%m-%dT%H:%M:%S%.f"
+ISO_OFFSET_FORMAT = "%Y-%m-%dT%H:%M:%S%.f%#z"
+CTIME_FORMAT = "%a %b %d %H:%M:%S %Y"
+
+
+def as_expr(column: Union[str, pl.Expr]) -> pl.Expr:
+    return pl.col(column) if isinstance(column, str) else column
+
+
+def iso_to_ns(column: Union[str, pl.Expr]) -> pl.Expr:
+    """
+    ISO 8601 strings, with or without offset and with any number of fractional digits
+    """
+    iso = as_expr(column).str.strip_chars().str.replace(" ", "T", literal=True)
+    return pl.coalesce(
+        iso.str.to_datetime(ISO_OFFSET_FORMAT, time_unit="ns", strict=False)
+        .dt.convert_time_zone("UTC")
+        .dt.replace_time_zone(None)
+        .dt.epoch("ns"),
+        iso.str.to_datetime(ISO_FORMAT, time_unit="ns", strict=False).dt.epoch("ns"),
+    )
+
+
+def epoch_seconds_to_ns(column: Union[str, pl.Expr]) -> pl.Expr:
+    """
+    Decimal epoch seconds, integer and fractional parts are parsed separately
+    so no precision is lost to floating point
+    """
+    parts = (
+        as_expr(column)
+        .cast(pl.String)
+        .str.strip_chars()
+        .str.split_exact(".", 1)
+    )
+    seconds = parts.struct.field("field_0").cast(pl.Int64)
+    fraction = (
+        parts.struct.field("field_1")
+        .fill_null("")
+        .str.slice(0, 9)
+        .str.pad_end(9, "0")
+        .cast(pl.Int64)
+    )
+    return seconds * 1_000_000_000 + fraction
+
+
+def ctime_to_ns(column: Union[str, pl.Expr], time_zone: str) -> pl.Expr:
+    """
+    ctime strings in the local time of `time_zone`, days are space padded so runs of
+    spaces are collapsed first. Times repeated when clocks go back are read as the
+    first one, times skipped when they go forward are null.
+    """
+    return (
+        as_expr(column)
+        .str.strip_chars()
+        .str.replace_all(r"\s+", " ")
+        .str.to_datetime(CTIME_FORMAT, time_unit="ns", strict=False)
+        .dt.replace_time_zone(time_zone, ambiguous="earliest", non_existent="null")
+        .dt.epoch("ns")
+    )
+
+
+def epoch_milliseconds_to_ns(column: Union[str, pl.Expr]) -> pl.Expr:
+    return as_expr(column).cast(pl.Int64) * 1_000_000
+
+
+def ns_to_seconds(column: Union[str, pl.Expr]) -> pl.Expr:
+    """
+    Float UTC epoch seconds at microsecond resolution, whole seconds + microseconds
+    / 1e6. Naive timestamps are read as UTC, datetime.timestamp() used the local
+    time zone of the host, values only match it on hosts running in UTC.
+    """
+    ns = as_expr(column)
+    return (ns // 1_000_000_000).cast(pl.Float64) + (
+        (ns % 1_000_000_000) // 1_000
+    ).cast(pl.Float64) / 1e6
@@ -0,0 +1,163 @@
+import polars as pl
+from typing import Dict, Optional, TypedDict
+
+import rapl
+import schemas
+import timestamps
+
+# Frequency run outputs of each power meter, described by a ToolSpec
+# <RESULTS_DIR_PATH>/<G5K_SITE>/<G5K_CLUSTER>/<G5K_NODE>/frequency_<F>_<TOOL>_and_<COMPANION>.csv
+#
+# - file_regex : catalog file names of the tool, matched from their start
+# - layout : "long" files hold (domain, timestamp, energy, iteration) rows,
+#   "wide" files one column per domain and one row per sample and CPU
+# - domains : tool domain (long) or column (wide) -> pkg, cores or ram,
+#   targets without a domain are 0
+# - timestamp_format : "iso", "epoch_seconds" or "epoch_milliseconds", see timestamps.py
+# - energy_unit : unit of the values as the tool writes them, values are kept as written
+#   in the store and converted to joules by alignment.py, see JOULES_PER_UNIT
+# - cumulative : values are running totals of the iteration instead of per sample
+#   deltas, the last sample of each domain then holds the iteration total
+# - deduplicate : how repeated rows are found, see samples.DEDUPLICATION_KEYS :
+#   "key" rows repeat the key of a sample, "row" rows repeat every column, for tools
+#   writing one row per socket with no socket column (alumet) : two sockets with the
+#   same energy in a sample are then merged and counted as a repeated row.
+#   None keeps every row, HWPC writes one row per CPU for each sample
+# - schema : columns of the wide view of the tool samples, see samples.frequency_view
+#
+# load.load_samples reads any spec, adding a power meter is adding its spec.
+
+
+class ToolSpec(TypedDict):
+    file_regex: str
+    layout: str
+    domains: Dict[str, str]
+    timestamp_format: str
+    energy_unit: str
+    cumulative: bool
+    deduplicate: Optional[str]
+    schema: Dict[str, type]
+
+
+TOOL_SPECS: Dict[str, ToolSpec] = {
+    "hwpc": {
+        "file_regex": r"frequency_[0-9]+_hwpc_and_[a-z0-9]+\.csv$",
+        "layout": "wide",
+        "domains": {
+            "rapl_energy_cores": "cores",
+            "rapl_energy_pkg": "pkg",
+            "rapl_energy_dram": "ram",
+        },
+        "timestamp_format": "epoch_milliseconds",
+        # 32.32 fixed point joules, see rapl.py
+        "energy_unit": "rapl_fixed_point",
+        "cumulative": False,
+        "deduplicate": None,
+        "schema": schemas.hwpc_frequency_columns,
+    },
+    "codecarbon": {
+        "file_regex": r"frequency_[0-9]+_codecarbon_and_[a-z0-9]+\.csv$",
+        "layout": "long",
+        "domains": {"CPU": "pkg", "RAM": "ram"},
+        "timestamp_format": "iso",
+        "energy_unit": "kWh",
+        "cumulative": True,
+        "deduplicate": "key",
+        "schema": schemas.frequency_columns,
+    },
+    "alumet": {
+        "file_regex": r"frequency_[0-9]+_alumet_and_[a-z0-9]+\.csv$",
+        "layout": "long",
+        "domains": {"package": "pkg", "dram": "ram"},
+        "timestamp_format": "iso",
+        "energy_unit": "J",
+        "cumulative": False,
+        "deduplicate": "row",
+        "schema": schemas.frequency_columns,
+    },
+    "scaphandre": {
+        "file_regex": r"frequency_[0-9]+_scaphandre_and_[a-z0-9]+\.csv$",
+        "layout": "long",
+        "domains": {"package": "pkg"},
+        "timestamp_format": "epoch_seconds",
+        # Power samples, see scaphandre.py
+        "energy_unit": "uW",
+        "cumulative": False,
+        "deduplicate": "key",
+        "schema": schemas.frequency_columns,
+    },
+    "vjoule": {
+        "file_regex": r"frequency_[0-9]+_vjoule_and_[a-z0-9]+\.csv$",
+        "layout": "long",
+        "domains": {"CPU": "pkg", "RAM": "ram"},
+        "timestamp_format": "epoch_seconds",
+        "energy_unit": "J",
+        "cumulative": True,
+        "deduplicate": "key",
+        "schema": schemas.frequency_columns,
+    },
+}
+
+TARGET_DOMAINS = ["cores", "pkg", "ram"]
+# Joules per unit of energy values, Watts per unit of power values
+JOULES_PER_UNIT = {
+    "J": 1.0,
+    "kWh": 3.6e6,
+    "rapl_fixed_point": rapl.FIXED_POINT_SCALE,
+}
+WATTS_PER_UNIT = {"uW": 1e-6}
+TIMESTAMP_UNITS = {
+    "iso": "seconds",
+    "epoch_seconds": "seconds",
+    "epoch_milliseconds": "milliseconds",
+}
+
+
+def timestamp_unit(spec: ToolSpec) -> str:
+    """
+    Unit of the timestamp column of the wide views, see frequencies.py
+    """
+    return TIMESTAMP_UNITS[spec["timestamp_format"]]
+
+
+def timestamp_ns(spec: ToolSpec) -> pl.Expr:
+    timestamp_format = spec["timestamp_format"]
+    if timestamp_format == "iso":
+        return timestamps.iso_to_ns("timestamp")
+    if timestamp_format == "epoch_seconds":
+        return timestamps.epoch_seconds_to_ns("timestamp")
+    if timestamp_format == "epoch_milliseconds":
+        return timestamps.epoch_milliseconds_to_ns("timestamp")
+    raise ValueError(
+        f"Unknown timestamp format {timestamp_format}, expected one of {list(TIMESTAMP_UNITS)}"
+    )
+
+
+def scan_samples(file: str, spec: ToolSpec) -> pl.LazyFrame:
+    """
+    Samples of a frequency file as written by the tool : iteration, timestamp and
+    either domain and energy (long layout) or one Float64 column per domain the
+    file has (wide layout), empty columns are null instead of inferred as strings
+    """
+    if spec["layout"] == "long":
+        return pl.scan_csv(
+            file, schema_overrides={"timestamp": pl.String, "energy": pl.String}
+        ).select(
+            pl.col("iteration").cast(pl.Int64),
+            pl.col("timestamp").str.strip_chars(),
+            pl.col("domain").str.strip_chars(),
+            pl.col("energy").str.strip_chars().cast(pl.Float64),
+        )
+    if spec["layout"] == "wide":
+        samples_lf = pl.scan_csv(file, schema_overrides={"timestamp": pl.String})
+        file_columns = samples_lf.collect_schema().names()
+        return samples_lf.select(
+            pl.col("iteration").cast(pl.Int64),
+            pl.col("timestamp").str.strip_chars(),
+            *[
+                pl.col(domain).cast(pl.Float64)
+                for domain in spec["domains"]
+                if domain in file_columns
+            ],
+        )
+    raise ValueError(f"Unknown layout {spec['layout']}, expected long or wide")
@@ -319,3 +319,42 @@ def plot_os_degradation_percent_used(joined_df, domain, save=True, show=True):
         plt.savefig(f"{safe_title}.png", dpi=600)
     if show:
         plt.show()
+
+
+def plot_frequency_bands(
+    bands_df,
+    palette=None,
+    ax=None,
+    lower="percentile_2_5",
+    upper="percentile_97_5",
+    center="mean",
+    err_style="bars",
+):
+    """
+    Draw reached vs target frequency from precomputed summaries, see
+    frequencies.reached_frequency_bands, one line per tool with its
+    `lower`-`upper` percentile interval as error bars or a band
+    """
+    if ax is None:
+        ax = plt.gca()
+    for (tool,), tool_df in bands_df.sort("tool", "target_frequency").group_by(
+        "tool", maintain_order=True
+    ):
+        color = None if palette is None else palette.get(tool)
+        x = tool_df.get_column("target_frequency").to_numpy()
+        y = tool_df.get_column(center).to_numpy()
+        y_lower = tool_df.get_column(lower).to_numpy()
+        y_upper = tool_df.get_column(upper).to_numpy()
+        if err_style == "bars":
+            ax.errorbar(
+                x,
+                y,
+                yerr=[y - y_lower, y_upper - y],
+                label=tool,
+                color=color,
+                capsize=3,
+            )
+        else:
+            ax.plot(x, y, label=tool, color=color)
+            ax.fill_between(x, y_lower, y_upper, color=color, alpha=0.2)
+    return ax
@@ -84,14 +84,14 @@ PERF_AND_HWPC_FREQUENCY_TEMPERATURES_FILE="{{ results_directory }}/temperatures_
 HWPC_AND_PERF_FREQUENCY_DIR="{{ results_directory }}/frequency_{{ target_frequency }}_hwpc_and_perf"
 touch $PERF_AND_HWPC_FREQUENCY_FILE
 mkdir -p $HWPC_AND_PERF_FREQUENCY_DIR
-echo "temperature_start,temperature_stop,iteration" > $PERF_AND_HWPC_FREQUENCY_TEMPERATURES_FILE
+echo "temperature_start,temperature_stop,iteration,window_start_ns,window_stop_ns" > $PERF_AND_HWPC_FREQUENCY_TEMPERATURES_FILE
 
 PERF_AND_CODECARBON_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_frequency }}_perf_and_codecarbon"
 PERF_AND_CODECARBON_FREQUENCY_TEMPERATURES_FILE="{{ results_directory }}/temperatures_frequency_{{ target_frequency }}_perf_and_codecarbon.csv"
 CODECARBON_AND_PERF_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_frequency }}_codecarbon_and_perf.csv"
 touch $PERF_AND_CODECARBON_FREQUENCY_FILE
 echo "domain,timestamp,energy,iteration" > $CODECARBON_AND_PERF_FREQUENCY_FILE
-echo "temperature_start,temperature_stop,iteration" > $PERF_AND_CODECARBON_FREQUENCY_TEMPERATURES_FILE
+echo "temperature_start,temperature_stop,iteration,window_start_ns,window_stop_ns" > $PERF_AND_CODECARBON_FREQUENCY_TEMPERATURES_FILE
 
 PERF_AND_ALUMET_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_frequency }}_perf_and_alumet"
 PERF_AND_ALUMET_FREQUENCY_TEMPERATURES_FILE="{{ results_directory }}/temperatures_frequency_{{ target_frequency }}_perf_and_alumet.csv"
@@ -99,7 +99,7 @@ ALUMET_AND_PERF_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_freq
 ALUMET_AND_PERF_FREQUENCY_DIR="{{ results_directory }}/frequency_{{ target_frequency }}_alumet_and_perf"
 touch $PERF_AND_ALUMET_FREQUENCY_FILE
 echo "domain,timestamp,energy,iteration" > $ALUMET_AND_PERF_FREQUENCY_FILE
-echo "temperature_start,temperature_stop,iteration" > $PERF_AND_ALUMET_FREQUENCY_TEMPERATURES_FILE
+echo "temperature_start,temperature_stop,iteration,window_start_ns,window_stop_ns" > $PERF_AND_ALUMET_FREQUENCY_TEMPERATURES_FILE
 mkdir -p $ALUMET_AND_PERF_FREQUENCY_DIR
 
 PERF_AND_SCAPHANDRE_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_frequency }}_perf_and_scaphandre"
@@ -107,14 +107,14 @@ PERF_AND_SCAPHANDRE_FREQUENCY_TEMPERATURES_FILE="{{ results_directory }}/tempera
 SCAPHANDRE_AND_PERF_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_frequency }}_scaphandre_and_perf.csv"
 touch $PERF_AND_SCAPHANDRE_FREQUENCY_FILE
 echo "domain,timestamp,energy,iteration" > $SCAPHANDRE_AND_PERF_FREQUENCY_FILE
-echo "temperature_start,temperature_stop,iteration" > $PERF_AND_SCAPHANDRE_FREQUENCY_TEMPERATURES_FILE
+echo "temperature_start,temperature_stop,iteration,window_start_ns,window_stop_ns" > $PERF_AND_SCAPHANDRE_FREQUENCY_TEMPERATURES_FILE
 
 PERF_AND_VJOULE_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_frequency }}_perf_and_vjoule"
 PERF_AND_VJOULE_FREQUENCY_TEMPERATURES_FILE="{{ results_directory }}/temperatures_frequency_{{ target_frequency }}_perf_and_vjoule.csv"
 VJOULE_AND_PERF_FREQUENCY_FILE="{{ results_directory }}/frequency_{{ target_frequency }}_vjoule_and_perf.csv"
 touch $PERF_AND_VJOULE_FREQUENCY_FILE
 echo "domain,timestamp,energy,iteration" > $VJOULE_AND_PERF_FREQUENCY_FILE
-echo "temperature_start,temperature_stop,iteration" > $PERF_AND_VJOULE_FREQUENCY_TEMPERATURES_FILE
+echo "temperature_start,temperature_stop,iteration,window_start_ns,window_stop_ns" > $PERF_AND_VJOULE_FREQUENCY_TEMPERATURES_FILE
 
 for i in {1..{{ nb_iterations_frequencies }}}; do
   export i=$i